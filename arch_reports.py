@@ -1,35 +1,42 @@
+import argparse
 import os
-import shutil
 
-def move_files_to_arch_reports():
+from utils.attachment_dedup import dedupe_attachments
+from utils.report_archive import ReportArchive
+
+
+def move_files_to_arch_reports(run_id=None):
     # Define paths to the 'reports' and 'arch_reports' folders
     current_directory = os.getcwd()
     reports_folder = os.path.join(current_directory, 'reports')
     arch_reports_folder = os.path.join(current_directory, 'arch_reports')
 
-    # Check if the 'arch_reports' folder exists; if not, create it
-    if not os.path.exists(arch_reports_folder):
-        os.makedirs(arch_reports_folder)
-        print(f"Folder {arch_reports_folder} has been created.")
+    archive = ReportArchive(arch_reports_folder)
+
+    # Files archived one by one by older versions of this script go into bundles as well
+    migrated = archive.migrate_loose_files()
+    if migrated:
+        print(f"Bundled {migrated} loose files from {arch_reports_folder}.")
 
     # Check if the 'reports' folder exists
     if os.path.exists(reports_folder) and os.path.isdir(reports_folder):
-        # Iterate through all files in the 'reports' folder
-        for filename in os.listdir(reports_folder):
-            file_path = os.path.join(reports_folder, filename)
-
-            # Check if it is a file
-            if os.path.isfile(file_path):
-                # Create the destination path in the 'arch_reports' folder
-                destination_path = os.path.join(arch_reports_folder, filename)
-                try:
-                    # Move the file to the 'arch_reports' folder
-                    shutil.move(file_path, destination_path)
-                    print(f"Moved {file_path} to {destination_path}")
-                except Exception as e:
-                    print(f"Failed to move file {file_path}: {e}")
+        # Identical attachments are stored once before bundling
+        dedupe_attachments(reports_folder)
+
+        # All files of the run go into one compressed bundle (indexed in arch_reports/index.json)
+        entry = archive.archive_directory(reports_folder, run_id=run_id)
+        if entry:
+            print(f"Archived {entry['files']} files ({len(entry['tests'])} tests) "
+                  f"to {os.path.join(arch_reports_folder, entry['bundle'])}")
+        else:
+            print(f"No files to archive in {reports_folder}.")
     else:
         print(f"Folder {reports_folder} does not exist.")
 
-# Call the function
-move_files_to_arch_reports()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archive reports/ as one compressed, indexed bundle')
+    parser.add_argument('--run-id', help='Run id of the bundle (default: current timestamp)')
+    args = parser.parse_args()
+
+    move_files_to_arch_reports(args.run_id)
@@ -1,9 +1,21 @@
+import argparse
 import os
-import shutil
 from datetime import datetime
 
+from utils.report_archive import ReportArchive
 
-def move_files_from_arch_reports(date_str=None):
+
+def restore_files_from_arch_reports(date_str=None, test=None, exact=False):
+    """
+    Restores archived reports into 'reports'.
+
+    Unlike older versions, which moved the files out of arch_reports, restoring
+    only reads the archive: files are copied into 'reports' and stay archived.
+
+    :param date_str: Restore runs from this date on (YYYY-MM-DD, default: today)
+    :param test: Restore only the files of tests whose name contains this text
+    :param exact: Restore only runs of exactly date_str
+    """
     # If no argument is provided, use today's date
     if date_str is None:
         date_str = datetime.now().strftime('%Y-%m-%d')
@@ -13,47 +25,41 @@ def move_files_from_arch_reports(date_str=None):
     arch_reports_folder = os.path.join(current_directory, 'arch_reports')
     reports_folder = os.path.join(current_directory, 'reports')
 
-    # Convert the date from string format to a datetime object
+    # Validate the date format
     try:
-        target_date = datetime.strptime(date_str, '%Y-%m-%d')
+        datetime.strptime(date_str, '%Y-%m-%d')
     except ValueError:
         print("Invalid date format. Use YYYY-MM-DD.")
         return
 
     # Check if the 'arch_reports' folder exists
     if os.path.exists(arch_reports_folder) and os.path.isdir(arch_reports_folder):
-        files_moved = 0  # Counter for moved files
-
-        # Iterate through all files in the 'arch_reports' folder
-        for filename in os.listdir(arch_reports_folder):
-            file_path = os.path.join(arch_reports_folder, filename)
-
-            # Check if it is a file
-            if os.path.isfile(file_path):
-                # Get the file modification date
-                file_mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-
-                # Check if the file modification date is greater than or equal to the given date
-                if file_mod_time >= target_date:
-                    # Create the destination path in the 'reports' folder
-                    destination_path = os.path.join(reports_folder, filename)
-                    try:
-                        # Move the file to the 'reports' folder
-                        shutil.move(file_path, destination_path)
-                        print(f"Moved {file_path} to {destination_path}")
-                        files_moved += 1  # Increment the counter of moved files
-                    except Exception as e:
-                        print(f"Failed to move file {file_path}: {e}")
+        archive = ReportArchive(arch_reports_folder)
+
+        # Index lookup + streaming extraction of the matching bundles (loose files of the
+        # old file-by-file archiving are copied as they are; arch_reports.py bundles them)
+        files_restored = archive.restore(
+            reports_folder,
+            date=date_str if exact else None,
+            since=None if exact else date_str,
+            test=test,
+        )
 
         # Display the final message
-        if files_moved > 0:
-            print(f"Moved {files_moved} files.")
+        if files_restored > 0:
+            print(f"Restored {files_restored} files.")
         else:
-            print("No files were moved because no modification date matched.")
+            print("No files were restored because no archived run matched.")
     else:
         print(f"Folder {arch_reports_folder} does not exist.")
 
 
-# Call the function without an argument – it will use today's date
-move_files_from_arch_reports()
-``
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Restore archived reports from arch_reports/ into reports/')
+    parser.add_argument('date', nargs='?', help='Restore runs from this date on (YYYY-MM-DD, default: today)')
+    parser.add_argument('--exact', action='store_true', help='Only runs of exactly this date')
+    parser.add_argument('--test', help='Only the files of tests whose name contains this text')
+    args = parser.parse_args()
+
+    # Without arguments it restores today's runs
+    restore_files_from_arch_reports(args.date, test=args.test, exact=args.exact)
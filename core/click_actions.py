@@ -1,20 +1,29 @@
 from appium.webdriver.common.appiumby import AppiumBy
-import time
-import logging
 from selenium.common.exceptions import TimeoutException, UnknownMethodException
 from selenium.common.exceptions import ElementClickInterceptedException
-import pyautogui
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from core.conditions import element_stable, wait_for
+from core.hierarchy_snapshot import invalidates_snapshot
+from core.input_sequence import (
+    KEYCODE_DPAD_DOWN,
+    KEYCODE_ENTER,
+    KEYCODE_ESCAPE,
+    InputSequence,
+    perform_sequence,
+)
+from utils.framework_log import get_logger
 
-logging.basicConfig(level=logging.INFO)
+
+log = get_logger("actions")
 
 
 class ClickActions:
     def __init__(self, driver):
         self.driver = driver  # Driver
 
+    @invalidates_snapshot
     def click_element(self, selector):
         # Using the driver defined in the class
         element = WebDriverWait(self.driver, 200).until(
@@ -22,90 +31,88 @@ class ClickActions:
         )
         element.click()
 
+    @invalidates_snapshot
     def click_element_radion(self, selector):
         try:
             element = WebDriverWait(self.driver, 40).until(
                 EC.element_to_be_clickable((AppiumBy.ANDROID_UIAUTOMATOR, selector))
             )
-            time.sleep(1)
+            # Radio lists are often still animating in; click once the element stops moving
+            wait_for(self.driver, element_stable(selector), timeout=5)
             element.click()
         except Exception as e:
-            print(f"Error click element: {e}")
+            log.error("Error click element: %s", e)
             raise e
 
+    @invalidates_snapshot
+    def perform_sequence(self, sequence, backend="auto"):
+        """
+        Sends a key/tap/swipe sequence (core/input_sequence.py) in one request.
+
+        :param sequence: InputSequence
+        :param backend: 'auto', 'w3c' (W3C actions payload) or 'shell' ('input keyevent a b c')
+        """
+        return perform_sequence(self.driver, sequence, backend=backend)
+
+    def press_keys(self, *keycodes, delay_ms=0):
+        """
+        Presses the keys in one request ('input keyevent K1 K2 ...').
+
+        :param delay_ms: Pause on the device between the keys, for screens that must react
+                         to each key first (default: none, all keys in one input call)
+        """
+        self.perform_sequence(InputSequence().keys(*keycodes, delay_ms=delay_ms))
+
     def press_enter_twice(self):
         try:
-            # First Enter key press (keycode 66 corresponds to Enter)
-            self.driver.press_keycode(66)
-            print("First Enter key press performed.")
-            time.sleep(1)
-            # Second Enter key press (keycode 66 corresponds to Enter)
-            self.driver.press_keycode(66)
-            print("Second Enter key press performed.")
+            # Enter (keycode 66) twice, one request
+            self.press_keys(KEYCODE_ENTER, KEYCODE_ENTER)
+            log.debug("Enter key pressed twice.")
 
         except Exception as e:
-            print(f"Error while simulating Enter key press: {e}")
+            log.error("Error while simulating Enter key press: %s", e)
 
     def press_enter_3times(self):
         try:
-            # First Enter key press (keycode 66)
-            self.driver.press_keycode(66)
-            print("First Enter key press performed.")
-            time.sleep(1)
-
-            # Press Down arrow (keycode 20)
-            self.driver.press_keycode(20)
-            print("Down arrow key press performed.")
-            time.sleep(1)
-
-            # Second Enter key press
-            self.driver.press_keycode(66)
-            print("Second Enter key press performed.")
+            # Enter, Down arrow (keycode 20), Enter
+            self.press_keys(KEYCODE_ENTER, KEYCODE_DPAD_DOWN, KEYCODE_ENTER)
+            log.debug("Enter, Down arrow, Enter key presses performed.")
 
         except Exception as e:
-            print(f"Error while simulating key presses: {e}")
+            log.error("Error while simulating key presses: %s", e)
 
     def press_enter_arrow_down_enter(self):
         try:
-            # First Enter key press
-            self.driver.press_keycode(66)
-            print("First Enter key press performed.")
-            time.sleep(1)
-
-            # Press Down arrow
-            self.driver.press_keycode(20)
-            print("Down arrow key press performed.")
-            time.sleep(1)
-
-            # Second Enter key press
-            self.driver.press_keycode(66)
-            print("Second Enter key press performed.")
+            # Enter, Down arrow, Enter
+            self.press_keys(KEYCODE_ENTER, KEYCODE_DPAD_DOWN, KEYCODE_ENTER)
+            log.debug("Enter, Down arrow, Enter key presses performed.")
 
         except Exception as e:
-            print(f"Error while simulating key sequence: {e}")
+            log.error("Error while simulating key sequence: %s", e)
 
+    @invalidates_snapshot
     def press_enter_esc(self):
         try:
             # Press ESC (only once)
-            self.driver.press_keycode(111)
-            print("ESC key press performed.")
+            self.driver.press_keycode(KEYCODE_ESCAPE)
+            log.debug("ESC key press performed.")
 
         except Exception as e:
-            print(f"Error while simulating key sequence: {e}")
+            log.error("Error while simulating key sequence: %s", e)
 
     def press_down_and_enter(self):
-        """Presses Down arrow, then Enter."""
-        pyautogui.press('down')
-        time.sleep(0.2)
-        pyautogui.press('enter')
+        """Presses Down arrow, then Enter (on the device)."""
+        self.press_keys(KEYCODE_DPAD_DOWN, KEYCODE_ENTER)
 
+    @invalidates_snapshot
     def press_enter_key(self):
         """
         Simulates pressing the 'Enter' key or 'checkmark' on the virtual keyboard.
         """
         # Keycode 66 corresponds to the 'Enter' key on Android
-        self.driver.press_keycode(66)
+        self.driver.press_keycode(KEYCODE_ENTER)
 
+    @invalidates_snapshot
     def click_elemet_radiobtnYES(self):
         # Creating UiAutomator selector
         selector = 'new UiSelector().resourceId("UIpath selector'
@@ -115,13 +122,13 @@ class ClickActions:
                 EC.element_to_be_clickable((AppiumBy.ANDROID_UIAUTOMATOR, selector))
             )
             clickable_element.click()
-            print(f"Clicked radio-button YES: {selector}")
+            log.debug("Clicked radio-button YES: %s", selector)
 
         except TimeoutException:
-            logging.error(f"Timeout: Failed to find or click the element within the allocated time.")
+            log.error("Timeout: Failed to find or click the element within the allocated time.")
         except ElementClickInterceptedException as e:
-            logging.error(f"Element could not be clicked because the click was intercepted: {e}")
+            log.error("Element could not be clicked because the click was intercepted: %s", e)
         except Exception as e:
-            logging.error(f"Error while clicking the element: {e}")
+            log.error("Error while clicking the element: %s", e)
             raise e
 
@@ -0,0 +1,187 @@
+import time
+from contextlib import contextmanager
+
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import TimeoutException
+
+from utils.driver_setup import IMPLICIT_WAIT
+from utils.step_metrics import record_wait
+
+# Polling: start fast, back off while the UI is still busy
+INITIAL_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+POLL_BACKOFF = 1.5
+
+
+class Condition:
+    """
+    Declarative post-condition for StepExecutor.execute_step(until=...).
+
+    prepare() is called right before the step runs (e.g. to remember the
+    current activity), check() is polled after the step until it returns True.
+    """
+
+    description = "condition"
+
+    def prepare(self, driver) -> None:
+        pass
+
+    def check(self, driver) -> bool:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return self.description
+
+
+class _ElementPresent(Condition):
+    def __init__(self, selector, by):
+        self.selector, self.by = selector, by
+        self.description = f"element present: {selector}"
+
+    def check(self, driver) -> bool:
+        return bool(driver.find_elements(self.by, self.selector))
+
+
+class _ElementGone(Condition):
+    def __init__(self, selector, by):
+        self.selector, self.by = selector, by
+        self.description = f"element gone: {selector}"
+
+    def check(self, driver) -> bool:
+        return not driver.find_elements(self.by, self.selector)
+
+
+class _TextEquals(Condition):
+    def __init__(self, selector, expected_text, by):
+        self.selector, self.expected_text, self.by = selector, expected_text, by
+        self.description = f"text of {selector} == '{expected_text}'"
+
+    def check(self, driver) -> bool:
+        elements = driver.find_elements(self.by, self.selector)
+        return bool(elements) and elements[0].text.strip() == self.expected_text
+
+
+class _ActivityChanged(Condition):
+    def __init__(self):
+        self.previous_activity = None
+        self.description = "activity changed"
+
+    def prepare(self, driver) -> None:
+        self.previous_activity = driver.current_activity
+
+    def check(self, driver) -> bool:
+        return driver.current_activity != self.previous_activity
+
+
+class _ActivityIs(Condition):
+    def __init__(self, activity):
+        self.activity = activity
+        self.description = f"activity is {activity}"
+
+    def check(self, driver) -> bool:
+        return driver.current_activity == self.activity
+
+
+class _ElementStable(Condition):
+    def __init__(self, selector, by):
+        self.selector, self.by = selector, by
+        self.last_rect = None
+        self.description = f"element stable: {selector}"
+
+    def prepare(self, driver) -> None:
+        self.last_rect = None
+
+    def check(self, driver) -> bool:
+        elements = driver.find_elements(self.by, self.selector)
+        rect = elements[0].rect if elements else None
+        stable = rect is not None and rect == self.last_rect
+        self.last_rect = rect
+        return stable
+
+
+def element_present(selector, by=AppiumBy.ANDROID_UIAUTOMATOR) -> Condition:
+    """Element matching the selector exists in the hierarchy."""
+    return _ElementPresent(selector, by)
+
+
+def element_gone(selector, by=AppiumBy.ANDROID_UIAUTOMATOR) -> Condition:
+    """No element matches the selector any more."""
+    return _ElementGone(selector, by)
+
+
+def text_equals(selector, expected_text, by=AppiumBy.ANDROID_UIAUTOMATOR) -> Condition:
+    """First element matching the selector has exactly the expected (stripped) text."""
+    return _TextEquals(selector, expected_text, by)
+
+
+def element_stable(selector, by=AppiumBy.ANDROID_UIAUTOMATOR) -> Condition:
+    """Element exists and its rect is unchanged since the previous poll (e.g. an animation has finished)."""
+    return _ElementStable(selector, by)
+
+
+def activity_changed() -> Condition:
+    """Current activity differs from the one before the step."""
+    return _ActivityChanged()
+
+
+def activity_is(activity) -> Condition:
+    """Current activity equals the given one (e.g. '.MainActivity')."""
+    return _ActivityIs(activity)
+
+
+@contextmanager
+def no_implicit_wait(driver, restore_to: float = IMPLICIT_WAIT):
+    """
+    Temporarily disables the implicit wait, so find_elements() returns
+    immediately while polling (otherwise an absent element costs 10s per poll).
+    """
+    driver.implicitly_wait(0)
+    try:
+        yield
+    finally:
+        driver.implicitly_wait(restore_to)
+
+
+def wait_for(driver, conditions, timeout: float = 10,
+             initial_interval: float = INITIAL_POLL_INTERVAL,
+             max_interval: float = MAX_POLL_INTERVAL) -> float:
+    """
+    Polls all conditions until they hold, with an adaptive interval
+    (initial_interval growing up to max_interval) and a deadline.
+
+    :param conditions: Condition or list of Conditions
+    :param timeout: Deadline in seconds
+    :return: Seconds spent waiting
+    :raises TimeoutException: if the conditions do not hold before the deadline
+    """
+    if isinstance(conditions, Condition):
+        conditions = [conditions]
+
+    start = time.monotonic()
+    deadline = start + timeout
+    interval = initial_interval
+    pending = list(conditions)
+
+    try:
+        with no_implicit_wait(driver):
+            while True:
+                pending = [c for c in pending if not _safe_check(c, driver)]
+                if not pending:
+                    return time.monotonic() - start
+
+                now = time.monotonic()
+                if now >= deadline:
+                    raise TimeoutException(
+                        f"Conditions not met within {timeout}s: {', '.join(map(repr, pending))}"
+                    )
+                time.sleep(min(interval, deadline - now))
+                interval = min(max_interval, interval * POLL_BACKOFF)
+    finally:
+        record_wait(time.monotonic() - start)
+
+
+def _safe_check(condition, driver) -> bool:
+    try:
+        return condition.check(driver)
+    except Exception:
+        return False
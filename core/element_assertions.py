@@ -1,18 +1,53 @@
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.common.by import By
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-import logging
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-
-logging.basicConfig(level=logging.INFO)
+from core.hierarchy_snapshot import UnsupportedSelector, get_snapshot, invalidate_snapshot
 
 
 class ElementAssertions:
-    def __init__(self, driver):
+    def __init__(self, driver, use_snapshot=False):
+        """
+        :param driver: Appium driver
+        :param use_snapshot: Answer checks from a cached page_source snapshot
+                             (core/hierarchy_snapshot.py) instead of one find_element(s) per check
+        """
         self.driver = driver
+        self.use_snapshot = use_snapshot
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Snapshot mode for a block of checks: page_source is fetched once and all
+        checks inside the block are answered locally. Checks see the screen as it
+        was when the snapshot was taken (no implicit waiting); the snapshot is
+        invalidated by any ClickActions/StepExecutor action. After raw driver
+        actions (e.g. driver.press_keycode) call invalidate_snapshot(driver).
+
+            with element_assertions.snapshot():
+                element_assertions.check_text_content_desc("Assets")
+                element_assertions.check_today_date_in_text()
+        """
+        previous = self.use_snapshot
+        self.use_snapshot = True
+        invalidate_snapshot(self.driver)  # start from the current screen
+        try:
+            yield self
+        finally:
+            self.use_snapshot = previous
+
+    def _find_all(self, by, selector):
+        """find_elements() through the snapshot when enabled (falls back to the server for unsupported selectors)."""
+        if self.use_snapshot:
+            try:
+                return get_snapshot(self.driver).find(by, selector)
+            except UnsupportedSelector:
+                pass
+        return self.driver.find_elements(by, selector)
 
     def is_element_visible(self, selector):
         """
@@ -22,6 +57,9 @@ class ElementAssertions:
         :return: True if the element is visible; False otherwise
         """
         try:
+            if self.use_snapshot:
+                elements = self._find_all(AppiumBy.ANDROID_UIAUTOMATOR, selector)
+                return bool(elements) and elements[0].is_displayed()
             element = self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR, selector)
             return element.is_displayed()
         except Exception:
@@ -95,7 +133,7 @@ class ElementAssertions:
     def check_element_by_xpath(self, xpath: str):
         """Checks whether an element with the given XPATH exists."""
         try:
-            elements = self.driver.find_elements(AppiumBy.XPATH, xpath)
+            elements = self._find_all(AppiumBy.XPATH, xpath)
             if elements:
                 print(f"Element with XPATH '{xpath}' was found.")
                 return True
@@ -107,7 +145,7 @@ class ElementAssertions:
     def check_text_content_desc(self, text):
         """Checks whether an element with the given content-desc exists."""
         try:
-            elements = self.driver.find_elements(
+            elements = self._find_all(
                 AppiumBy.ANDROID_UIAUTOMATOR,
                 f'new UiSelector().descriptionContains("{text}")'
             )
@@ -123,7 +161,7 @@ class ElementAssertions:
         """Checks whether today's date (DD.MM.YYYY) is present in any text element."""
         try:
             today = datetime.now().strftime("%d.%m.%Y")
-            elements = self.driver.find_elements(
+            elements = self._find_all(
                 AppiumBy.ANDROID_UIAUTOMATOR,
                 f'new UiSelector().textContains("{today}")'
             )
@@ -138,7 +176,7 @@ class ElementAssertions:
     def check_text_content_descF(self, text):
         """Checks whether an element with the given content-desc exists (non-failing)."""
         try:
-            elements = self.driver.find_elements(
+            elements = self._find_all(
                 AppiumBy.ANDROID_UIAUTOMATOR,
                 f'new UiSelector().descriptionContains("{text}")'
             )
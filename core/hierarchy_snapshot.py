@@ -0,0 +1,243 @@
+import functools
+import re
+import weakref
+from typing import Dict, List, Optional
+
+try:
+    # Full XPath 1.0 support (lxml is listed in requirements.txt)
+    from lxml import etree as _etree
+    HAS_LXML = True
+except ImportError:  # fallback to the limited ElementPath syntax
+    import xml.etree.ElementTree as _etree
+    HAS_LXML = False
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+
+class UnsupportedSelector(Exception):
+    """The selector cannot be evaluated locally - callers fall back to the Appium server."""
+
+
+class SnapshotNode:
+    """One element of the hierarchy snapshot (attributes as in UiAutomator2 page source)."""
+
+    __slots__ = ("index", "tag", "attrs")
+
+    def __init__(self, index: int, tag: str, attrs: Dict[str, str]):
+        self.index = index  # position in document order
+        self.tag = tag
+        self.attrs = attrs
+
+    def get(self, name: str, default: str = "") -> str:
+        return self.attrs.get(name, default)
+
+    @property
+    def text(self) -> str:
+        return self.attrs.get("text", "")
+
+    def is_displayed(self) -> bool:
+        return self.attrs.get("displayed", "true") == "true"
+
+    def __repr__(self):
+        return f"<SnapshotNode {self.tag} id={self.get('resource-id')!r} text={self.text!r}>"
+
+
+# UiSelector method -> (attribute, kind). kind: eq | contains | startswith | regex | bool | int
+_UISELECTOR_METHODS = {
+    "resourceId": ("resource-id", "eq"),
+    "resourceIdMatches": ("resource-id", "regex"),
+    "text": ("text", "eq"),
+    "textContains": ("text", "contains"),
+    "textStartsWith": ("text", "startswith"),
+    "textMatches": ("text", "regex"),
+    "description": ("content-desc", "eq"),
+    "descriptionContains": ("content-desc", "contains"),
+    "descriptionStartsWith": ("content-desc", "startswith"),
+    "descriptionMatches": ("content-desc", "regex"),
+    "className": ("class", "eq"),
+    "classNameMatches": ("class", "regex"),
+    "packageName": ("package", "eq"),
+    "packageNameMatches": ("package", "regex"),
+    "index": ("index", "int"),
+    "checkable": ("checkable", "bool"),
+    "checked": ("checked", "bool"),
+    "clickable": ("clickable", "bool"),
+    "enabled": ("enabled", "bool"),
+    "focusable": ("focusable", "bool"),
+    "focused": ("focused", "bool"),
+    "longClickable": ("long-clickable", "bool"),
+    "scrollable": ("scrollable", "bool"),
+    "selected": ("selected", "bool"),
+}
+
+_UISELECTOR_PREFIX = re.compile(r"^\s*new\s+UiSelector\(\)")
+_UISELECTOR_CALL = re.compile(r'\s*\.(\w+)\(\s*("(?:[^"\\]|\\.)*"|true|false|\d+)\s*\)')
+
+
+def parse_uiselector(selector: str) -> List[tuple]:
+    """
+    Parses a simple 'new UiSelector().a("x").b(1)' chain into [(method, value), ...].
+
+    :raises UnsupportedSelector: for UiScrollable, childSelector/fromParent or unknown methods
+    """
+    match = _UISELECTOR_PREFIX.match(selector)
+    if not match:
+        raise UnsupportedSelector(selector)
+
+    pos, calls = match.end(), []
+    while pos < len(selector.rstrip().rstrip(";")):
+        call = _UISELECTOR_CALL.match(selector, pos)
+        if not call:
+            raise UnsupportedSelector(selector)
+        method, raw = call.group(1), call.group(2)
+        if method != "instance" and method not in _UISELECTOR_METHODS:
+            raise UnsupportedSelector(selector)
+        if raw.startswith('"'):
+            value = raw[1:-1].replace('\\"', '"')
+        elif raw in ("true", "false"):
+            value = raw == "true"
+        else:
+            value = int(raw)
+        calls.append((method, value))
+        pos = call.end()
+    return calls
+
+
+class HierarchySnapshot:
+    """
+    Parsed, indexed copy of one page_source dump. Answers UiSelector-style
+    and XPath queries locally, without round trips to the Appium server.
+    """
+
+    def __init__(self, page_source: str):
+        self.page_source = page_source
+        raw = page_source.encode("utf-8") if isinstance(page_source, str) else page_source
+        self._root = _etree.fromstring(raw)
+
+        self.nodes: List[SnapshotNode] = []
+        self._elements = []  # parsed element of each node, by node index
+        self._element_to_node = {}
+        self._by_attr: Dict[str, Dict[str, List[int]]] = {
+            "resource-id": {}, "text": {}, "content-desc": {}, "class": {},
+        }
+
+        for element in self._root.iter():
+            if not isinstance(element.tag, str):
+                continue  # comments / processing instructions (lxml)
+            node = SnapshotNode(len(self.nodes), element.tag, dict(element.attrib))
+            self.nodes.append(node)
+            self._elements.append(element)
+            self._element_to_node[element] = node
+            for attr, index in self._by_attr.items():
+                value = node.attrs.get(attr)
+                if value:
+                    index.setdefault(value, []).append(node.index)
+
+    @property
+    def root(self) -> SnapshotNode:
+        return self.nodes[0]
+
+    def descendants(self, node: SnapshotNode) -> List[SnapshotNode]:
+        """All nodes below the given node, in document order."""
+        return [self._element_to_node[e] for e in self._elements[node.index].iter()
+                if e in self._element_to_node][1:]
+
+    def find_uiselector(self, selector: str) -> List[SnapshotNode]:
+        """Returns nodes matching a UiSelector chain, in document order."""
+        calls = parse_uiselector(selector)
+        instance = None
+        candidates: Optional[List[SnapshotNode]] = None
+
+        # Use the most selective exact-match index to narrow the candidates
+        for method, value in calls:
+            if method == "instance":
+                instance = value
+                continue
+            attr, kind = _UISELECTOR_METHODS[method]
+            if kind == "eq" and attr in self._by_attr:
+                indexed = [self.nodes[i] for i in self._by_attr[attr].get(value, [])]
+                if candidates is None or len(indexed) < len(candidates):
+                    candidates = indexed
+
+        if candidates is None:
+            candidates = self.nodes
+
+        matches = [n for n in candidates if all(self._match(n, m, v) for m, v in calls if m != "instance")]
+        if instance is not None:
+            return matches[instance:instance + 1]
+        return matches
+
+    @staticmethod
+    def _match(node: SnapshotNode, method: str, value) -> bool:
+        attr, kind = _UISELECTOR_METHODS[method]
+        actual = node.attrs.get(attr, "")
+        if kind == "eq":
+            return actual == value
+        if kind == "contains":
+            return value in actual
+        if kind == "startswith":
+            return actual.startswith(value)
+        if kind == "regex":
+            return re.fullmatch(value, actual) is not None
+        if kind == "bool":
+            return actual == ("true" if value else "false")
+        if kind == "int":
+            return actual == str(value)
+        return False
+
+    def find_xpath(self, xpath: str) -> List[SnapshotNode]:
+        """Returns nodes matching an XPath expression."""
+        try:
+            if HAS_LXML:
+                result = self._root.getroottree().xpath(xpath)
+            else:
+                # ElementPath needs a path relative to the root element
+                result = self._root.findall("." + xpath if xpath.startswith("/") else xpath)
+        except Exception as e:
+            raise UnsupportedSelector(f"{xpath}: {e}")
+        return [self._element_to_node[e] for e in result if e in self._element_to_node]
+
+    def find(self, by: str, selector: str) -> List[SnapshotNode]:
+        """Dispatches on the Appium locator strategy."""
+        if by == AppiumBy.ANDROID_UIAUTOMATOR:
+            return self.find_uiselector(selector)
+        if by == AppiumBy.XPATH:
+            return self.find_xpath(selector)
+        if by == AppiumBy.ID:
+            return [self.nodes[i] for i in self._by_attr["resource-id"].get(selector, [])]
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            return [self.nodes[i] for i in self._by_attr["content-desc"].get(selector, [])]
+        if by == AppiumBy.CLASS_NAME:
+            return [self.nodes[i] for i in self._by_attr["class"].get(selector, [])]
+        raise UnsupportedSelector(f"{by}: {selector}")
+
+
+# ---------------------------------------------------------------------------
+# Per-driver snapshot cache
+# ---------------------------------------------------------------------------
+
+_snapshots = weakref.WeakKeyDictionary()
+
+
+def get_snapshot(driver) -> HierarchySnapshot:
+    """Returns the current snapshot of the driver's screen (one page_source call if not cached)."""
+    snapshot = _snapshots.get(driver)
+    if snapshot is None:
+        snapshot = _snapshots[driver] = HierarchySnapshot(driver.page_source)
+    return snapshot
+
+
+def invalidate_snapshot(driver) -> None:
+    """Drops the cached snapshot, e.g. after any action that may change the screen."""
+    _snapshots.pop(driver, None)
+
+
+def invalidates_snapshot(method):
+    """Decorator for action methods (self.driver) - invalidates the snapshot after the action."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            invalidate_snapshot(self.driver)
+    return wrapper
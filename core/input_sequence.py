@@ -0,0 +1,189 @@
+from typing import List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+from utils.adb_transport import run_adb
+from utils.driver_setup import driver_device_name
+
+# Android key codes used by the framework
+KEYCODE_DPAD_UP = 19
+KEYCODE_DPAD_DOWN = 20
+KEYCODE_DPAD_LEFT = 21
+KEYCODE_DPAD_RIGHT = 22
+KEYCODE_TAB = 61
+KEYCODE_SPACE = 62
+KEYCODE_ENTER = 66
+KEYCODE_DEL = 67
+KEYCODE_ESCAPE = 111
+
+# Android key code -> WebDriver key (W3C key actions); other keys need the shell backend
+WEBDRIVER_KEYS = {
+    KEYCODE_DPAD_UP: Keys.ARROW_UP,
+    KEYCODE_DPAD_DOWN: Keys.ARROW_DOWN,
+    KEYCODE_DPAD_LEFT: Keys.ARROW_LEFT,
+    KEYCODE_DPAD_RIGHT: Keys.ARROW_RIGHT,
+    KEYCODE_TAB: Keys.TAB,
+    KEYCODE_SPACE: Keys.SPACE,
+    KEYCODE_ENTER: Keys.ENTER,
+    KEYCODE_DEL: Keys.BACKSPACE,
+    KEYCODE_ESCAPE: Keys.ESCAPE,
+}
+
+
+class InputSequence:
+    """
+    Key presses, taps, swipes and pauses sent to the device in one go.
+
+        sequence = InputSequence().key(KEYCODE_ENTER).pause(200).keys(KEYCODE_DPAD_DOWN, KEYCODE_ENTER)
+        click_actions.perform_sequence(sequence)
+
+    Sequences with taps/swipes compile to a single W3C actions payload, key-only
+    sequences to a single 'input keyevent a b c' shell call. Pauses are executed
+    on the device (W3C pause / 'sleep'), not in the test process.
+    """
+
+    def __init__(self):
+        self.events: List[tuple] = []
+
+    def key(self, keycode: int, delay_ms: int = 0) -> "InputSequence":
+        """Presses a key; delay_ms pauses on the device after it."""
+        self.events.append(("key", int(keycode)))
+        return self.pause(delay_ms)
+
+    def keys(self, *keycodes: int, delay_ms: int = 0) -> "InputSequence":
+        """Presses several keys, with delay_ms between them."""
+        for i, keycode in enumerate(keycodes):
+            self.key(keycode, delay_ms if i < len(keycodes) - 1 else 0)
+        return self
+
+    def tap(self, x: int, y: int, delay_ms: int = 0) -> "InputSequence":
+        self.events.append(("tap", int(x), int(y)))
+        return self.pause(delay_ms)
+
+    def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration_ms: int = 200,
+              delay_ms: int = 0) -> "InputSequence":
+        self.events.append(("swipe", int(start_x), int(start_y), int(end_x), int(end_y), int(duration_ms)))
+        return self.pause(delay_ms)
+
+    def pause(self, duration_ms: int) -> "InputSequence":
+        if duration_ms > 0:
+            self.events.append(("pause", int(duration_ms)))
+        return self
+
+    @property
+    def has_pointer_events(self) -> bool:
+        return any(event[0] in ("tap", "swipe") for event in self.events)
+
+    @property
+    def w3c_compatible(self) -> bool:
+        return all(event[0] != "key" or event[1] in WEBDRIVER_KEYS for event in self.events)
+
+    def to_shell(self) -> str:
+        """'input keyevent 66 20 66; sleep 0.2; input tap 540 1200' - consecutive keys share one input call."""
+        commands, pending_keys = [], []
+
+        def flush_keys():
+            if pending_keys:
+                commands.append("input keyevent " + " ".join(pending_keys))
+                pending_keys.clear()
+
+        for event in self.events:
+            if event[0] == "key":
+                pending_keys.append(str(event[1]))
+                continue
+            flush_keys()
+            if event[0] == "pause":
+                commands.append(f"sleep {event[1] / 1000:g}")
+            elif event[0] == "tap":
+                commands.append(f"input tap {event[1]} {event[2]}")
+            elif event[0] == "swipe":
+                commands.append(f"input swipe {event[1]} {event[2]} {event[3]} {event[4]} {event[5]}")
+        flush_keys()
+        return "; ".join(commands)
+
+    def to_w3c_actions(self) -> List[dict]:
+        """
+        One W3C actions payload with a touch pointer and a keyboard source.
+        Both sources advance tick by tick, the idle one pauses, so the events
+        run in the given order.
+        """
+        pointer, keyboard = [], []
+
+        def tick(pointer_action: Optional[dict] = None, key_action: Optional[dict] = None, duration: int = 0):
+            pointer.append(pointer_action or {"type": "pause", "duration": duration})
+            keyboard.append(key_action or {"type": "pause", "duration": duration})
+
+        for event in self.events:
+            kind = event[0]
+            if kind == "key":
+                value = WEBDRIVER_KEYS[event[1]]
+                tick(key_action={"type": "keyDown", "value": value})
+                tick(key_action={"type": "keyUp", "value": value})
+            elif kind == "pause":
+                tick(duration=event[1])
+            elif kind == "tap":
+                tick(pointer_action={"type": "pointerMove", "duration": 0, "x": event[1], "y": event[2]})
+                tick(pointer_action={"type": "pointerDown", "button": 0})
+                tick(pointer_action={"type": "pause", "duration": 50})
+                tick(pointer_action={"type": "pointerUp", "button": 0})
+            elif kind == "swipe":
+                tick(pointer_action={"type": "pointerMove", "duration": 0, "x": event[1], "y": event[2]})
+                tick(pointer_action={"type": "pointerDown", "button": 0})
+                tick(pointer_action={"type": "pointerMove", "duration": event[5], "x": event[3], "y": event[4]})
+                tick(pointer_action={"type": "pointerUp", "button": 0})
+
+        return [
+            {"type": "pointer", "id": "finger", "parameters": {"pointerType": "touch"}, "actions": pointer},
+            {"type": "key", "id": "keyboard", "actions": keyboard},
+        ]
+
+    def __len__(self):
+        return len(self.events)
+
+    def __repr__(self):
+        return f"InputSequence({self.to_shell()!r})"
+
+
+def _run_shell(driver, script: str) -> None:
+    """
+    Runs the script with one 'mobile: shell' request. Appium servers started
+    without '--allow-insecure adb_shell' reject it; then the script goes through
+    the local adb transport instead (remembered per driver).
+    """
+    if not getattr(driver, "_mobile_shell_unavailable", False):
+        tokens = script.split()
+        try:
+            driver.execute_script("mobile: shell", {"command": tokens[0], "args": tokens[1:]})
+            return
+        except WebDriverException as e:
+            message = str(e).lower()
+            if "insecure" not in message and "adb_shell" not in message and "relaxed" not in message:
+                raise
+            driver._mobile_shell_unavailable = True
+
+    rc, out, err = run_adb(["adb", "-s", driver_device_name(driver), "shell", script])
+    if rc != 0:
+        raise WebDriverException(f"Input sequence failed (rc={rc}): {err or out}")
+
+
+def perform_sequence(driver, sequence: InputSequence, backend: str = "auto") -> str:
+    """
+    Sends the whole sequence in one request.
+
+    :param backend: 'auto' (W3C actions when there are taps/swipes, shell otherwise), 'w3c' or 'shell'
+    :return: Backend used
+    """
+    if not sequence.events:
+        return backend
+    if backend == "auto":
+        backend = "w3c" if sequence.has_pointer_events and sequence.w3c_compatible else "shell"
+
+    if backend == "w3c":
+        driver.execute(Command.W3C_ACTIONS, {"actions": sequence.to_w3c_actions()})
+    elif backend == "shell":
+        _run_shell(driver, sequence.to_shell())
+    else:
+        raise ValueError(f"Unknown input backend: {backend}")
+    return backend
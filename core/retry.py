@@ -0,0 +1,103 @@
+import random
+import time
+from typing import Optional, Tuple, Type
+
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+try:
+    from urllib3.exceptions import ProtocolError
+except ImportError:  # urllib3 always comes with selenium; keep the classifier importable anyway
+    ProtocolError = ConnectionError
+
+# Errors worth another attempt: the UI was still moving or the session hiccuped
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    StaleElementReferenceException,
+    TimeoutException,
+    ConnectionError,
+    ProtocolError,
+)
+
+# WebDriverException messages of a crashed/restarting UiAutomator2 server
+UIA2_CRASH_MESSAGES = (
+    "instrumentation process is not running",
+    "uiautomator2 server",
+    "could not proxy command",
+    "cannot be proxied",
+    "socket hang up",
+    "econnrefused",
+    "econnreset",
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    True for errors a retry can fix: stale elements, timeouts (also unmet
+    post-conditions) and UiAutomator2 crashes. Assertion errors and everything
+    else are permanent.
+    """
+    if isinstance(error, AssertionError):
+        return False
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        return any(text in message for text in UIA2_CRASH_MESSAGES)
+    return False
+
+
+class RetryPolicy:
+    """
+    Retry-until-success policy for StepExecutor.execute_step(retry=...).
+
+    The step stops at the first success. Transient errors (is_transient) are
+    retried with exponential backoff and full jitter, up to max_attempts and
+    within an overall deadline; any other error fails the step immediately.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 5.0,
+                 deadline: Optional[float] = 60.0, jitter: bool = True):
+        """
+        :param max_attempts: Maximum number of attempts (first try included)
+        :param base_delay: Backoff before the 2nd attempt (seconds), doubled after every further attempt
+        :param max_delay: Upper bound of a single backoff (seconds)
+        :param deadline: Overall time budget of the step in seconds (None = no deadline)
+        :param jitter: Randomize each backoff in [0, delay] to spread out parallel workers
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.jitter = jitter
+
+    def backoff(self, attempt: int) -> float:
+        """Delay after the given (1-based) failed attempt."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, attempt: int, error: BaseException, started: float) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt, or None if the step must fail now
+        (permanent error, attempts used up or deadline reached).
+
+        :param attempt: Number of the attempt that just failed (1-based)
+        :param error: Exception raised by that attempt
+        :param started: time.monotonic() of the first attempt
+        """
+        if attempt >= self.max_attempts or not is_transient(error):
+            return None
+        delay = self.backoff(attempt)
+        if self.deadline is not None and time.monotonic() + delay >= started + self.deadline:
+            return None
+        return delay
+
+    def __repr__(self):
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+                f"max_delay={self.max_delay}, deadline={self.deadline})")
+
+
+# Flakiness protection for most steps (execute_step(..., retry=DEFAULT_RETRY) or retry=True)
+DEFAULT_RETRY = RetryPolicy()
@@ -1,7 +1,6 @@
 import allure
-import pytest
+import hashlib
 import time
-import logging
 
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.common import NoSuchElementException
@@ -9,51 +8,135 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.common.actions.pointer_input import PointerInput
 
-logging.basicConfig(level=logging.INFO)
+from core.conditions import no_implicit_wait, wait_for
+from core.hierarchy_snapshot import UnsupportedSelector, get_snapshot, invalidate_snapshot, invalidates_snapshot
+from core.retry import DEFAULT_RETRY, is_transient
+from utils.framework_log import get_logger
+from utils.logcat_collector import logcat_capture
+from utils.resource_sampler import resource_sampler
+from utils.step_log import step_log
+from utils.step_metrics import record_wait, step_metrics
+
+SCROLLABLE_CONTAINER = 'new UiSelector().scrollable(true)'
+
+log = get_logger("steps")
+
+
+def _fail(message: str) -> None:
+    import pytest  # only needed when a step fails (already loaded under pytest)
+
+    pytest.fail(message)
 
 
 class StepExecutor:
     def __init__(self, driver):
         self.driver = driver  # Driver
 
-    def execute_step(self, description: object, step_function: object, repeat_count: object = 1) -> object:
+    def execute_step(self, description: object, step_function: object, repeat_count: object = 1,
+                     until: object = None, timeout: float = 10, retry: object = None) -> object:
         """
-        Executes a step exactly `repeat_count` times, even if the step succeeds.
+        Executes a step `repeat_count` times, even if it succeeds; only an error in the last
+        attempt fails the step. An attempt is the step function plus its `until` post-conditions.
+        With `retry` the step runs until its first success instead (see core/retry.py).
 
         :param description: Step description
         :param step_function: Function that executes the step
-        :param repeat_count: Number of repeats (optional, default is 1)
+        :param repeat_count: Number of repeats (optional, default is 1; ignored with `retry`)
+        :param until: Post-condition(s) from core.conditions (e.g. element_present(...)).
+                      After the step they are polled until they hold, instead of a fixed sleep;
+                      an attempt whose conditions are not met within `timeout` is an error.
+        :param timeout: Deadline in seconds for the `until` conditions
+        :param retry: RetryPolicy (or True for DEFAULT_RETRY): stop on the first success, retry only
+                      transient errors (stale element, timeout, UiAutomator2 crash) with exponential
+                      backoff and jitter within the policy deadline; other errors fail immediately
         """
-        with allure.step(description):
-            print(f"Starting step: {description}, repetitions: {repeat_count}")
-
-            for i in range(repeat_count):
-                try:
-                    print(f"{description} - Attempt {i + 1}/{repeat_count}")
-                    step_function()  # Call the passed function
-                    allure.attach(
-                        body=f"{description} - Success (Attempt {i + 1})",
-                        name="Success",
-                        attachment_type=allure.attachment_type.TEXT
-                    )
-                    print(f"{description} - Success after attempt {i + 1}")
-                except Exception as e:
-                    print(f"{description} - Error after attempt {i + 1}: {e}")
-                    allure.attach(
-                        body=f"{description} - Error (Attempt {i + 1}): {e}",
-                        name="Error",
-                        attachment_type=allure.attachment_type.TEXT
-                    )
-
-                    if i == repeat_count - 1:
-                        pytest.fail(f"{description} - Error after {repeat_count} attempts: {e}")
-
-                if i < repeat_count - 1:
-                    print(f"{description} - Waiting before the next attempt...")
-                    time.sleep(1)  # delay
-
-            print(f"{description} - Completed {repeat_count} attempts.")
-
+        conditions = [] if until is None else (list(until) if isinstance(until, (list, tuple)) else [until])
+        if retry is True:
+            retry = DEFAULT_RETRY
+        logcat_capture.mark_step(description)
+
+        with allure.step(description), step_metrics.step(description) as metrics:
+            try:
+                if retry:
+                    self._run_with_retry(description, step_function, conditions, timeout, retry, metrics)
+                else:
+                    self._run_repeated(description, step_function, conditions, timeout, repeat_count, metrics)
+            finally:
+                record = metrics.finish().as_dict()
+                resources = resource_sampler.step_stats(description, metrics.start,
+                                                        metrics.start + metrics.wall_time)
+                if resources:
+                    record["resources"] = resources  # app CPU/memory/fps min/avg/max during the step
+                step_log.step_finished(description, record)
+
+    def _run_attempt(self, description, step_function, conditions, timeout, attempt):
+        """One attempt: step function plus post-conditions; raises on failure."""
+        for condition in conditions:
+            condition.prepare(self.driver)
+        try:
+            step_function()  # Call the passed function
+        finally:
+            # The step may act on the driver directly (e.g. driver.press_keycode), so any cached
+            # hierarchy snapshot (core/hierarchy_snapshot.py) is outdated now
+            invalidate_snapshot(self.driver)
+        if conditions:
+            waited = wait_for(self.driver, conditions, timeout=timeout)
+            log.debug("%s - Post-conditions met after %.2fs", description, waited)
+        step_log.attempt(description, attempt, "passed", f"{description} - Success (Attempt {attempt})")
+        log.info("%s - Success after attempt %d", description, attempt)
+
+    def _run_repeated(self, description, step_function, conditions, timeout, repeat_count, metrics):
+        log.info("Starting step: %s, repetitions: %d", description, repeat_count)
+
+        for i in range(repeat_count):
+            metrics.attempts = i + 1
+            try:
+                log.debug("%s - Attempt %d/%d", description, i + 1, repeat_count)
+                self._run_attempt(description, step_function, conditions, timeout, i + 1)
+            except Exception as e:
+                log.warning("%s - Error after attempt %d: %s", description, i + 1, e)
+                step_log.attempt(description, i + 1, "failed", f"{description} - Error (Attempt {i + 1}): {e}")
+
+                if i == repeat_count - 1:
+                    metrics.status = "failed"
+                    _fail(f"{description} - Error after {repeat_count} attempts: {e}")
+
+            if i < repeat_count - 1:
+                log.debug("%s - Waiting before the next attempt...", description)
+                time.sleep(1)  # delay
+                record_wait(1)
+
+        metrics.status = "passed"
+        log.debug("%s - Completed %d attempts.", description, repeat_count)
+
+    def _run_with_retry(self, description, step_function, conditions, timeout, policy, metrics):
+        log.info("Starting step: %s, %s", description, policy)
+        started = time.monotonic()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            metrics.attempts = attempt
+            try:
+                log.debug("%s - Attempt %d/%d", description, attempt, policy.max_attempts)
+                self._run_attempt(description, step_function, conditions, timeout, attempt)
+                metrics.status = "passed"
+                return
+            except Exception as e:
+                log.warning("%s - Error after attempt %d: %s", description, attempt, e)
+                step_log.attempt(description, attempt, "failed", f"{description} - Error (Attempt {attempt}): {e}")
+
+                delay = policy.next_delay(attempt, e, started)
+                if delay is None:
+                    metrics.status = "failed"
+                    reason = "transient error, no attempts or time left" if is_transient(e) else "not retryable"
+                    _fail(f"{description} - Error after {attempt} attempts ({reason}): {e}")
+
+            log.info("%s - Retrying in %.2fs...", description, delay)
+            time.sleep(delay)
+            record_wait(delay)
+
+    @invalidates_snapshot
     def expand_notification_shade(self, hold_ms: int = 300, pull_percent: float = 0.85) -> None:
         """
         Expands the top notification bar with a gesture like a physical user:
@@ -96,6 +179,7 @@ class StepExecutor:
 
         actions.perform()
 
+    @invalidates_snapshot
     def fast_scroll(self):
         """
         Instantly scrolls to the end of a scrollable view using the flingToEnd(3) method.
@@ -106,57 +190,112 @@ class StepExecutor:
                 AppiumBy.ANDROID_UIAUTOMATOR,
                 'new UiScrollable(new UiSelector().scrollable(true)).flingToEnd(3)'
             )
-            print("Fast scroll to the end of the page completed.")
+            log.debug("Fast scroll to the end of the page completed.")
         except NoSuchElementException:
-            print("Unable to scroll the page. Make sure the view is scrollable.")
+            log.warning("Unable to scroll the page. Make sure the view is scrollable.")
 
-    def scroll_page(self, scroll_percent=15, max_scrolls=15):
+    @staticmethod
+    def _scroll_fingerprint(snapshot):
+        """
+        Compact fingerprint of the visible content of the first scrollable
+        container: class, text, content-desc and bounds of every node below it,
+        so rows that are text-less ViewGroups still differ after a swipe of whole
+        rows. Taken from one hierarchy snapshot (a single page_source request)
+        instead of a find/attribute round trip per item. Falls back to a hash of
+        the page source when there is no scrollable container.
+        """
+        containers = snapshot.find_uiselector(SCROLLABLE_CONTAINER)
+        if containers:
+            return tuple((node.get("class"), node.text, node.get("content-desc"), node.get("bounds"))
+                         for node in snapshot.descendants(containers[0]))
+        return hashlib.md5(snapshot.page_source.encode("utf-8")).hexdigest()
+
+    @invalidates_snapshot
+    def _swipe_up(self, scroll_percent, size=None):
+        """:param size: Window size if already known (one get_window_size() per scroll, not per swipe)"""
+        size = size or self.driver.get_window_size()
+        screen_height = size["height"]
+        start_x = size["width"] // 2
+
+        # Calculate scroll distance based on percentage
+        scroll_distance = int(screen_height * (scroll_percent / 100))
+
+        start_y = int(screen_height * 0.8)
+        end_y = start_y - scroll_distance
+        self.driver.swipe(start_x, start_y, start_x, end_y, duration=200)
+
+    def scroll_page(self, scroll_percent=15, max_scrolls=15, settle=0.3):
         """
         Scrolls the page down by a given percentage of the screen height
         until the end of the view is reached or the maximum number of scrolls is met.
+        The end of the view is detected from a fingerprint of the scrollable
+        container's content (see _scroll_fingerprint): one page_source request
+        per scroll, compared by the visible items only.
 
         :param scroll_percent: Percentage of the screen height to scroll (e.g. 15 for 15%)
         :param max_scrolls: Maximum number of scroll attempts
+        :param settle: Pause after each swipe for the list to stop moving (seconds)
         """
         try:
             size = self.driver.get_window_size()
-            screen_height = size["height"]
-            start_x = size["width"] // 2
-
-            # Calculate scroll distance based on percentage
-            scroll_distance = int(screen_height * (scroll_percent / 100))
-
-            start_y = int(screen_height * 0.8)
-            end_y = start_y - scroll_distance
-
-            previous_page_source = ""
+            previous_fingerprint = None
 
             for i in range(max_scrolls):
-                current_page_source = self.driver.page_source
+                current_fingerprint = self._scroll_fingerprint(get_snapshot(self.driver))
 
-                if current_page_source == previous_page_source:
-                    print(
-                        f"Scrolling stopped – end of page reached after {i} scrolls."
-                    )
+                if current_fingerprint == previous_fingerprint:
+                    log.debug("Scrolling stopped – end of page reached after %d scrolls.", i)
                     break
 
-                self.driver.swipe(
-                    start_x,
-                    start_y,
-                    start_x,
-                    end_y,
-                    duration=200
-                )
-                print(f"Scroll {i + 1}: scrolled {scroll_percent}% of the screen height")
-
-                previous_page_source = current_page_source
-                time.sleep(0.5)
+                self._swipe_up(scroll_percent, size)
+                log.debug("Scroll %d: scrolled %s%% of the screen height", i + 1, scroll_percent)
 
-            time.sleep(1)
+                previous_fingerprint = current_fingerprint
+                time.sleep(settle)
 
         except Exception as e:
             raise RuntimeError(f"Error while scrolling the page: {e}")
 
+    def scroll_until_found(self, selector, scroll_percent=30, max_scrolls=15, settle=0.3,
+                           by=AppiumBy.ANDROID_UIAUTOMATOR):
+        """
+        Scrolls down until an element matching the selector is on screen and returns it.
+        Stops early when the end of the view is reached.
+
+        :param selector: Element selector (UiSelector by default)
+        :param scroll_percent: Percentage of the screen height to scroll per swipe
+        :param max_scrolls: Maximum number of scroll attempts
+        :param settle: Pause after each swipe (seconds)
+        :param by: Locator strategy of the selector
+        :raises NoSuchElementException: if the element was not found
+        """
+        with no_implicit_wait(self.driver):
+            size = None  # read once per call, on the first swipe
+            previous_fingerprint = None
+
+            for i in range(max_scrolls + 1):
+                snapshot = get_snapshot(self.driver)
+                try:
+                    on_screen = bool(snapshot.find(by, selector))
+                except UnsupportedSelector:
+                    on_screen = True  # cannot be answered locally - ask the server
+                elements = self.driver.find_elements(by, selector) if on_screen else []
+                if elements:
+                    log.debug("Element '%s' found after %d scrolls.", selector, i)
+                    return elements[0]
+
+                current_fingerprint = self._scroll_fingerprint(snapshot)
+                if current_fingerprint == previous_fingerprint or i == max_scrolls:
+                    break
+
+                size = size or self.driver.get_window_size()
+                self._swipe_up(scroll_percent, size)
+                previous_fingerprint = current_fingerprint
+                time.sleep(settle)
+
+        raise NoSuchElementException(f"Element '{selector}' not found after scrolling.")
+
+    @invalidates_snapshot
     def swipe_from_center_to_right(self, hold_ms: int = 100) -> None:
         """
         Simulates a finger swipe from the center of the screen to the right edge.
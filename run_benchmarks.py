@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Reference run every benchmark run is compared with (tracked in git, so it exists on a clean checkout);
+# only replaced by 'python run_benchmarks.py --update-baseline'
+BASELINE_FILE = os.path.join('tests', 'benchmarks', 'baseline.json')
+# History of all runs and the merge-base baselines of --base (pytest-benchmark storage, not tracked)
+BENCHMARK_STORAGE = os.path.join('metrics', 'benchmarks')
+BENCHMARK_TESTS = os.path.join('tests', 'benchmarks')
+# Median, not mean: single scheduler hiccups on a shared machine move the mean of the sub-ms benchmarks by 30%+
+DEFAULT_FAIL_THRESHOLD = 'median:25%'
+
+
+def build_pytest_args(save=True, compare=True, fail_threshold=DEFAULT_FAIL_THRESHOLD, update_baseline=False,
+                      baseline=BASELINE_FILE, extra=()):
+    """
+    pytest command line for the benchmark suite. Allure output is disabled
+    (-o addopts=); the run is compared with the fixed baseline file and
+    --benchmark-compare-fail makes pytest exit non-zero on a regression.
+
+    :param save: Also keep the run in metrics/benchmarks (history only)
+    :param update_baseline: Write this run to the baseline file instead of comparing with it
+    """
+    args = [sys.executable, '-m', 'pytest', BENCHMARK_TESTS, '-o', 'addopts=', '-q',
+            f'--benchmark-storage=file://{os.path.abspath(BENCHMARK_STORAGE)}',
+            '--benchmark-columns=min,mean,median,rounds']
+    if save:
+        args.append('--benchmark-autosave')
+    if update_baseline:
+        args.append(f'--benchmark-json={baseline}')
+    elif compare:
+        args += [f'--benchmark-compare={baseline}', f'--benchmark-compare-fail={fail_threshold}']
+    return args + list(extra)
+
+
+def record_base_baseline(ref):
+    """
+    Runs the benchmark suite of the merge base of HEAD and `ref` on this machine,
+    in a temporary git worktree, and writes it as a baseline to metrics/benchmarks.
+    Comparing with it measures only what the branch changed, not the host.
+
+    :param ref: Branch or commit the current work is based on (e.g. main)
+    :return: Path of the written baseline file
+    """
+    base = subprocess.check_output(['git', 'merge-base', 'HEAD', ref], text=True).strip()
+    path = os.path.abspath(os.path.join(BENCHMARK_STORAGE, f'baseline_{base[:12]}.json'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    worktree = tempfile.mkdtemp(prefix='benchmark_base_')
+    subprocess.check_call(['git', 'worktree', 'add', '--detach', '--quiet', worktree, base])
+    try:
+        if not os.path.isdir(os.path.join(worktree, BENCHMARK_TESTS)):
+            sys.exit(f"{ref} (merge base {base[:12]}) has no {BENCHMARK_TESTS}; compare with {BASELINE_FILE}.")
+        command = build_pytest_args(save=False, update_baseline=True, baseline=path)
+        print(f"Benchmarking merge base {base[:12]} in {worktree}")
+        if subprocess.call(command, cwd=worktree) != 0:
+            sys.exit(f"Benchmarks of merge base {base[:12]} failed.")
+    finally:
+        subprocess.call(['git', 'worktree', 'remove', '--force', worktree])
+    slim_baseline(path)
+    return path
+
+
+def slim_baseline(path=BASELINE_FILE):
+    """Drops the per-round timings from a saved run; the comparison only needs the summary stats."""
+    with open(path, 'r', encoding='utf-8') as f:
+        run = json.load(f)
+    for benchmark in run['benchmarks']:
+        benchmark['stats'].pop('data', None)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+        f.write('\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Offline framework benchmarks (fake Appium/adb servers); fails on regressions')
+    parser.add_argument('--no-save', action='store_true', help='Do not keep this run in metrics/benchmarks')
+    parser.add_argument('--no-compare', action='store_true', help=f'Do not compare with {BASELINE_FILE}')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help=f'Write this run to {BASELINE_FILE} (commit it) instead of comparing with it')
+    parser.add_argument('--base', metavar='REF',
+                        help='Compare with the merge base of HEAD and REF (e.g. main), benchmarked on this '
+                             f'machine first, instead of {BASELINE_FILE}')
+    parser.add_argument('--fail', default=DEFAULT_FAIL_THRESHOLD,
+                        help=f'Regression threshold, e.g. median:25%% or min:0.005 (default: {DEFAULT_FAIL_THRESHOLD})')
+    args, extra = parser.parse_known_args()
+
+    if not (args.no_compare or args.update_baseline or args.base or os.path.isfile(BASELINE_FILE)):
+        sys.exit(f"No benchmark baseline at {BASELINE_FILE}. Create it with --update-baseline "
+                 f"or run with --no-compare.")
+
+    baseline = BASELINE_FILE
+    if args.base and not (args.no_compare or args.update_baseline):
+        baseline = record_base_baseline(args.base)
+
+    command = build_pytest_args(save=not args.no_save, compare=not args.no_compare,
+                                fail_threshold=args.fail, update_baseline=args.update_baseline,
+                                baseline=baseline, extra=extra)
+    print(' '.join(command))
+    exit_code = subprocess.call(command)
+    if args.update_baseline and exit_code == 0:
+        slim_baseline()
+        print(f"Baseline written to {BASELINE_FILE}")
+    sys.exit(exit_code)
@@ -1,9 +1,23 @@
+import argparse
 import configparser
-import pytest
 import os
+import socket
+import subprocess
+import sys
+import time
+
+from utils.attachment_dedup import DEDUP_ENABLED, dedupe_attachments
+from utils.duration_history import TestHistory, file_key, record_results
+from utils.test_selection import DEFAULT_DURATION, MODES, budget_subset, order_tests, skip_unchanged
+
+# Defaults for parallel workers: every worker gets its own Appium port and UiAutomator2 systemPort
+BASE_APPIUM_PORT = 4723
+BASE_SYSTEM_PORT = 8200
+WORKER_LOGS_DIR = 'logs'
+
 
 def load_test_files(config_path='test_cases_selection.ini'):
-    # Load the configuration file
+    # Load the configuration file (read-only, the selection is kept between runs)
     config = configparser.ConfigParser()
     config.read(config_path)
 
@@ -13,26 +27,247 @@ def load_test_files(config_path='test_cases_selection.ini'):
     if 'tests' in config.sections():
         for test_file, flag in config.items('tests'):
             flag = flag.strip().upper() if flag.strip() else 'N'  # Default to "N" if variable is empty
-            config.set('tests', test_file, flag)  # Save the updated value to the config
 
             # Check if the test should be run (marked with 'Y-Yes')
             if flag == 'Y':
                 test_files.append(os.path.join('tests', 'regression', test_file.strip()))
 
-    # Save the modified configuration file
-    with open(config_path, 'w') as configfile:
-        config.write(configfile)
-
     return test_files
 
 
+def list_devices():
+    """
+    Returns serials of all attached devices/emulators in the 'device' state
+    (offline and unauthorized ones are skipped).
+    """
+    try:
+        proc = subprocess.run(['adb', 'devices'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              text=True, timeout=10, check=False)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Unable to list adb devices: {e}")
+        return []
+
+    devices = []
+    for line in proc.stdout.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == 'device':
+            devices.append(parts[0])
+    return devices
+
+
+def shard_tests(test_files, worker_count, durations=None):
+    """
+    Splits test files across workers, longest-first: each file (sorted by its
+    historical duration, descending) goes to the currently least-loaded worker.
+
+    :param test_files: Test file paths to distribute
+    :param worker_count: Number of workers
+    :param durations: Historical durations in seconds keyed by file_key()
+    :return: List of shards (lists of test file paths), one per worker
+    """
+    durations = durations or {}
+    shards = [[] for _ in range(worker_count)]
+    loads = [0.0] * worker_count
+
+    ordered = sorted(test_files, key=lambda f: durations.get(file_key(f), DEFAULT_DURATION), reverse=True)
+    for test_file in ordered:
+        idx = loads.index(min(loads))
+        shards[idx].append(test_file)
+        loads[idx] += durations.get(file_key(test_file), DEFAULT_DURATION)
+
+    return shards
+
+
+def _port_is_open(port, host='127.0.0.1'):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex((host, port)) == 0
+
+
+def start_appium_server(port, timeout=60):
+    """Starts an Appium server on the given port unless one is already listening."""
+    if _port_is_open(port):
+        return None
+
+    proc = subprocess.Popen(['appium', '--port', str(port), '--relaxed-security'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if _port_is_open(port):
+            print(f"Appium server started on port {port}.")
+            return proc
+        time.sleep(0.5)
+
+    proc.terminate()
+    raise RuntimeError(f"Appium server did not start on port {port} within {timeout}s.")
+
+
+def app_version(devices, app_package=None):
+    """versionCode of the app under test on the first device, or None if it cannot be read."""
+    if not devices:
+        return None
+    # Imported here: utils.driver_setup reads APPIUM_DEVICE/APPIUM_PORT when it is loaded,
+    # which must not happen in the runner process before the worker env is known
+    from utils.driver_setup import DEFAULT_APP_PACKAGE, probe_installed_version
+
+    version = probe_installed_version(app_package or DEFAULT_APP_PACKAGE, devices[0])
+    return version['versionCode'] if version else None
+
+
+def pytest_args(test_files, mode=None):
+    args = list(test_files) + ['--alluredir=reports']
+    if mode:
+        # keep the history order of the files; @pytest.mark.order only applies within a file
+        args.append('--order-scope=module')
+    return args
+
+
+def is_data_driven(test_file):
+    """True for test files parametrized from test_data_input/ (@pytest.mark.data_source)."""
+    try:
+        with open(test_file, 'r', encoding='utf-8') as f:
+            return 'mark.data_source' in f.read()
+    except OSError:
+        return False
+
+
+def run_parallel(test_files, devices, start_appium=False,
+                 base_port=BASE_APPIUM_PORT, base_system_port=BASE_SYSTEM_PORT,
+                 history=None, mode=None):
+    """
+    Runs the selected test files on all given devices in parallel. Every worker
+    is a separate pytest process with its own device, Appium port and systemPort;
+    all of them write Allure results into the shared 'reports' directory.
+
+    Data-driven files (@pytest.mark.data_source) run on every worker, each
+    worker taking every n-th row of the data (DATA_SHARD=<i>/<n>).
+
+    :param history: TestHistory used for sharding and ordering
+    :param mode: Order of the files within each shard (see utils.test_selection.MODES)
+    :return: Highest pytest exit code of all workers
+    """
+    history = history or TestHistory()
+    data_files = [f for f in test_files if is_data_driven(f)]
+    other_files = [f for f in test_files if f not in data_files]
+    worker_count = len(devices) if data_files else min(len(devices), len(test_files))
+    shards = shard_tests(other_files, worker_count, history.durations())
+    shards = [order_tests(shard + data_files, mode, history) for shard in shards]
+
+    os.makedirs(WORKER_LOGS_DIR, exist_ok=True)
+    servers = []
+    workers = []
+
+    try:
+        for i, (device, shard) in enumerate(zip(devices, shards)):
+            appium_port = base_port + i * 2  # keep a gap for the chromedriver/adb forward ports
+            system_port = base_system_port + i
+
+            if start_appium:
+                server = start_appium_server(appium_port)
+                if server:
+                    servers.append(server)
+
+            env = dict(os.environ,
+                       APPIUM_DEVICE=device,
+                       APPIUM_PORT=str(appium_port),
+                       APPIUM_SYSTEM_PORT=str(system_port),
+                       ANDROID_SERIAL=device,
+                       DATA_SHARD=f"{i}/{worker_count}")
+
+            log_path = os.path.join(WORKER_LOGS_DIR, f"worker_{i}_{device.replace(':', '_')}.log")
+            log_file = open(log_path, 'w')
+            print(f"Worker {i}: device={device} appium={appium_port} systemPort={system_port} "
+                  f"tests={len(shard)} log={log_path}")
+
+            proc = subprocess.Popen([sys.executable, '-m', 'pytest'] + pytest_args(shard, mode),
+                                    env=env, stdout=log_file, stderr=subprocess.STDOUT)
+            workers.append((i, device, proc, log_file))
+
+        exit_code = 0
+        for i, device, proc, log_file in workers:
+            rc = proc.wait()
+            log_file.close()
+            print(f"Worker {i} ({device}) finished with exit code {rc}.")
+            exit_code = max(exit_code, rc)
+    finally:
+        for server in servers:
+            server.terminate()
+
+    return exit_code
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run tests selected in test_cases_selection.ini.")
+    parser.add_argument('--devices', help="Comma-separated device serials (default: all attached devices)")
+    parser.add_argument('--serial', action='store_true', help="Run all selected tests in one pytest process")
+    parser.add_argument('--start-appium', action='store_true', help="Start an Appium server for each worker")
+    parser.add_argument('--base-port', type=int, default=BASE_APPIUM_PORT, help="Appium port of the first worker")
+    parser.add_argument('--base-system-port', type=int, default=BASE_SYSTEM_PORT,
+                        help="UiAutomator2 systemPort of the first worker")
+    parser.add_argument('--mode', choices=MODES,
+                        help="Order tests by history: previously failed first, or fastest first")
+    parser.add_argument('--budget', type=float, metavar='MINUTES',
+                        help="Only run the subset that fits into the time budget (failed first, then shortest)")
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help="Skip tests that passed last time with the same test file and app version")
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
+    args = parse_args()
+
     # Load selected tests from the configuration file
     selected_tests = load_test_files()
 
     # If tests were selected, run them
     if selected_tests:
-        pytest.main(selected_tests + ['--alluredir=reports'])
+        devices = args.devices.split(',') if args.devices else list_devices()
+        history = TestHistory()
+        version = app_version(devices)
+
+        selected_tests, unchanged, file_hashes = skip_unchanged(
+            selected_tests, history, version if args.skip_unchanged else None)
+        if unchanged:
+            print(f"Skipping {len(unchanged)} unchanged test(s) that passed on app version {version}: "
+                  + ", ".join(file_key(f) for f in unchanged))
+
+        mode = args.mode
+        if args.budget is not None:
+            selected_tests, over_budget = budget_subset(selected_tests, args.budget * 60, history,
+                                                        workers=1 if args.serial else max(1, len(devices)))
+            mode = mode or 'failed-first'
+            if over_budget:
+                print(f"{len(over_budget)} test(s) do not fit into {args.budget:g} min: "
+                      + ", ".join(file_key(f) for f in over_budget))
+
+        exit_code = 0
+        run_started_ms = int(time.time() * 1000)
+        if not selected_tests:
+            print("All selected tests were skipped.")
+        elif args.serial or len(devices) < 2 or len(selected_tests) < 2:
+            # Separate pytest process like the parallel workers, so the device is in its env at import time
+            env = dict(os.environ)
+            if devices:
+                env.setdefault('APPIUM_DEVICE', devices[0])
+            exit_code = subprocess.run([sys.executable, '-m', 'pytest']
+                                       + pytest_args(order_tests(selected_tests, mode, history), mode),
+                                       env=env).returncode
+        else:
+            exit_code = run_parallel(selected_tests, devices, start_appium=args.start_appium,
+                                     base_port=args.base_port, base_system_port=args.base_system_port,
+                                     history=history, mode=mode)
+        history.close()
+
+        record_results('reports', since_ms=run_started_ms, app_version=version, devices=devices,
+                       file_hashes=file_hashes)
+
+        # Identical attachments (e.g. "Success" texts) of this run are stored once (utils/attachment_dedup.py)
+        if DEDUP_ENABLED:
+            stats = dedupe_attachments('reports', since_ms=run_started_ms)
+            if stats and stats['removed']:
+                print(f"Allure attachments: {stats['attachments']} -> {stats['blobs']} files "
+                      f"({stats['bytes_saved'] / 1024:.1f} KB saved)")
+        sys.exit(exit_code)
     else:
         print(
             "No tests to run. Make sure the test_selection.ini file specifies which tests to execute.")
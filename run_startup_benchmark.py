@@ -0,0 +1,265 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import Attachment, Label, Parameter, Status, StatusDetails, TestResult
+
+from utils.adb_transport import run_adb
+from utils.driver_setup import (DEFAULT_APP_PACKAGE, DEFAULT_DEVICE_NAME, probe_installed_version,
+                                resolve_launcher_activity)
+
+# Startup reports (JSON, one per run, history only)
+STARTUP_METRICS_DIR = os.path.join('metrics', 'startup')
+# Pinned reference per package/device (tracked in git): created by the first run, replaced only with --update-baseline
+STARTUP_BASELINE_DIR = os.path.join('configs', 'startup_baselines')
+MODES = ('cold', 'warm', 'hot')
+DEFAULT_RUNS = 10
+DEFAULT_MAX_REGRESSION = 20.0  # % increase of the median TotalTime that fails the run
+AM_START_TIMEOUT = 60000  # ms
+
+KEYCODE_HOME = 3
+KEYCODE_BACK = 4
+
+_AM_START_FIELDS = re.compile(r"^(Status|LaunchState|Activity|TotalTime|WaitTime):\s*(.+)$", re.MULTILINE)
+
+
+def adb_shell(device, *command, timeout=5000):
+    return run_adb(['adb', '-s', device, 'shell'] + [str(part) for part in command], timeout=timeout)
+
+
+def am_start(device, component):
+    """
+    Starts the activity with 'am start -W' and returns its report:
+    {'status', 'launch_state', 'activity', 'total_time', 'wait_time'} (times in ms).
+    """
+    rc, out, err = adb_shell(device, 'am', 'start', '-W', '-n', component, timeout=AM_START_TIMEOUT)
+    fields = dict(_AM_START_FIELDS.findall(out or ''))
+    if rc != 0 or 'TotalTime' not in fields:
+        raise RuntimeError(f"am start failed (rc={rc}): {err or out}")
+    return {
+        'status': fields.get('Status', 'ok'),
+        'launch_state': fields.get('LaunchState', '').upper() or None,  # Android 10+
+        'activity': fields.get('Activity'),
+        'total_time': int(fields['TotalTime']),
+        'wait_time': int(fields['WaitTime']) if 'WaitTime' in fields else None,
+    }
+
+
+def prepare_launch(device, package, mode, trim_caches=True):
+    """
+    Brings the app into the state of the start mode:
+      cold - process killed (am force-stop), optionally with 'pm trim-caches'
+      warm - process alive, activity finished (BACK)
+      hot  - process and activity alive, app in the background (HOME)
+    """
+    if mode == 'cold':
+        adb_shell(device, 'am', 'force-stop', package)
+        if trim_caches:
+            adb_shell(device, 'pm', 'trim-caches', '999G', timeout=30000)
+    elif mode == 'warm':
+        adb_shell(device, 'input', 'keyevent', KEYCODE_BACK)
+    elif mode == 'hot':
+        adb_shell(device, 'input', 'keyevent', KEYCODE_HOME)
+    else:
+        raise ValueError(f"Unknown start mode {mode!r}, expected one of {MODES}")
+
+
+def measure_mode(device, package, component, mode, runs=DEFAULT_RUNS, trim_caches=True, settle=1.0):
+    """
+    Launches the app `runs` times in the given mode.
+
+    :param settle: Seconds to let the device calm down before every launch
+    :return: List of am_start() reports
+    """
+    if mode != 'cold':
+        am_start(device, component)  # the process must exist for warm/hot starts; not measured
+
+    samples = []
+    for i in range(runs):
+        prepare_launch(device, package, mode, trim_caches)
+        time.sleep(settle)
+        sample = am_start(device, component)
+        samples.append(sample)
+        print(f"{mode} #{i + 1}: TotalTime={sample['total_time']} ms WaitTime={sample['wait_time']} ms "
+              f"LaunchState={sample['launch_state']}")
+        if sample['launch_state'] and sample['launch_state'] != mode.upper():
+            print(f"  warning: the system reported a {sample['launch_state']} start for a {mode} run")
+    return samples
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(math.ceil(p / 100 * len(ordered))) - 1)]
+
+
+def summarize(values):
+    """count/min/max/mean/stdev/variance/p50/p90/p95 of a list of times (ms)."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(values),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': round(statistics.fmean(values), 2),
+        'stdev': round(statistics.stdev(values), 2) if len(values) > 1 else 0.0,
+        'variance': round(statistics.variance(values), 2) if len(values) > 1 else 0.0,
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'p95': percentile(ordered, 95),
+    }
+
+
+def baseline_path(device, package, directory=STARTUP_BASELINE_DIR):
+    return os.path.join(directory, f"{package}_{device.replace(':', '_')}.json")
+
+
+def load_baseline(path):
+    """Pinned baseline report, or None if there is none (yet)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(report, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = dict(report, modes={mode: {key: value for key, value in result.items() if key != 'samples'}
+                                   for mode, result in report['modes'].items()})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def find_regressions(report, baseline, max_regression=DEFAULT_MAX_REGRESSION):
+    """{mode: message} for modes whose median TotalTime grew by more than max_regression %."""
+    regressions = {}
+    if not baseline:
+        return regressions
+    for mode, result in report['modes'].items():
+        before = baseline.get('modes', {}).get(mode, {}).get('total_time', {}).get('p50')
+        after = result['total_time'].get('p50')
+        if before and after and (after - before) / before * 100 > max_regression:
+            regressions[mode] = (f"{mode} start p50 TotalTime {before} ms -> {after} ms "
+                                 f"(+{(after - before) / before * 100:.1f}%, limit {max_regression:g}%)")
+    return regressions
+
+
+def write_report(report, directory=STARTUP_METRICS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    device = report['device'].replace(':', '_')
+    path = os.path.join(directory, f"startup_{time.strftime('%Y-%m-%d_%H-%M-%S')}_{device}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def write_allure_results(report, regressions, started_ms, reports_dir='reports'):
+    """One Allure test result per start mode, so startup times show up next to the functional tests."""
+    logger = AllureFileLogger(reports_dir)
+    for mode, result in report['modes'].items():
+        full_name = f"run_startup_benchmark#{report['package']}#{mode}"
+        attachment = Attachment(name='Startup samples', source=f"{uuid.uuid4()}-attachment.json",
+                                type='application/json')
+        logger.report_attached_data(json.dumps(result, indent=2), attachment.source)
+
+        total = result['total_time']
+        test_result = TestResult(
+            uuid=str(uuid.uuid4()),
+            name=f"App start ({mode}): p50 {total.get('p50')} ms",
+            fullName=full_name,
+            historyId=hashlib.md5(f"{full_name}#{report['device']}".encode()).hexdigest(),
+            status=Status.FAILED if mode in regressions else Status.PASSED,
+            statusDetails=StatusDetails(message=regressions[mode]) if mode in regressions else None,
+            start=started_ms,
+            stop=int(time.time() * 1000),
+            labels=[Label(name='suite', value='Startup benchmark'), Label(name='host', value=report['device'])],
+            parameters=[Parameter(name=name, value=str(value)) for name, value in total.items()]
+            + [Parameter(name='app_version', value=str(report.get('app_version')))],
+            attachments=[attachment],
+        )
+        logger.report_result(test_result)
+
+
+def run_benchmark(device, package, activity=None, modes=MODES, runs=DEFAULT_RUNS, trim_caches=True, settle=1.0):
+    activity = activity or resolve_launcher_activity(package, device_name=device)
+    if not activity:
+        raise RuntimeError(f"No launcher activity found for {package} on {device}")
+    component = f"{package}/{activity}"
+
+    version = probe_installed_version(package, device)
+
+    report = {'device': device, 'package': package, 'component': component,
+              'app_version': version['versionCode'] if version else None,
+              'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'runs': runs, 'modes': {}}
+    for mode in modes:
+        samples = measure_mode(device, package, component, mode, runs, trim_caches, settle)
+        report['modes'][mode] = {
+            'total_time': summarize([s['total_time'] for s in samples]),
+            'wait_time': summarize([s['wait_time'] for s in samples]),
+            'launch_states': sorted({s['launch_state'] for s in samples if s['launch_state']}),
+            'samples': samples,
+        }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measures cold/warm/hot start times of the app with 'am start -W'.")
+    parser.add_argument('--device', default=DEFAULT_DEVICE_NAME, help="adb serial of the device")
+    parser.add_argument('--package', default=DEFAULT_APP_PACKAGE, help="Package of the app under test")
+    parser.add_argument('--activity', help="Launcher activity (default: resolved like create_driver())")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Launches per mode")
+    parser.add_argument('--modes', default=','.join(MODES), help="Comma-separated start modes (cold,warm,hot)")
+    parser.add_argument('--settle', type=float, default=1.0, help="Seconds to wait before every launch")
+    parser.add_argument('--no-trim', action='store_true', help="Do not run 'pm trim-caches' before cold starts")
+    parser.add_argument('--max-regression', type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Fail when a median TotalTime grows by more than this %% against the baseline")
+    parser.add_argument('--baseline', help=f"Baseline report (default: {STARTUP_BASELINE_DIR}/<package>_<device>.json)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Replace the baseline with this run (never when the run regressed)")
+    parser.add_argument('--no-allure', action='store_true', help="Do not write Allure results to reports/")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        sys.exit(f"Unknown start modes: {', '.join(sorted(unknown))}")
+
+    started_ms = int(time.time() * 1000)
+    baseline_file = args.baseline or baseline_path(args.device, args.package)
+    baseline = load_baseline(baseline_file)
+    report = run_benchmark(args.device, args.package, args.activity, modes, args.runs,
+                           trim_caches=not args.no_trim, settle=args.settle)
+    regressions = find_regressions(report, baseline, args.max_regression)
+
+    print(f"Startup report written to {write_report(report)}")
+    for mode, result in report['modes'].items():
+        total = result['total_time']
+        print(f"{mode:>5}: p50 {total['p50']} ms  p90 {total['p90']} ms  p95 {total['p95']} ms  "
+              f"mean {total['mean']} ms  stdev {total['stdev']} ms")
+    if not args.no_allure:
+        write_allure_results(report, regressions, started_ms)
+
+    for message in regressions.values():
+        print(f"REGRESSION: {message}")
+    if regressions:
+        if args.update_baseline:
+            print(f"Baseline {baseline_file} not updated: the run regressed.")
+    elif baseline is None or args.update_baseline:
+        save_baseline(report, baseline_file)
+        print(f"Baseline written to {baseline_file} (commit it to pin it)")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,79 @@
+import argparse
+import ast
+import os
+
+
+def _sleep_seconds(node):
+    """Returns the constant duration of a 'time.sleep(<number>)' / 'sleep(<number>)' call, else None."""
+    if not isinstance(node, ast.Call) or not node.args:
+        return None
+
+    func = node.func
+    is_sleep = ((isinstance(func, ast.Attribute) and func.attr == 'sleep'
+                 and isinstance(func.value, ast.Name) and func.value.id == 'time')
+                or (isinstance(func, ast.Name) and func.id == 'sleep'))
+    arg = node.args[0]
+    if is_sleep and isinstance(arg, ast.Constant) and isinstance(arg.value, (int, float)):
+        return float(arg.value)
+    return None
+
+
+def _own_nodes(func):
+    """Nodes of a function's body, without those of nested functions (they are reported on their own)."""
+    pending = list(ast.iter_child_nodes(func))
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        yield node
+        pending.extend(ast.iter_child_nodes(node))
+
+
+def collect_fixed_sleeps(paths):
+    """
+    Scans Python files for fixed sleeps and sums them per function.
+
+    :param paths: Files or directories to scan
+    :return: List of (file, function, number of sleeps, total seconds), longest first
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.endswith('.py'))
+        elif path.endswith('.py'):
+            files.append(path)
+
+    rows = []
+    for file_path in sorted(files):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=file_path)
+
+        for func in ast.walk(tree):
+            if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            sleeps = [s for s in (_sleep_seconds(n) for n in _own_nodes(func)) if s is not None]
+            if sleeps:
+                rows.append((file_path, func.name, len(sleeps), sum(sleeps)))
+
+    return sorted(rows, key=lambda r: r[3], reverse=True)
+
+
+def print_report(rows):
+    if not rows:
+        print("No fixed sleeps found.")
+        return
+
+    width = max(len(f"{r[0]}::{r[1]}") for r in rows)
+    print(f"{'Function'.ljust(width)}  {'Sleeps':>6}  {'Seconds':>8}")
+    for file_path, func, count, total in rows:
+        print(f"{f'{file_path}::{func}'.ljust(width)}  {count:>6}  {total:>8.1f}")
+    print(f"{'TOTAL'.ljust(width)}  {sum(r[2] for r in rows):>6}  {sum(r[3] for r in rows):>8.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List time spent in fixed time.sleep() calls per test/function.")
+    parser.add_argument('paths', nargs='*', default=['tests', 'core'], help="Files or directories to scan")
+    args = parser.parse_args()
+
+    print_report(collect_fixed_sleeps(args.paths))
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from tests.fakes.fake_adb_server import FakeAdbServer
+from tests.fakes.fake_appium_server import FakeAppiumServer
+from utils import adb_transport, throttling
+from utils.launcher_cache import launcher_cache
+from utils.step_log import step_log
+from utils.step_metrics import step_metrics
+
+# Dedicated serial, so the benchmark throttler never leaks into real test runs
+BENCH_DEVICE = "bench-5554"
+BENCH_PACKAGE = "com.okinc.okex.gp"
+
+# Canned device output for the adb calls made by create_driver()/app_state()
+ADB_COMMANDS = {
+    "cmd": f"{BENCH_PACKAGE}/.MainActivity",
+    "dumpsys": (
+        "    versionCode=600100 minSdk=24 targetSdk=34\n"
+        "    lastUpdateTime=2024-05-01 10:00:00\n"
+        f"  mResumedActivity: ActivityRecord{{1a2b u0 {BENCH_PACKAGE}/.MainActivity t12}}"
+    ),
+    "pidof": "4321",
+    "getprop": "1",
+    "log": "",
+}
+
+# Per-command latencies of the fake Appium server (seconds), roughly a fast local UiAutomator2
+APPIUM_LATENCY = {"default": 0.002, "new_session": 0.05, "source": 0.01}
+
+
+@pytest.fixture(scope="session")
+def fake_adb():
+    """Fake adb server; the persistent transport pool is pointed at it."""
+    with FakeAdbServer(devices=(BENCH_DEVICE,), commands=ADB_COMMANDS) as server:
+        previous_port = adb_transport.adb_pool.port
+        adb_transport.adb_pool.close_all()
+        adb_transport.adb_pool.port = server.port
+        yield server
+        adb_transport.adb_pool.close_all()
+        adb_transport.adb_pool.port = previous_port
+
+
+@pytest.fixture(scope="session")
+def fake_appium():
+    with FakeAppiumServer(latency=APPIUM_LATENCY) as server:
+        yield server
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_environment(tmp_path_factory):
+    """Unthrottled benchmark device, throwaway launcher cache, no step metrics files or step logs."""
+    throttling._throttlers[BENCH_DEVICE] = throttling.TokenBucketThrottler(BENCH_DEVICE, rate=1e6, burst=10 ** 6)
+    previous_cache_path = launcher_cache.path
+    launcher_cache.path = str(tmp_path_factory.mktemp("bench") / "launcher_cache.json")
+    launcher_cache._entries = None
+    yield
+    throttling._throttlers.pop(BENCH_DEVICE, None)
+    launcher_cache.path = previous_cache_path
+    launcher_cache._entries = None
+    step_metrics.records.clear()
+    step_log.clear()
+
+
+@pytest.fixture(scope="session")
+def bench_driver(fake_adb, fake_appium):
+    """One driver session against the fake servers, shared by the per-operation benchmarks."""
+    from utils.driver_setup import create_driver
+
+    driver = create_driver(device_name=BENCH_DEVICE, app_package=BENCH_PACKAGE, appium_port=fake_appium.port)
+    yield driver
+    driver.quit()
@@ -0,0 +1,126 @@
+"""
+Framework overhead benchmarks against the fake Appium/adb servers
+(tests/fakes). Run through run_benchmarks.py, which compares every run with
+the stored baseline and fails on regressions.
+"""
+import time
+
+import pytest
+
+from core.click_actions import ClickActions
+from core.conditions import element_present, wait_for
+from core.element_assertions import ElementAssertions
+from core.input_sequence import KEYCODE_ENTER, InputSequence
+from core.step_executor import StepExecutor
+from tests.benchmarks.conftest import BENCH_DEVICE, BENCH_PACKAGE
+from utils.adb_transport import _run_subprocess, run_adb
+from utils.throttling import TokenBucketThrottler
+
+ASSETS_SELECTOR = 'new UiSelector().descriptionContains("Assets")'
+
+
+@pytest.mark.benchmark(group="session")
+def test_session_setup(benchmark, fake_adb, fake_appium):
+    from utils.driver_setup import create_driver
+
+    def setup():
+        return create_driver(device_name=BENCH_DEVICE, app_package=BENCH_PACKAGE,
+                             appium_port=fake_appium.port)
+
+    driver = benchmark.pedantic(setup, rounds=3, iterations=1)
+    driver.quit()
+
+
+@pytest.mark.benchmark(group="actions")
+def test_click_element(benchmark, bench_driver):
+    click_actions = ClickActions(bench_driver)
+    benchmark(click_actions.click_element, ASSETS_SELECTOR)
+
+
+@pytest.mark.benchmark(group="actions")
+def test_press_key_sequence(benchmark, bench_driver):
+    click_actions = ClickActions(bench_driver)
+    benchmark(click_actions.press_enter_arrow_down_enter)
+
+
+@pytest.mark.benchmark(group="actions")
+def test_tap_sequence(benchmark, bench_driver):
+    click_actions = ClickActions(bench_driver)
+    sequence = InputSequence().tap(540, 1200).key(KEYCODE_ENTER).swipe(540, 1800, 540, 600)
+    benchmark(click_actions.perform_sequence, sequence)
+
+
+@pytest.mark.benchmark(group="actions")
+def test_execute_step(benchmark, bench_driver):
+    step_executor = StepExecutor(bench_driver)
+    click_actions = ClickActions(bench_driver)
+    benchmark(step_executor.execute_step, "Click Assets",
+              lambda: click_actions.click_element(ASSETS_SELECTOR),
+              until=element_present(ASSETS_SELECTOR))
+
+
+@pytest.mark.benchmark(group="actions")
+def test_scroll_page(benchmark, bench_driver, fake_appium):
+    step_executor = StepExecutor(bench_driver)
+
+    def reset_list():
+        fake_appium.scroll_position = 0
+
+    benchmark.pedantic(step_executor.scroll_page, kwargs={"settle": 0}, setup=reset_list, rounds=10)
+
+
+@pytest.mark.benchmark(group="assertions")
+def test_assertions_direct(benchmark, bench_driver):
+    element_assertions = ElementAssertions(bench_driver)
+
+    def checks():
+        for _ in range(5):
+            element_assertions.check_text_content_desc("Assets")
+
+    benchmark(checks)
+
+
+@pytest.mark.benchmark(group="assertions")
+def test_assertions_snapshot(benchmark, bench_driver):
+    element_assertions = ElementAssertions(bench_driver)
+
+    def checks():
+        with element_assertions.snapshot():
+            for _ in range(5):
+                element_assertions.check_text_content_desc("Assets")
+
+    benchmark(checks)
+
+
+@pytest.mark.benchmark(group="waits")
+def test_wait_for_present(benchmark, bench_driver):
+    benchmark(wait_for, bench_driver, element_present(ASSETS_SELECTOR), timeout=5)
+
+
+@pytest.mark.benchmark(group="throttling")
+def test_throttle_acquire_unthrottled(benchmark):
+    throttler = TokenBucketThrottler(BENCH_DEVICE, rate=1e6, burst=10 ** 6)
+    benchmark(throttler.acquire, throttle_log=False)
+
+
+@pytest.mark.benchmark(group="throttling")
+def test_throttle_acquire_default_rate(benchmark):
+    # Cost of one request at the production rate once the burst is used up
+    throttler = TokenBucketThrottler(BENCH_DEVICE)
+
+    def drain_bucket():
+        throttler._tokens = 0.0
+        throttler._last_refill = time.monotonic()
+
+    benchmark.pedantic(throttler.acquire, kwargs={"throttle_log": False}, setup=drain_bucket, rounds=5)
+
+
+@pytest.mark.benchmark(group="adb")
+def test_adb_shell_pooled(benchmark, fake_adb):
+    benchmark(run_adb, ["adb", "-s", BENCH_DEVICE, "shell", "pidof", BENCH_PACKAGE])
+
+
+@pytest.mark.benchmark(group="adb")
+def test_adb_shell_subprocess(benchmark):
+    # Process spawn cost of the fallback path (the adb binary itself is not needed)
+    benchmark(_run_subprocess, ["true"], 5000)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Modules every test module / pytest worker imports
+FRAMEWORK_MODULES = (
+    "core.click_actions",
+    "core.conditions",
+    "core.element_assertions",
+    "core.element_finder",
+    "core.hierarchy_snapshot",
+    "core.input_sequence",
+    "core.retry",
+    "core.step_executor",
+    "utils.driver_setup",
+)
+# Client stack any test needs anyway; imported first, so the budget covers the framework's own cost
+PRELOADED = ("appium.webdriver", "allure")
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "150"))
+# Heavy, optional or display-bound packages that must only load on first use
+LAZY_MODULES = ("pyautogui", "openpyxl", "pyperclip", "dateutil", "pytest")
+
+
+def import_times(modules, preload=()):
+    """
+    Imports the modules in a fresh interpreter with 'python -X importtime'.
+
+    :return: [(module, cumulative import time in ms, nesting depth)] of every module loaded
+             after the preload, in the order the imports finished
+    """
+    statement = "; ".join([f"import {m}" for m in preload] + ["import sys; sys.stderr.write('--\\n')"]
+                          + [f"import {m}" for m in modules])
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+    timings = []
+    for line in proc.stderr.split("--\n", 1)[1].splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        depth = len(name) - len(name.lstrip())  # nested imports are indented under their importer
+        timings.append((name.strip(), int(cumulative) / 1000, depth))
+    return timings
+
+
+def top_level_total(timings):
+    """
+    Time of the outermost imports only: a nested module's time is already part
+    of the cumulative time of the module that imported it.
+    """
+    top = min(depth for _, _, depth in timings)
+    return sum(ms for _, ms, depth in timings if depth == top)
+
+
+def test_framework_import_budget():
+    timings = import_times(FRAMEWORK_MODULES, preload=PRELOADED)
+    total = top_level_total(timings)
+    slowest = sorted(timings, key=lambda item: item[1], reverse=True)[:10]
+    assert total <= IMPORT_BUDGET_MS, (
+        f"import core.* + utils.driver_setup took {total:.1f} ms (budget {IMPORT_BUDGET_MS:g} ms). "
+        f"Slowest: {', '.join(f'{name} {ms:.1f} ms' for name, ms, _ in slowest)}")
+
+
+def test_heavy_dependencies_load_lazily():
+    timings = import_times(FRAMEWORK_MODULES)
+    loaded = sorted({name.split(".")[0] for name, _, _ in timings} & set(LAZY_MODULES))
+    assert not loaded, f"Imported at module level: {', '.join(loaded)}"
@@ -0,0 +1,132 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.command_profiler import command_profiler
+from utils.driver_pool import DriverPool
+from utils.driver_setup import DEFAULT_APP_PACKAGE, DEFAULT_DEVICE_NAME
+from utils.framework_log import framework_log
+from utils.logcat_collector import logcat_capture
+from utils.resource_sampler import resource_sampler
+from utils.step_log import step_log
+from utils.step_metrics import step_metrics
+from utils.test_data import DATA_SHARD, get_dataset
+
+
+def pytest_addoption(parser):
+    parser.addoption("--appium-profile", action="store_true", default=False,
+                     help="Record per-command Appium latencies and write a Chrome trace to metrics/")
+    parser.addoption("--step-log", choices=("buffered", "attempts"), default=None,
+                     help="buffered: one 'Step log' attachment per test (default, STEP_LOG_MODE); "
+                          "attempts: one attachment per step attempt")
+    parser.addoption("--no-logcat", action="store_true", default=False,
+                     help="Do not collect device logcat for failing tests (LOGCAT_CAPTURE=0)")
+    parser.addoption("--framework-log", default=None, metavar="LEVEL",
+                     help="Level of the framework log (DEBUG, INFO, WARNING, ... or quiet = ERROR; FRAMEWORK_LOG)")
+    parser.addoption("--data-shard", default=DATA_SHARD, metavar="INDEX/COUNT",
+                     help="Run only every COUNT-th row of data-driven tests, starting at INDEX (DATA_SHARD)")
+    parser.addoption("--resource-sampling", action="store_true", default=False,
+                     help="Sample app CPU/memory/fps per step and attach a chart (RESOURCE_SAMPLING=1)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "data_source(file, sheet=None): parametrize the test's data_row "
+                                       "fixture with the rows of a file in test_data_input/")
+    if config.getoption("--appium-profile"):
+        command_profiler.enabled = True
+    if config.getoption("--step-log"):
+        step_log.mode = config.getoption("--step-log")
+    if config.getoption("--no-logcat"):
+        logcat_capture.enabled = False
+    if config.getoption("--resource-sampling"):
+        resource_sampler.enabled = True
+    if config.getoption("--framework-log"):
+        framework_log.configure(level=config.getoption("--framework-log"))
+
+
+def pytest_collection_modifyitems(session, config, items):
+    # Start the first Appium session now, so it is created while the remaining hooks
+    # and fixture setup run (utils/driver_pool.py, DriverPool.prewarm)
+    if not config.option.collectonly and any("driver_setup" in item.fixturenames for item in items):
+        config._driver_pool = DriverPool()
+        config._driver_pool.prewarm(DEFAULT_DEVICE_NAME)
+
+
+def pytest_generate_tests(metafunc):
+    # @pytest.mark.data_source("logins.xlsx") -> one test per row; params are row indices only,
+    # the row itself is read from the cache when the test runs (utils/test_data.py)
+    marker = metafunc.definition.get_closest_marker("data_source")
+    if marker is None or "data_row" not in metafunc.fixturenames:
+        return
+    dataset = get_dataset(*marker.args, **marker.kwargs)
+    indices = dataset.indices(metafunc.config.getoption("--data-shard"))
+    metafunc.parametrize("data_row", indices, indirect=True, ids=[f"row{i}" for i in indices])
+
+
+@pytest.fixture
+#Row of the test's data_source file (dict column -> value)
+def data_row(request):
+    marker = request.node.get_closest_marker("data_source")
+    return get_dataset(*marker.args, **marker.kwargs).row(request.param)
+
+
+@pytest.fixture(scope="session")
+#Warm Appium sessions shared by all tests
+def driver_pool(request):
+    pool = getattr(request.config, "_driver_pool", None) or DriverPool()
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture(scope="function")
+#Running app (leased from the session pool)
+def driver_setup(driver_pool, request):
+    # Background logcat of the device; only the window around a failure is attached
+    logcat_capture.begin_test(request.node.nodeid, DEFAULT_DEVICE_NAME, DEFAULT_APP_PACKAGE)
+    with driver_pool.lease(DEFAULT_DEVICE_NAME) as driver:
+        resource_sampler.begin_test(driver, DEFAULT_APP_PACKAGE, DEFAULT_DEVICE_NAME)  # opt-in
+        yield driver
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when in ("setup", "call") and report.failed:
+        item._test_failed = True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    # Buffered step results of the test -> one 'Step log' attachment (before fixtures are finalized,
+    # so it lands on the test itself)
+    resource_sampler.end_test()
+    step_log.flush()
+    if getattr(item, "_test_failed", False):
+        logcat_capture.attach_failure_window()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    logcat_capture.stop_all()
+    framework_log.flush()
+
+    # Per-run step timings (metrics/step_metrics_<date>_<device>.json/.csv)
+    path = step_metrics.write_files()
+    if path:
+        print(f"\nStep metrics written to {path}")
+
+    trace_path = command_profiler.write_files()
+    if trace_path:
+        print(f"Appium command trace written to {trace_path}")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if step_metrics.records:
+        terminalreporter.section("Slowest steps")
+        terminalreporter.write_line(step_metrics.format_summary(10))
+    if command_profiler.events:
+        terminalreporter.section("Appium command latencies")
+        terminalreporter.write_line(command_profiler.format_summary())
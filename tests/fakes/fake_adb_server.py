@@ -0,0 +1,166 @@
+import os
+import shutil
+import socket
+import socketserver
+import stat
+import subprocess
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional
+
+
+class _FakeAdbHandler(socketserver.BaseRequestHandler):
+    """Speaks the adb host protocol: host:version, host:devices, host:transport*, exec:/shell: services."""
+
+    def _read_request(self) -> Optional[str]:
+        header = self._recv_exact(4)
+        if header is None:
+            return None
+        payload = self._recv_exact(int(header, 16))
+        return payload.decode("utf-8") if payload is not None else None
+
+    def _recv_exact(self, size: int) -> Optional[bytes]:
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _okay(self, body: Optional[str] = None) -> None:
+        self.request.sendall(b"OKAY")
+        if body is not None:
+            data = body.encode("utf-8")
+            self.request.sendall(b"%04x" % len(data) + data)
+
+    def _fail(self, message: str) -> None:
+        data = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + b"%04x" % len(data) + data)
+
+    def handle(self):
+        server = self.server
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        server.connections += 1
+
+        while True:
+            request = self._read_request()
+            if request is None:
+                return
+
+            if request == "host:version":
+                self._okay("0029")
+                return
+            if request == "host:devices":
+                self._okay("".join(f"{d}\tdevice\n" for d in server.devices))
+                return
+            if request == "host:transport-any" or request.startswith("host:transport:"):
+                serial = request.split(":", 2)[2] if request.startswith("host:transport:") else None
+                if serial is not None and serial not in server.devices:
+                    self._fail(f"device '{serial}' not found")
+                    return
+                self._okay()
+                continue
+            if request.startswith("exec:") or request.startswith("shell:"):
+                self._okay()
+                self._run_service(request.split(":", 1)[1])
+                return
+
+            self._fail(f"unknown service {request}")
+            return
+
+    def _run_service(self, command: str) -> None:
+        server = self.server
+        server.services += 1
+        env = dict(os.environ, PATH=f"{server.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+        proc = subprocess.Popen(["sh", "-c", command or "sh"], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env)
+
+        def pump_output():
+            for chunk in iter(lambda: proc.stdout.read1(65536), b""):
+                try:
+                    self.request.sendall(chunk)
+                except OSError:
+                    break
+            try:
+                self.request.shutdown(2)
+            except OSError:
+                pass
+
+        reader = threading.Thread(target=pump_output, daemon=True)
+        reader.start()
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data:
+                    break
+                proc.stdin.write(data)
+                proc.stdin.flush()
+        except OSError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.kill()
+            proc.wait()
+            reader.join(timeout=1)
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in for the adb host server (port 5037 protocol) for offline tests
+    and benchmarks. Device services run in a local 'sh'; device-only tools
+    (cmd, dumpsys, pidof, am, input, log, ...) are replaced by stub scripts that
+    print canned output.
+
+        with FakeAdbServer(commands={"pidof": "1234"}) as server:
+            os.environ["ANDROID_ADB_SERVER_PORT"] = str(server.port)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, devices: Iterable[str] = ("emulator-5554",),
+                 commands: Optional[Dict[str, str]] = None, port: int = 0):
+        """
+        :param devices: Serials reported as attached
+        :param commands: Stubbed device commands: name -> canned stdout
+        :param port: TCP port (0 = pick a free one)
+        """
+        super().__init__(("127.0.0.1", port), _FakeAdbHandler)
+        self.devices = list(devices)
+        self.connections = 0
+        self.services = 0
+        self.bin_dir = tempfile.mkdtemp(prefix="fake_adb_bin_")
+        for name, output in (commands or {}).items():
+            self.add_command(name, output)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def add_command(self, name: str, output: str, exit_code: int = 0) -> None:
+        """Creates a stub device command printing `output`."""
+        path = os.path.join(self.bin_dir, name)
+        with open(path, "w") as f:
+            f.write(f"#!/bin/sh\ncat <<'__FAKE_ADB_EOF__'\n{output}\n__FAKE_ADB_EOF__\nexit {exit_code}\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def start(self) -> "FakeAdbServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        shutil.rmtree(self.bin_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,281 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+W3C_ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+DEFAULT_PAGE_SOURCE = """<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>
+<hierarchy index="0" class="hierarchy" rotation="0" width="1080" height="2400">
+  <android.widget.FrameLayout index="0" package="com.okinc.okex.gp" class="android.widget.FrameLayout" displayed="true">
+    <android.widget.TextView index="0" package="com.okinc.okex.gp" class="android.widget.TextView" text="Simple" resource-id="com.okinc.okex.gp:id/mode_name" displayed="true" bounds="[0,100][540,200]" />
+    <android.widget.TextView index="1" package="com.okinc.okex.gp" class="android.widget.TextView" text="Assets" resource-id="com.okinc.okex.gp:id/header_title" content-desc="Assets" displayed="true" bounds="[0,200][540,300]" />
+    <androidx.recyclerview.widget.RecyclerView index="2" package="com.okinc.okex.gp" class="androidx.recyclerview.widget.RecyclerView" scrollable="true" resource-id="com.okinc.okex.gp:id/list" displayed="true" bounds="[0,300][1080,2400]">
+      <!-- list items -->
+    </androidx.recyclerview.widget.RecyclerView>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+
+# Placeholder in a page source that GET /source replaces with the visible items of the simulated list
+LIST_ITEMS = "<!-- list items -->"
+LIST_ITEM = ('<android.view.ViewGroup index="{index}" class="android.view.ViewGroup" displayed="true" '
+             'bounds="[0,{top}][1080,{bottom}]"><android.widget.TextView index="0" '
+             'class="android.widget.TextView" text="item-{item}" displayed="true" '
+             'bounds="[40,{top}][1040,{bottom}]" /></android.view.ViewGroup>')
+
+
+class _Route:
+    def __init__(self, method: str, pattern: str, name: str):
+        self.method = method
+        self.regex = re.compile("^" + pattern + "$")
+        self.name = name
+
+
+# (HTTP method, path pattern, handler name). Handler names double as latency keys.
+_ROUTES = [
+    _Route("GET", r"/status", "status"),
+    _Route("POST", r"/session", "new_session"),
+    _Route("DELETE", r"/session/(?P<sid>[^/]+)", "delete_session"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/timeouts", "timeouts"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/element", "find_element"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/elements", "find_elements"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/element", "find_element"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/elements", "find_child_elements"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/click", "click"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/displayed", "displayed"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/enabled", "enabled"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/text", "text"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/rect", "rect"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/element/(?P<eid>[^/]+)/attribute/(?P<attr>[^/]+)", "attribute"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/source", "source"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/window/rect", "window_rect"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/actions", "actions"),
+    _Route("DELETE", r"/session/(?P<sid>[^/]+)/actions", "release_actions"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/execute/sync", "execute"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/appium/device/press_keycode", "press_keycode"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/appium/device/activate_app", "activate_app"),
+    _Route("POST", r"/session/(?P<sid>[^/]+)/appium/device/terminate_app", "terminate_app"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/appium/device/current_activity", "current_activity"),
+    _Route("GET", r"/session/(?P<sid>[^/]+)/appium/device/current_package", "current_package"),
+]
+
+
+class _FakeAppiumHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _dispatch(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        path = self.path.split("?", 1)[0].rstrip("/")
+
+        for route in _ROUTES:
+            if route.method == method:
+                match = route.regex.match(path)
+                if match:
+                    server = self.server
+                    server.requests[route.name] = server.requests.get(route.name, 0) + 1
+                    delay = server.latency.get(route.name, server.latency.get("default", 0.0))
+                    if delay:
+                        time.sleep(delay)
+                    status, value = getattr(server, f"handle_{route.name}")(body, **match.groupdict())
+                    return self._reply(status, value)
+
+        self._reply(404, {"error": "unknown command", "message": f"{method} {path}", "stacktrace": ""})
+
+    def _reply(self, status: int, value):
+        data = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class FakeAppiumServer(ThreadingHTTPServer):
+    """
+    Local stand-in for an Appium/UiAutomator2 server. It speaks enough of the
+    W3C/Appium protocol for create_driver(), ClickActions, StepExecutor and
+    ElementAssertions, with configurable per-command latencies and a canned
+    page source. Every selector is found unless listed in `missing_selectors`.
+
+    A scrollable list is simulated: each swipe (W3C actions) moves the list by
+    one item until `scroll_limit` swipes, after which the content stops changing.
+    Its 8 visible items are rendered into the page source at LIST_ITEMS.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None,
+                 page_source: str = DEFAULT_PAGE_SOURCE,
+                 missing_selectors: Iterable[str] = (),
+                 scroll_limit: int = 5,
+                 port: int = 0):
+        """
+        :param latency: Seconds per command, keyed by route name ('source', 'find_element', ...)
+                        or 'default' for all others
+        :param page_source: XML returned by GET /source
+        :param missing_selectors: Selector values for which find_element(s) finds nothing
+        :param scroll_limit: Number of swipes until the simulated list reaches its end
+        :param port: TCP port (0 = pick a free one)
+        """
+        super().__init__(("127.0.0.1", port), _FakeAppiumHandler)
+        self.latency = dict(latency or {})
+        self.page_source = page_source
+        self.missing_selectors = set(missing_selectors)
+        self.scroll_limit = scroll_limit
+        self.scroll_position = 0
+        self.current_package = "com.okinc.okex.gp"  # app in the foreground
+        self.requests: Dict[str, int] = {}
+        self.executed: List[dict] = []  # bodies of POST /execute/sync (script + args)
+        self.sessions: Dict[str, dict] = {}
+        self._elements: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeAppiumServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- helpers ------------------------------------------------------------
+
+    def _new_element(self, **info) -> dict:
+        element_id = uuid.uuid4().hex
+        with self._lock:
+            self._elements[element_id] = info
+        return {W3C_ELEMENT_KEY: element_id}
+
+    @staticmethod
+    def _no_such_element(body):
+        return 404, {"error": "no such element", "message": f"Element not found: {body.get('value')}",
+                     "stacktrace": ""}
+
+    # -- handlers (return (HTTP status, value)) -----------------------------
+
+    def handle_status(self, body):
+        return 200, {"ready": True, "build": {"version": "fake"}}
+
+    def handle_new_session(self, body):
+        session_id = uuid.uuid4().hex
+        caps = dict(body.get("capabilities", {}).get("alwaysMatch", {}))
+        caps = {k.split(":", 1)[-1]: v for k, v in caps.items()}
+        self.sessions[session_id] = caps
+        return 200, {"sessionId": session_id, "capabilities": caps}
+
+    def handle_delete_session(self, body, sid):
+        self.sessions.pop(sid, None)
+        return 200, None
+
+    def handle_timeouts(self, body, sid):
+        return 200, None
+
+    def handle_find_element(self, body, sid, eid=None):
+        if body.get("value") in self.missing_selectors:
+            return self._no_such_element(body)
+        return 200, self._new_element(selector=body.get("value"))
+
+    def handle_find_elements(self, body, sid):
+        if body.get("value") in self.missing_selectors:
+            return 200, []
+        return 200, [self._new_element(selector=body.get("value"))]
+
+    def _first_visible_item(self) -> int:
+        return min(self.scroll_position, self.scroll_limit)
+
+    def handle_find_child_elements(self, body, sid, eid):
+        # Children of the scrollable list: 8 visible items shifted by the scroll position
+        first = self._first_visible_item()
+        return 200, [self._new_element(selector=body.get("value"), item=first + i) for i in range(8)]
+
+    def handle_click(self, body, sid, eid):
+        return 200, None
+
+    def handle_displayed(self, body, sid, eid):
+        return 200, True
+
+    def handle_enabled(self, body, sid, eid):
+        return 200, True
+
+    def handle_text(self, body, sid, eid):
+        info = self._elements.get(eid, {})
+        return 200, f"item-{info['item']}" if "item" in info else ""
+
+    def handle_rect(self, body, sid, eid):
+        info = self._elements.get(eid, {})
+        y = 300 + 200 * info.get("item", 0) - 200 * self._first_visible_item()
+        return 200, {"x": 0, "y": y, "width": 1080, "height": 200}
+
+    def handle_attribute(self, body, sid, eid, attr):
+        return 200, "" if attr != "displayed" else "true"
+
+    def handle_source(self, body, sid):
+        first = self._first_visible_item()
+        items = "".join(LIST_ITEM.format(index=i, item=first + i, top=300 + 200 * i, bottom=500 + 200 * i)
+                        for i in range(8))
+        return 200, self.page_source.replace(LIST_ITEMS, items)
+
+    def handle_window_rect(self, body, sid):
+        return 200, {"x": 0, "y": 0, "width": 1080, "height": 2400}
+
+    def handle_actions(self, body, sid):
+        self.scroll_position += 1
+        return 200, None
+
+    def handle_release_actions(self, body, sid):
+        return 200, None
+
+    def handle_execute(self, body, sid):
+        self.executed.append(body)
+        if body.get("script") == "mobile: getCurrentPackage":
+            return 200, self.current_package
+        return 200, ""
+
+    def handle_press_keycode(self, body, sid):
+        return 200, None
+
+    def handle_activate_app(self, body, sid):
+        return 200, None
+
+    def handle_terminate_app(self, body, sid):
+        return 200, True
+
+    def handle_current_activity(self, body, sid):
+        return 200, ".MainActivity"
+
+    def handle_current_package(self, body, sid):
+        return 200, self.current_package
@@ -1,27 +1,16 @@
 import os
 import sys
-import time
 import allure
 import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from utils.driver_setup import create_driver
 from core.click_actions import ClickActions
 from core.step_executor import StepExecutor
 from core.element_assertions import ElementAssertions
+from core.conditions import element_present
 
-
-
-@pytest.fixture(scope="function")
-#Running app
-def driver_setup():
-    driver = create_driver()
-    yield driver
-    try:
-        driver.quit()
-    except Exception:
-        pass
+# `driver_setup` fixture (warm session leased from the pool) lives in tests/conftest.py
 
 
 @pytest.mark.order(1)
@@ -36,18 +25,18 @@ def test_TC_01_run_apps(driver_setup):
 
     # STEP 1: Change view for Exchange
     step_executor.execute_step("STEP 1: Change view for Exchange",
-            lambda: click_actions.click_element('new UiSelector().resourceId("com.okinc.okex.gp:id/chip_container")'))
-    time.sleep(2)
+            lambda: click_actions.click_element('new UiSelector().resourceId("com.okinc.okex.gp:id/chip_container")'),
+            until=element_present('new UiSelector().description("tradeAdvanceModeOptionId")'))
 
     # STEP 2: Select Exchange view
     step_executor.execute_step("STEP 2: Select Exchange view",
-            lambda: click_actions.click_element('new UiSelector().description("tradeAdvanceModeOptionId")'))
-    time.sleep(7)
+            lambda: click_actions.click_element('new UiSelector().description("tradeAdvanceModeOptionId")'),
+            until=element_present('new UiSelector().resourceId("com.okinc.okex.gp:id/mode_name").text("Exchange")'),
+            timeout=15)
 
     # Assertion - checking if is actived Exchane view:
     step_executor.execute_step(" Assertion - checking if is actived Exchane view:",
             lambda: element_assertions.is_element_visible('new UiSelector().resourceId("com.okinc.okex.gp:id/mode_name").text("Exchange")'))
-    time.sleep(2)
 
 
     allure.attach(body="Test case 01 - run app ", name="Test report", attachment_type=allure.attachment_type.TEXT)
@@ -0,0 +1,12 @@
+import pytest
+
+from utils.step_log import step_log
+from utils.step_metrics import step_metrics
+
+
+@pytest.fixture(autouse=True)
+def no_step_records():
+    """Steps executed by unit tests leave no step metrics files or Step log attachments behind."""
+    yield
+    step_metrics.records.clear()
+    step_log.clear()
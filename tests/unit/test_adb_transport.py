@@ -0,0 +1,100 @@
+import os
+import signal
+import time
+
+import pytest
+
+from tests.fakes.fake_adb_server import FakeAdbServer
+from utils import adb_transport
+from utils.adb_transport import AdbCommandInterrupted, AdbError, AdbTransportPool, run_adb
+
+DEVICE = "unit-5554"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeAdbServer(devices=(DEVICE,), commands={"pidof": "4321"}) as fake:
+        yield fake
+
+
+@pytest.fixture
+def pool(server):
+    pool = AdbTransportPool(max_sessions=2, port=server.port)
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def subprocess_calls(monkeypatch, server):
+    """run_adb() against the fake server; records instead of running subprocess fallbacks."""
+    calls = []
+    monkeypatch.setattr(adb_transport, "_run_subprocess", lambda args, timeout: calls.append(args) or (0, "", ""))
+    previous_port = adb_transport.adb_pool.port
+    adb_transport.adb_pool.close_all()
+    adb_transport.adb_pool.port = server.port
+    yield calls
+    adb_transport.adb_pool.close_all()
+    adb_transport.adb_pool.port = previous_port
+
+
+def test_rc_stdout_and_stderr_are_framed_like_adb_shell(pool):
+    assert pool.run(DEVICE, "echo out; echo err >&2; exit 3") == (3, "out", "err")
+    assert pool.run(DEVICE, "printf 'a\\nb'") == (0, "a\nb", "")
+    assert pool.run(DEVICE, "pidof com.app | cat") == (0, "4321", "")
+    assert pool.run(DEVICE, "no_such_command")[0] == 127
+
+
+def test_session_is_reused_after_a_failing_command(pool, server):
+    services = server.services
+    pool.run(DEVICE, "exit 1")
+    assert pool.run(DEVICE, "echo $((20 + 22))") == (0, "42", "")
+    assert server.services == services + 1
+
+
+def test_timeout_maps_to_124_and_the_next_command_gets_a_new_session(pool, server):
+    services = server.services
+    assert pool.run(DEVICE, "sleep 5", timeout=0.3) == (124, "", "TimeoutExpired")
+    assert pool.run(DEVICE, "echo ok") == (0, "ok", "")
+    assert server.services == services + 2
+
+
+def test_dead_idle_session_is_replaced_before_sending(pool, server):
+    services = server.services
+    _, shell_pid, _ = pool.run(DEVICE, "echo $$")
+    os.kill(int(shell_pid), signal.SIGKILL)  # device side of the pooled session goes away
+    idle = pool._idle[DEVICE][0]
+    deadline = time.monotonic() + 5
+    while idle.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert pool.run(DEVICE, "echo ok") == (0, "ok", "")
+    assert server.services == services + 2
+
+
+def test_broken_connection_after_sending_raises(pool):
+    with pytest.raises(AdbCommandInterrupted):
+        pool.run(DEVICE, "kill -9 $$")
+
+
+def test_unknown_device_fails_before_sending(pool):
+    with pytest.raises(AdbError) as error:
+        pool.run("other-5556", "echo ok")
+    assert not isinstance(error.value, AdbCommandInterrupted)
+
+
+def test_run_adb_does_not_rerun_an_interrupted_command(subprocess_calls, tmp_path):
+    marker = tmp_path / "runs"
+    rc, _, err = run_adb(["adb", "-s", DEVICE, "shell", f"echo x >> {marker}; kill -9 $$"])
+
+    assert rc == 1 and "connection lost" in err
+    assert subprocess_calls == []
+    assert marker.read_text() == "x\n"
+
+
+def test_run_adb_falls_back_when_nothing_was_sent(subprocess_calls):
+    run_adb(["adb", "-s", "other-5556", "shell", "echo", "ok"])
+    adb_transport.adb_pool.port = 1  # adb server not reachable
+    run_adb(["adb", "-s", DEVICE, "shell", "echo", "ok"])
+
+    assert subprocess_calls == [["adb", "-s", "other-5556", "shell", "echo", "ok"],
+                                ["adb", "-s", DEVICE, "shell", "echo", "ok"]]
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+
+from utils.attachment_dedup import dedupe_attachments
+
+
+def write_result(reports, name, attachments, mtime=None):
+    """Allure result with one text attachment per content; returns the attachment sources."""
+    sources = []
+    for i, content in enumerate(attachments):
+        source = f"{name}-{i}-attachment.txt"
+        (reports / source).write_text(content)
+        sources.append(source)
+    path = reports / f"{name}-result.json"
+    path.write_text(json.dumps({"name": name, "attachments": [{"name": "Step", "source": s} for s in sources]}))
+    if mtime is not None:
+        for file_name in sources + [path.name]:
+            os.utime(reports / file_name, (mtime, mtime))
+    return sources
+
+
+def attachment_sources(reports, name):
+    with open(reports / f"{name}-result.json", encoding="utf-8") as f:
+        return [a["source"] for a in json.load(f)["attachments"]]
+
+
+def test_identical_attachments_are_stored_once(tmp_path):
+    write_result(tmp_path, "a", ["Success", "Success", "other"])
+    write_result(tmp_path, "b", ["Success"])
+
+    stats = dedupe_attachments(str(tmp_path))
+
+    assert stats["attachments"] == 4 and stats["blobs"] == 2 and stats["removed"] == 4
+    sources = attachment_sources(tmp_path, "a") + attachment_sources(tmp_path, "b")
+    assert len(set(sources)) == 2
+    assert all((tmp_path / source).read_text() in ("Success", "other") for source in sources)
+    assert sorted(os.listdir(tmp_path)) == sorted(set(sources) | {"a-result.json", "b-result.json"})
+
+
+def test_results_of_earlier_runs_are_left_alone(tmp_path):
+    old_sources = write_result(tmp_path, "old", ["Success", "Success"], mtime=time.time() - 3600)
+    old_result = (tmp_path / "old-result.json").read_text()
+    write_result(tmp_path, "new", ["Success", "Success"])
+
+    stats = dedupe_attachments(str(tmp_path), since_ms=int((time.time() - 60) * 1000))
+
+    assert stats["removed"] == 2
+    assert (tmp_path / "old-result.json").read_text() == old_result
+    assert all((tmp_path / source).exists() for source in old_sources)
+    assert len(set(attachment_sources(tmp_path, "new"))) == 1
@@ -0,0 +1,39 @@
+from core.conditions import element_stable, wait_for
+
+
+class _Element:
+    def __init__(self, rect):
+        self.rect = rect
+
+
+class AnimatingDriver:
+    """Element sliding in: its y changes on the first polls, then stays put."""
+
+    def __init__(self, positions):
+        self.positions = list(positions)
+        self.polls = 0
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def find_elements(self, by, selector):
+        y = self.positions[min(self.polls, len(self.positions) - 1)]
+        self.polls += 1
+        return [_Element({"x": 0, "y": y, "width": 100, "height": 50})] if y is not None else []
+
+
+def test_element_stable_waits_until_the_rect_stops_changing():
+    driver = AnimatingDriver([None, 900, 600, 400, 400])
+
+    wait_for(driver, element_stable("radio"), timeout=5, initial_interval=0.001)
+
+    assert driver.polls == 5
+
+
+def test_element_stable_needs_two_polls_after_prepare():
+    driver = AnimatingDriver([400])
+    condition = element_stable("radio")
+
+    assert not condition.check(driver) and condition.check(driver)
+    condition.prepare(driver)
+    assert not condition.check(driver)
@@ -0,0 +1,64 @@
+import csv
+import os
+import subprocess
+import sys
+
+from utils.test_data import DataSet
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Builds the dataset in a separate process and prints its row count
+BUILD_SCRIPT = ("import sys; from utils.test_data import DataSet; "
+                "print(DataSet(sys.argv[1], cache_dir=sys.argv[2]).count)")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user", "pin"])
+        writer.writerows([f"user{i}", i] for i in range(rows))
+
+
+def test_rows_are_read_from_the_cache(tmp_path):
+    data = tmp_path / "logins.csv"
+    write_csv(data, 5)
+
+    dataset = DataSet(str(data), cache_dir=str(tmp_path / "cache"))
+
+    assert dataset.count == 5
+    assert dataset.row(3) == {"user": "user3", "pin": "3"}
+    assert list(dataset.indices("1/2")) == [1, 3]
+
+
+def test_changed_file_replaces_the_stale_cache(tmp_path):
+    data, cache = tmp_path / "logins.csv", tmp_path / "cache"
+    write_csv(data, 5)
+    old = DataSet(str(data), cache_dir=str(cache))
+    write_csv(data, 7)
+
+    new = DataSet(str(data), cache_dir=str(cache))
+
+    assert new.count == 7
+    assert sorted(os.listdir(cache)) == sorted(os.path.basename(p) for p in (new.rows_path, new.index_path))
+    assert old.rows_path != new.rows_path
+
+
+def test_concurrent_workers_build_the_same_cache(tmp_path):
+    # Parallel workers collect the same data file at the same time (run_selected_R_tests.run_parallel):
+    # the first one done must not remove the temporary files the others are still writing
+    data, cache = tmp_path / "logins.csv", tmp_path / "cache"
+    write_csv(data, 50000)
+
+    for _ in range(3):
+        for name in os.listdir(cache) if cache.exists() else ():
+            os.remove(cache / name)
+        workers = [subprocess.Popen([sys.executable, "-c", BUILD_SCRIPT, str(data), str(cache)], cwd=ROOT,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                   for _ in range(2)]
+        results = [worker.communicate(timeout=120) for worker in workers]
+
+        for worker, (out, err) in zip(workers, results):
+            assert worker.returncode == 0, err
+            assert out.strip() == "50000"
+        assert not [name for name in os.listdir(cache) if name.endswith(".tmp")]
+    assert DataSet(str(data), cache_dir=str(cache)).row(49999) == {"user": "user49999", "pin": "49999"}
@@ -0,0 +1,182 @@
+import threading
+import time
+import uuid
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils import throttling
+from utils.app_state import APP_FOREGROUND, get_app_state_service
+from utils.driver_pool import DriverPool
+
+DEVICE = "unit-pool-5554"
+PACKAGE = "com.example.app"
+
+
+class FakeDriver:
+    def __init__(self, device_name):
+        self.session_id = uuid.uuid4().hex
+        self.capabilities = {"udid": device_name}
+        self.healthy = True
+        self.fail_reset = False
+        self.app_calls = []
+        self.quit_calls = 0
+
+    @property
+    def current_package(self):
+        if not self.healthy:
+            raise WebDriverException("session is gone")
+        return PACKAGE
+
+    def terminate_app(self, app_package):
+        if self.fail_reset:
+            raise WebDriverException("UiAutomator2 crashed")
+        self.app_calls.append(("terminate", app_package))
+
+    def activate_app(self, app_package):
+        self.app_calls.append(("activate", app_package))
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class Factory:
+    """Driver factory for the pool; optionally blocks until released or fails."""
+
+    def __init__(self):
+        self.created = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error = None
+
+    def __call__(self, device_name, app_package):
+        self.started.set()
+        self.gate.wait(5)
+        if self.error:
+            raise self.error
+        driver = FakeDriver(device_name)
+        self.created.append(driver)
+        return driver
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_device():
+    throttling._throttlers[DEVICE] = throttling.TokenBucketThrottler(DEVICE, rate=1e6, burst=10 ** 6)
+    yield
+    throttling._throttlers.pop(DEVICE, None)
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+@pytest.fixture
+def pool(factory):
+    pool = DriverPool(factory=factory, app_package=PACKAGE)
+    yield pool
+    pool.close_all()
+
+
+def test_released_session_is_reused_with_an_app_restart(pool, factory):
+    first = pool.acquire(DEVICE)
+    pool.release(first)
+    get_app_state_service(DEVICE).invalidate()
+
+    second = pool.acquire(DEVICE)
+
+    assert second is first and len(factory.created) == 1
+    assert first.app_calls == [("terminate", PACKAGE), ("activate", PACKAGE)]
+    assert get_app_state_service(DEVICE).get_state(PACKAGE) == APP_FOREGROUND
+
+
+def test_concurrent_leases_get_separate_sessions(pool, factory):
+    with pool.lease(DEVICE) as first, pool.lease(DEVICE) as second:
+        assert first is not second
+    assert len(factory.created) == 2
+
+
+def test_lease_returns_the_session_when_the_test_fails(pool, factory):
+    with pytest.raises(AssertionError):
+        with pool.lease(DEVICE) as driver:
+            raise AssertionError("test failed")
+
+    assert pool.acquire(DEVICE) is driver
+
+
+def test_unhealthy_idle_session_is_discarded(pool, factory):
+    driver = pool.acquire(DEVICE)
+    pool.release(driver)
+    driver.healthy = False
+
+    replacement = pool.acquire(DEVICE)
+
+    assert replacement is not driver and driver.quit_calls == 1
+
+
+def test_failed_app_reset_discards_the_session(pool, factory):
+    driver = pool.acquire(DEVICE)
+    pool.release(driver)
+    driver.fail_reset = True
+
+    assert pool.acquire(DEVICE) is not driver
+    assert driver.quit_calls == 1
+
+
+def test_release_with_discard_and_unknown_drivers(pool, factory):
+    driver = pool.acquire(DEVICE)
+    pool.release(driver, discard=True)
+    pool.release(driver)  # no longer leased - ignored
+    pool.release(FakeDriver(DEVICE))
+
+    assert driver.quit_calls == 1
+    assert pool.acquire(DEVICE) is not driver
+
+
+def test_is_healthy(pool):
+    driver = FakeDriver(DEVICE)
+    assert pool.is_healthy(driver)
+    driver.healthy = False
+    assert not pool.is_healthy(driver)
+    driver.healthy, driver.session_id = True, None
+    assert not pool.is_healthy(driver)
+
+
+def test_acquire_takes_the_prewarmed_session(pool, factory):
+    factory.gate.clear()
+    future = pool.prewarm(DEVICE)
+    assert not future.done()
+
+    factory.gate.set()
+    driver = pool.acquire(DEVICE)
+
+    assert driver is future.result() and len(factory.created) == 1
+
+
+def test_failed_prewarm_falls_back_to_a_new_session(pool, factory):
+    factory.error = WebDriverException("Appium not reachable")
+    pool.prewarm(DEVICE).exception()
+    factory.error = None
+
+    driver = pool.acquire(DEVICE)
+
+    assert factory.created == [driver]
+
+
+def test_close_all_quits_leased_idle_and_prewarmed_sessions(pool, factory):
+    leased, idle = pool.acquire(DEVICE), pool.acquire(DEVICE)
+    pool.release(idle)
+    factory.started.clear()
+    factory.gate.clear()
+    future = pool.prewarm(DEVICE)
+    assert factory.started.wait(5)  # still being created while the session ends
+
+    pool.close_all()
+    factory.gate.set()
+    prewarmed = future.result()
+    deadline = time.monotonic() + 5
+    while not prewarmed.quit_calls and time.monotonic() < deadline:
+        time.sleep(0.01)  # done callbacks run right after the result is set
+
+    assert leased.quit_calls == idle.quit_calls == prewarmed.quit_calls == 1
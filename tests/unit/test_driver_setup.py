@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from tests.fakes.fake_appium_server import FakeAppiumServer
+from utils import driver_setup, throttling
+from utils.app_state import APP_NOT_RUNNING, get_app_state_service
+
+DEVICE = "unit-setup-5554"
+FOREGROUND_PACKAGE = "com.okinc.okex.gp"  # current package reported by the fake server
+
+
+@pytest.fixture(scope="module")
+def appium():
+    with FakeAppiumServer() as server:
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def fake_device(monkeypatch):
+    """Unthrottled device that is ready at once; launcher resolution is released by the test."""
+    throttling._throttlers[DEVICE] = throttling.TokenBucketThrottler(DEVICE, rate=1e6, burst=10 ** 6)
+    release = threading.Event()
+
+    def resolve_launcher_activity(app_package, device_name):
+        release.wait(5)
+        return f"{app_package}.MainActivity"
+
+    monkeypatch.setattr(driver_setup, "wait_for_device_ready", lambda device_name: True)
+    monkeypatch.setattr(driver_setup, "resolve_launcher_activity", resolve_launcher_activity)
+    yield release
+    release.set()
+    throttling._throttlers.pop(DEVICE, None)
+    get_app_state_service(DEVICE).invalidate()
+
+
+def create(appium, app_package=FOREGROUND_PACKAGE):
+    return driver_setup.create_driver(device_name=DEVICE, app_package=app_package, appium_port=appium.port)
+
+
+def test_session_is_requested_while_the_launcher_is_still_resolved(appium, fake_device):
+    sessions = appium.requests.get("new_session", 0)
+
+    driver = create(appium)
+
+    assert appium.requests["new_session"] == sessions + 1
+    assert not fake_device.is_set()  # resolution still running, nobody waited for it
+    caps = appium.sessions[driver.session_id]
+    assert caps["autoLaunch"] is False and "appActivity" not in caps
+    driver.quit()
+
+
+def test_stopped_app_is_started_with_the_resolved_activity(appium, fake_device, monkeypatch):
+    monkeypatch.setattr(driver_setup, "app_state", lambda driver, app_package: APP_NOT_RUNNING)
+    fake_device.set()
+
+    driver = create(appium, app_package="com.example.other")
+
+    assert appium.executed[-1] == {"script": "mobile: startActivity", "args": [
+        {"component": "com.example.other/com.example.other.MainActivity", "wait": True}]}
+    driver.quit()
+
+
+@pytest.mark.parametrize("probe_result", [False, OSError("adb server not reachable")])
+def test_device_that_is_not_ready_fails_before_the_session_request(appium, monkeypatch, probe_result):
+    def wait_for_device_ready(device_name):
+        if isinstance(probe_result, Exception):
+            raise probe_result
+        return probe_result
+
+    monkeypatch.setattr(driver_setup, "wait_for_device_ready", wait_for_device_ready)
+    sessions = appium.requests.get("new_session", 0)
+
+    with pytest.raises(WebDriverException, match=DEVICE):
+        create(appium)
+    assert appium.requests.get("new_session", 0) == sessions
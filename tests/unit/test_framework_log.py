@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Imports the framework, logs one record per given level and prints whether logs/ existed
+# after the import, the thread count, the root logger's handler count and the messages written to logs/
+SCRIPT = """
+import json, logging, os, sys, threading
+sys.path.insert(0, {root!r})
+import core.click_actions, core.element_assertions, core.element_finder, core.step_executor, utils.driver_pool
+from utils.framework_log import framework_log, get_logger
+log = get_logger("unit")
+print(json.dumps([os.path.isdir("logs"), threading.active_count(), len(logging.getLogger().handlers)]))
+for level in sys.argv[1:]:
+    getattr(log, level)("%s record", level)
+framework_log.shutdown()
+files = sorted(os.listdir("logs")) if os.path.isdir("logs") else []
+print(json.dumps([[json.loads(line)["message"] for line in open(os.path.join("logs", name))] for name in files]))
+"""
+
+
+def run_script(cwd, levels, framework_log=None):
+    env = {k: v for k, v in os.environ.items() if k != "FRAMEWORK_LOG"}
+    if framework_log:
+        env["FRAMEWORK_LOG"] = framework_log
+    result = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT), *levels], cwd=cwd,
+                            env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()  # warnings are echoed to the console in between
+    return json.loads(lines[0]), json.loads(lines[-1])
+
+
+def test_import_and_records_below_the_default_level_write_nothing(tmp_path):
+    after_import, files = run_script(tmp_path, ["info", "debug"])
+
+    assert after_import == [False, 1, 0]  # no logs/ directory, no listener thread, no root handler
+    assert files == []
+    assert not (tmp_path / "logs").exists()
+
+
+def test_first_record_at_the_level_sets_up_the_log_file(tmp_path):
+    after_import, files = run_script(tmp_path, ["debug", "info", "warning"], framework_log="INFO")
+
+    assert after_import == [False, 1, 0]
+    assert files == [["info record", "warning record"]]
+
+
+def test_quiet_keeps_only_errors(tmp_path):
+    _, files = run_script(tmp_path, ["warning", "error"], framework_log="quiet")
+
+    assert files == [["error record"]]
@@ -0,0 +1,45 @@
+from core.click_actions import ClickActions
+from core.input_sequence import KEYCODE_DPAD_DOWN, KEYCODE_ENTER, InputSequence, perform_sequence
+
+
+class FakeDriver:
+    page_source = "<hierarchy/>"
+
+    def __init__(self):
+        self.requests = []
+
+    def execute_script(self, script, args):
+        self.requests.append((script, [args["command"]] + args["args"]))
+
+    def execute(self, command, params):
+        self.requests.append((command, params))
+
+
+def test_press_keys_sends_all_keys_in_one_input_call():
+    driver = FakeDriver()
+
+    ClickActions(driver).press_enter_arrow_down_enter()
+
+    assert driver.requests == [("mobile: shell", ["input", "keyevent", "66", "20", "66"])]
+
+
+def test_press_keys_pauses_on_the_device_only_when_asked():
+    driver = FakeDriver()
+
+    ClickActions(driver).press_keys(KEYCODE_ENTER, KEYCODE_DPAD_DOWN, delay_ms=150)
+
+    assert driver.requests == [("mobile: shell", ["input", "keyevent", "66;", "sleep", "0.15;", "input", "keyevent",
+                                                  "20"])]
+
+
+def test_sequence_with_gestures_is_one_w3c_actions_payload():
+    driver = FakeDriver()
+    sequence = InputSequence().tap(540, 1200, delay_ms=100).key(KEYCODE_ENTER)
+
+    assert perform_sequence(driver, sequence) == "w3c"
+
+    [(_, params)] = driver.requests
+    pointer, keyboard = params["actions"]
+    assert [action["type"] for action in pointer["actions"]] == [
+        "pointerMove", "pointerDown", "pause", "pointerUp", "pause", "pause", "pause"]
+    assert [action["type"] for action in keyboard["actions"]][-2:] == ["keyDown", "keyUp"]
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+from utils.launcher_cache import LauncherCache
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+VERSION = {"versionCode": "600100", "lastUpdateTime": "2024-05-01 10:00:00"}
+
+# One worker process storing `count` activities for its own device serial
+PUT_SCRIPT = ("import sys; from utils.launcher_cache import LauncherCache; "
+              "cache = LauncherCache(sys.argv[1]); "
+              "[cache.put(f'{sys.argv[2]}-{i}', 'com.app', {'versionCode': '1', 'lastUpdateTime': 't'}, '.Main') "
+              "for i in range(int(sys.argv[3]))]")
+
+
+def test_entry_is_valid_for_the_same_installed_version(tmp_path):
+    cache = LauncherCache(str(tmp_path / "launcher_cache.json"))
+    cache.put("emulator-5554", "com.app", VERSION, ".MainActivity")
+
+    assert cache.get("emulator-5554", "com.app", VERSION) == ".MainActivity"
+    assert cache.get("emulator-5554", "com.app", dict(VERSION, versionCode="600101")) is None
+    assert LauncherCache(cache.path).get("emulator-5554", "com.app", VERSION) == ".MainActivity"
+
+
+def test_workers_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "launcher_cache.json")
+    first, second = LauncherCache(path), LauncherCache(path)
+    first.get("emulator-5554", "com.app", VERSION)  # both loaded the (empty) file before any write
+    second.get("emulator-5556", "com.app", VERSION)
+
+    first.put("emulator-5554", "com.app", VERSION, ".A")
+    second.put("emulator-5556", "com.app", VERSION, ".B")
+    first.invalidate(device_name="emulator-5558")
+
+    with open(path, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["emulator-5554|com.app", "emulator-5556|com.app"]
+
+
+def test_concurrent_processes_do_not_lose_entries(tmp_path):
+    path = str(tmp_path / "launcher_cache.json")
+    workers = [subprocess.Popen([sys.executable, "-c", PUT_SCRIPT, path, f"device{n}", "20"], cwd=ROOT,
+                                stderr=subprocess.PIPE, text=True) for n in range(4)]
+    for worker in workers:
+        _, err = worker.communicate(timeout=120)
+        assert worker.returncode == 0, err
+
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)) == 80
+    assert not os.path.exists(f"{path}.lock")
@@ -0,0 +1,130 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+from backup_reports import restore_files_from_arch_reports
+from utils.report_archive import ReportArchive
+
+
+def write_run(reports, day, tests=("test_login", "test_logout")):
+    """Allure results of one run on `day` (YYYY-MM-DD): per test a result, an attachment and a container."""
+    reports.mkdir(parents=True, exist_ok=True)
+    start = int(datetime.strptime(day, "%Y-%m-%d").replace(hour=12).timestamp() * 1000)
+    files = {}
+    for name in tests:
+        result_id, container_id, attachment_id = (str(uuid.uuid4()) for _ in range(3))
+        attachment = f"{attachment_id}-attachment.txt"
+        (reports / attachment).write_text(f"log of {name}")
+        (reports / f"{result_id}-result.json").write_text(json.dumps({
+            "uuid": result_id, "name": name, "fullName": f"tests.test_app#{name}", "status": "passed",
+            "start": start, "steps": [{"name": "STEP", "attachments": [{"source": attachment}]}],
+        }))
+        (reports / f"{container_id}-container.json").write_text(json.dumps({"children": [result_id]}))
+        files[name] = {f"{result_id}-result.json", f"{container_id}-container.json", attachment}
+    (reports / "environment.properties").write_text("device=emulator-5554\n")
+    return files
+
+
+def snapshot(directory):
+    """{relative path: content} of every file below directory."""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, directory)] = f.read()
+    return files
+
+
+def test_archive_and_restore_round_trip(tmp_path):
+    reports, archive = tmp_path / "reports", ReportArchive(str(tmp_path / "arch_reports"))
+    write_run(reports, "2024-05-01")
+    original = snapshot(reports)
+
+    entry = archive.archive_directory(str(reports), run_id="run1")
+
+    assert os.listdir(reports) == []
+    assert entry["date"] == "2024-05-01" and entry["files"] == 7
+    assert sorted(t["name"] for t in entry["tests"]) == ["test_login", "test_logout"]
+    assert archive.load_index()["runs"] == [entry]
+
+    assert archive.restore(str(reports), date="2024-05-01") == 7
+    assert snapshot(reports) == original
+
+
+def test_index_lookup_by_date_and_test(tmp_path):
+    reports, archive = tmp_path / "reports", ReportArchive(str(tmp_path / "arch_reports"))
+    for run_id, day in (("run1", "2024-05-01"), ("run2", "2024-05-03")):
+        write_run(reports, day)
+        archive.archive_directory(str(reports), run_id=run_id)
+
+    def run_ids(**query):
+        return [run["run_id"] for run in archive.find_runs(**query)]
+
+    assert run_ids() == ["run1", "run2"]
+    assert run_ids(date="2024-05-01") == ["run1"]
+    assert run_ids(since="2024-05-02") == ["run2"]
+    assert run_ids(test="test_login") == ["run1", "run2"]
+    assert run_ids(test="test_settings") == []
+
+
+def test_restore_of_one_test_takes_its_files_and_the_run_level_files(tmp_path):
+    reports, archive = tmp_path / "reports", ReportArchive(str(tmp_path / "arch_reports"))
+    files = write_run(reports, "2024-05-01")
+    archive.archive_directory(str(reports), run_id="run1")
+
+    assert archive.restore(str(reports), test="test_logout") == 4
+
+    assert set(os.listdir(reports)) == files["test_logout"] | {"environment.properties"}
+
+
+def test_restore_leaves_the_archive_untouched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_run(tmp_path / "reports", "2024-05-01")
+    ReportArchive("arch_reports").archive_directory("reports", run_id="run1")
+    loose = write_run(tmp_path / "arch_reports", "2024-05-02", tests=("test_old",))  # old file-by-file archiving
+    archived = snapshot(tmp_path / "arch_reports")
+
+    restore_files_from_arch_reports("2000-01-01")
+    restore_files_from_arch_reports("2000-01-01")  # restoring twice finds the same files
+
+    assert snapshot(tmp_path / "arch_reports") == archived
+    assert set(os.listdir(tmp_path / "reports")) >= loose["test_old"]
+    assert len(os.listdir(tmp_path / "reports")) == 7 + 3
+
+
+def test_loose_files_are_selected_by_modification_date_and_test(tmp_path):
+    archive = ReportArchive(str(tmp_path / "arch_reports"))
+    loose = write_run(tmp_path / "arch_reports", "2024-05-02")
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    assert archive.restore_loose_files(str(tmp_path / "none"), since="2999-01-01") == 0
+    assert archive.restore_loose_files(str(tmp_path / "login"), date=today, test="test_login") == 4
+    assert set(os.listdir(tmp_path / "login")) == loose["test_login"] | {"environment.properties"}
+
+
+def test_run_with_a_missing_bundle_is_reported_as_unavailable(tmp_path, capsys):
+    reports, archive = tmp_path / "reports", ReportArchive(str(tmp_path / "arch_reports"))
+    for run_id in ("run1", "run2"):
+        write_run(reports, "2024-05-01")
+        archive.archive_directory(str(reports), run_id=run_id)
+    os.remove(tmp_path / "arch_reports" / archive.find_runs()[0]["bundle"])
+
+    assert archive.restore(str(reports), date="2024-05-01") == 7
+
+    assert "run1 (2024-05-01) is unavailable" in capsys.readouterr().out
+
+
+def test_loose_files_are_looked_up_in_the_index_after_the_migration(tmp_path, monkeypatch):
+    archive = ReportArchive(str(tmp_path / "arch_reports"))
+    write_run(tmp_path / "arch_reports", "2024-05-02")
+    assert archive.migrate_loose_files() == 7
+    assert archive.load_index()["loose"] == []
+
+    def listdir(path):
+        raise AssertionError(f"{path} scanned")
+
+    monkeypatch.setattr(os, "listdir", listdir)
+    assert archive.loose_files() == []
+    assert archive.migrate_loose_files() == 0
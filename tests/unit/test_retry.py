@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from core.retry import RetryPolicy, is_transient
+from core.step_executor import StepExecutor
+
+
+@pytest.mark.parametrize("error, transient", [
+    (StaleElementReferenceException("stale"), True),
+    (TimeoutException("condition not met"), True),
+    (ConnectionResetError("reset by peer"), True),
+    (WebDriverException("An unknown server-side error occurred: instrumentation process is not running"), True),
+    (WebDriverException("Could not proxy command to the remote server. Original error: socket hang up"), True),
+    (WebDriverException("An element could not be located"), False),
+    (NoSuchElementException("no such element"), False),
+    (AssertionError("wrong title"), False),
+    (ValueError("bad test data"), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3, jitter=False)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3, 3]
+
+
+def test_jitter_stays_within_the_backoff():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    assert all(0 <= policy.backoff(3) <= 4 for _ in range(100))
+
+
+def test_next_delay_stops_on_permanent_errors_and_used_up_attempts():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, jitter=False)
+    started = time.monotonic()
+
+    assert policy.next_delay(1, TimeoutException(), started) == 0.5
+    assert policy.next_delay(2, TimeoutException(), started) == 1.0
+    assert policy.next_delay(3, TimeoutException(), started) is None
+    assert policy.next_delay(1, AssertionError(), started) is None
+
+
+def test_next_delay_stops_at_the_deadline():
+    policy = RetryPolicy(max_attempts=10, base_delay=2, deadline=5, jitter=False)
+    started = time.monotonic() - 2  # the step already took 2s
+
+    assert policy.next_delay(1, TimeoutException(), started) == 2
+    assert policy.next_delay(2, TimeoutException(), started) is None  # 2s + 4s backoff would end past the deadline
+    assert RetryPolicy(base_delay=2, deadline=None, jitter=False).next_delay(2, TimeoutException(), started - 3600) == 4
+
+
+class FlakyStep:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+class FakeDriver:
+    page_source = "<hierarchy/>"
+
+
+def test_step_stops_at_the_first_success():
+    step = FlakyStep(StaleElementReferenceException("stale"), TimeoutException("timeout"))
+
+    StepExecutor(FakeDriver()).execute_step("STEP: Open menu", step,
+                                            retry=RetryPolicy(max_attempts=5, base_delay=0.01))
+
+    assert step.calls == 3
+
+
+def test_step_fails_immediately_on_a_permanent_error():
+    step = FlakyStep(AssertionError("wrong title"))
+
+    with pytest.raises(pytest.fail.Exception, match="not retryable"):
+        StepExecutor(FakeDriver()).execute_step("STEP: Check title", step,
+                                                retry=RetryPolicy(max_attempts=5, base_delay=0.01))
+    assert step.calls == 1
+
+
+def test_step_fails_when_attempts_are_used_up():
+    step = FlakyStep(*[TimeoutException("timeout")] * 5)
+
+    with pytest.raises(pytest.fail.Exception, match="after 3 attempts"):
+        StepExecutor(FakeDriver()).execute_step("STEP: Open menu", step,
+                                                retry=RetryPolicy(max_attempts=3, base_delay=0.01))
+    assert step.calls == 3
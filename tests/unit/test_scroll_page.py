@@ -0,0 +1,92 @@
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common import NoSuchElementException
+
+from core.step_executor import StepExecutor
+
+ROW_HEIGHT = 300
+WINDOW = {"width": 1080, "height": 2000}  # scroll_percent=15 -> a swipe of exactly one row
+
+
+class FakeListDriver:
+    """
+    RecyclerView whose rows are text-less ViewGroups with a TextView child
+    ("Item <n>"). A swipe moves the list by whole rows, so the visible rows
+    always sit at the same bounds; only their content changes. Counts the
+    requests the scroll engine sends.
+    """
+
+    def __init__(self, rows=20, visible=6):
+        self.rows, self.visible = rows, visible
+        self.offset = 0
+        self.swipes = 0
+        self.requests = {"page_source": 0, "get_window_size": 0, "find_elements": 0}
+
+    def _row(self, position):
+        top, bottom = 300 + position * ROW_HEIGHT, 300 + (position + 1) * ROW_HEIGHT
+        return (f'<android.view.ViewGroup class="android.view.ViewGroup" bounds="[0,{top}][1080,{bottom}]">'
+                f'<android.widget.TextView class="android.widget.TextView" text="Item {self.offset + position}" '
+                f'bounds="[40,{top}][1040,{bottom}]"/></android.view.ViewGroup>')
+
+    @property
+    def page_source(self):
+        self.requests["page_source"] += 1
+        rows = "".join(self._row(position) for position in range(self.visible))
+        return ('<hierarchy><android.widget.TextView class="android.widget.TextView" text="Header"/>'
+                '<androidx.recyclerview.widget.RecyclerView class="androidx.recyclerview.widget.RecyclerView" '
+                f'scrollable="true">{rows}</androidx.recyclerview.widget.RecyclerView></hierarchy>')
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def find_elements(self, by, value):
+        self.requests["find_elements"] += 1
+        assert by == AppiumBy.ANDROID_UIAUTOMATOR
+        shown = {f'new UiSelector().text("Item {self.offset + p}")' for p in range(self.visible)}
+        return [object()] if value in shown else []
+
+    def get_window_size(self):
+        self.requests["get_window_size"] += 1
+        return dict(WINDOW)
+
+    def swipe(self, start_x, start_y, end_x, end_y, duration=0):
+        self.swipes += 1
+        self.offset = min(self.rows - self.visible, self.offset + (start_y - end_y) // ROW_HEIGHT)
+
+
+def test_scroll_page_reaches_the_end_of_a_list_of_text_less_rows():
+    driver = FakeListDriver(rows=20, visible=6)
+
+    StepExecutor(driver).scroll_page(scroll_percent=15, max_scrolls=30, settle=0)
+
+    assert driver.offset == 14  # last row visible
+    assert driver.swipes == 15  # 14 moves + the swipe that no longer changed the rows
+    # one hierarchy dump per scroll, nothing per item
+    assert driver.requests == {"page_source": 16, "get_window_size": 1, "find_elements": 0}
+
+
+def test_scroll_page_stops_at_max_scrolls():
+    driver = FakeListDriver(rows=100, visible=6)
+
+    StepExecutor(driver).scroll_page(scroll_percent=15, max_scrolls=5, settle=0)
+
+    assert driver.swipes == 5 and driver.offset == 5
+
+
+def test_scroll_until_found_asks_the_server_only_once_the_element_is_on_screen():
+    driver = FakeListDriver(rows=20, visible=6)
+
+    element = StepExecutor(driver).scroll_until_found('new UiSelector().text("Item 9")', scroll_percent=15,
+                                                      settle=0)
+
+    assert element is not None and driver.offset == 4
+    assert driver.requests == {"page_source": 5, "get_window_size": 1, "find_elements": 1}
+
+
+def test_scroll_until_found_stops_at_the_end_of_the_list():
+    driver = FakeListDriver(rows=8, visible=6)
+
+    with pytest.raises(NoSuchElementException):
+        StepExecutor(driver).scroll_until_found('new UiSelector().text("Item 42")', scroll_percent=15,
+                                                settle=0)
+    assert driver.swipes == 3 and driver.requests["find_elements"] == 0
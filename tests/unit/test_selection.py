@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from utils import duration_history
+from utils.duration_history import TestHistory, collect_allure_results
+from utils.test_selection import DEFAULT_DURATION, budget_subset, order_tests, skip_unchanged
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = TestHistory(str(tmp_path / "history.db"))
+    yield history
+    history.close()
+
+
+def record(history, clock, monkeypatch, results, app_version=None, file_hashes=None):
+    """One run per call, one second after the previous one: {file: (status, duration)}."""
+    clock[0] += 1
+    monkeypatch.setattr(duration_history.time, "time", lambda: clock[0])
+    history.record_run([{"test_file": f, "status": s, "duration": d} for f, (s, d) in results.items()],
+                       app_version=app_version, file_hashes=file_hashes)
+
+
+@pytest.fixture
+def runs(history, monkeypatch):
+    clock = [1000.0]
+    return lambda results, **kwargs: record(history, clock, monkeypatch, results, **kwargs)
+
+
+def test_failed_first_puts_the_latest_failures_first(history, runs):
+    runs({"test_a.py": ("failed", 10), "test_b.py": ("passed", 30), "test_c.py": ("passed", 5)})
+    runs({"test_d.py": ("broken", 10), "test_c.py": ("failed", 5)})
+    runs({"test_c.py": ("passed", 5)})
+
+    ordered = order_tests(["tests/test_a.py", "tests/test_b.py", "tests/test_c.py", "tests/test_d.py",
+                           "tests/test_new.py"], "failed-first", history)
+
+    # failed last time (newest first), no history, then by failure rate and duration
+    assert ordered == ["tests/test_d.py", "tests/test_a.py", "tests/test_new.py", "tests/test_c.py", "tests/test_b.py"]
+
+
+def test_fastest_first_orders_by_average_duration(history, runs):
+    runs({"test_a.py": ("passed", 100), "test_b.py": ("passed", 20)})
+    runs({"test_a.py": ("passed", 40), "test_b.py": ("passed", 40)})
+
+    ordered = order_tests(["test_new.py", "test_a.py", "test_b.py"], "fastest-first", history)
+
+    assert ordered == ["test_b.py", "test_new.py", "test_a.py"]  # 30s, DEFAULT_DURATION (60s), 70s
+
+
+def test_unknown_or_no_mode(history):
+    assert order_tests(["test_b.py", "test_a.py"], None, history) == ["test_b.py", "test_a.py"]
+    with pytest.raises(ValueError):
+        order_tests(["test_a.py"], "slowest-first", history)
+
+
+def test_budget_subset_takes_failures_then_the_shortest_files(history, runs):
+    runs({"test_fail.py": ("failed", 50), "test_long.py": ("passed", 80),
+          "test_short.py": ("passed", 10), "test_mid.py": ("passed", 30)})
+    files = ["test_long.py", "test_mid.py", "test_fail.py", "test_short.py"]
+
+    selected, skipped = budget_subset(files, budget_seconds=100, history=history)
+
+    assert selected == ["test_fail.py", "test_short.py", "test_mid.py"]
+    assert skipped == ["test_long.py"]
+    assert budget_subset(files, budget_seconds=85, history=history, workers=2)[1] == []
+
+
+def test_budget_subset_counts_files_without_history_with_the_default_duration(history):
+    selected, skipped = budget_subset(["test_a.py", "test_b.py"], DEFAULT_DURATION * 1.5, history)
+
+    assert selected == ["test_a.py"] and skipped == ["test_b.py"]
+
+
+def test_skip_unchanged(history, runs, tmp_path):
+    same, edited, failed = (tmp_path / "test_same.py", tmp_path / "test_edited.py", tmp_path / "test_failed.py")
+    for path in (same, edited, failed):
+        path.write_text("def test(): pass\n")
+    files = [str(same), str(edited), str(failed)]
+    _, _, hashes = skip_unchanged(files, history, "100")
+    runs({"test_same.py": ("passed", 5), "test_edited.py": ("passed", 5), "test_failed.py": ("failed", 5)},
+         app_version="100", file_hashes=hashes)
+    edited.write_text("def test(): assert True\n")
+
+    to_run, skipped, _ = skip_unchanged(files, history, "100")
+
+    assert skipped == [str(same)] and to_run == [str(edited), str(failed)]
+    assert skip_unchanged(files, history, "101")[1] == []  # new app build
+    assert skip_unchanged(files, history, None)[1] == []  # unknown app version
+
+
+def test_a_test_run_on_every_worker_counts_once(tmp_path):
+    """Worker results of a data-driven file: one row per worker, plus a test every worker ran."""
+    def result(name, history_id, seconds, status="passed"):
+        (tmp_path / f"{name}-result.json").write_text(json.dumps({
+            "fullName": "tests.regression.test_login#test_login", "historyId": history_id,
+            "status": status, "start": 1000, "stop": 1000 + seconds * 1000}))
+
+    for worker in range(3):
+        result(f"row{worker}", f"row-{worker}", 10)
+        result(f"smoke{worker}", "smoke", 4 + worker, status="failed" if worker == 1 else "passed")
+
+    assert collect_allure_results(str(tmp_path)) == [
+        {"test_file": "test_login.py", "status": "failed", "duration": 3 * 10 + 6, "tests": 4}]
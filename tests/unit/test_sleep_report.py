@@ -0,0 +1,37 @@
+from sleep_report import collect_fixed_sleeps
+
+SOURCE = """
+import time
+from time import sleep
+
+
+def test_checkout():
+    time.sleep(2)
+
+    def wait_for_banner():
+        time.sleep(5)
+        sleep(0.5)
+
+    class Page:
+        def open(self):
+            time.sleep(1)
+
+    wait_for_banner()
+    time.sleep(delay)  # not a fixed sleep
+
+
+async def test_async():
+    async def poll():
+        time.sleep(3)
+    await poll()
+"""
+
+
+def test_each_sleep_counts_only_for_its_innermost_function(tmp_path):
+    path = tmp_path / "test_shop.py"
+    path.write_text(SOURCE)
+
+    rows = collect_fixed_sleeps([str(tmp_path)])
+
+    assert rows == [(str(path), "wait_for_banner", 2, 5.5), (str(path), "poll", 1, 3.0),
+                    (str(path), "test_checkout", 1, 2.0), (str(path), "open", 1, 1.0)]
@@ -0,0 +1,28 @@
+from utils import step_metrics as step_metrics_module
+from utils.step_metrics import StepMetricsCollector, StepRecord
+
+
+def test_finish_keeps_the_first_wall_time(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(step_metrics_module.time, "perf_counter", lambda: clock[0])
+    record = StepRecord("test_app", "STEP: Open menu")
+
+    clock[0] = 102.5
+    assert record.finish() is record and record.wall_time == 2.5
+    clock[0] = 110.0
+    record.finish()
+
+    assert record.wall_time == 2.5
+
+
+def test_step_context_finishes_the_record(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(step_metrics_module.time, "perf_counter", lambda: clock[0])
+    collector = StepMetricsCollector()
+
+    with collector.step("STEP: Open menu", test="test_app") as record:
+        clock[0] = 101.0
+        record.finish()  # as execute_step does before it logs the record
+        clock[0] = 105.0
+
+    assert collector.records == [record] and record.wall_time == 1.0
@@ -0,0 +1,39 @@
+import pytest
+
+from core.hierarchy_snapshot import _snapshots, get_snapshot
+from core.step_executor import StepExecutor
+
+PAGE_SOURCE = "<hierarchy><node text='Home' class='android.widget.TextView'/></hierarchy>"
+
+
+class FakeDriver:
+    page_source = PAGE_SOURCE
+
+    def __init__(self):
+        self.keycodes = []
+
+    def press_keycode(self, keycode):
+        self.keycodes.append(keycode)
+
+
+def test_raw_driver_action_in_a_step_invalidates_the_snapshot():
+    driver = FakeDriver()
+    get_snapshot(driver)
+
+    StepExecutor(driver).execute_step("STEP: Recent apps", lambda: driver.press_keycode(187))
+
+    assert driver.keycodes == [187]
+    assert driver not in _snapshots
+
+
+def test_failed_attempt_invalidates_the_snapshot():
+    driver = FakeDriver()
+    get_snapshot(driver)
+
+    def step():
+        driver.press_keycode(187)
+        raise RuntimeError("boom")
+
+    with pytest.raises(pytest.fail.Exception):
+        StepExecutor(driver).execute_step("STEP: Recent apps", step)
+    assert driver not in _snapshots
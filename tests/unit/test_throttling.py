@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils import throttling
+from utils.throttling import LOG_EVERY_N_REQUESTS, TokenBucketThrottler, get_throttler
+
+
+@pytest.fixture
+def device_notes(monkeypatch):
+    notes = []
+    monkeypatch.setattr(throttling.device_log_worker, "submit", lambda *note: notes.append(note))
+    return notes
+
+
+def test_burst_passes_then_requests_are_spaced_by_the_rate(device_notes):
+    throttler = TokenBucketThrottler("unit-5554", rate=20, burst=3)
+
+    started = throttling.time.monotonic()
+    waits = [throttler.acquire() for _ in range(5)]
+    elapsed = throttling.time.monotonic() - started
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(0.03 < wait <= 0.05 for wait in waits[3:])
+    assert 0.08 < elapsed < 0.2
+    assert throttler.total_requests == 5
+    assert throttler.total_wait == pytest.approx(sum(waits))
+
+
+def test_tokens_refill_while_idle(device_notes):
+    throttler = TokenBucketThrottler("unit-5554", rate=50, burst=2)
+    throttler.acquire(), throttler.acquire()
+    throttling.time.sleep(0.05)
+
+    assert throttler.acquire() == 0.0
+
+
+def test_threads_reserve_distinct_slots(device_notes):
+    throttler = TokenBucketThrottler("unit-5554", rate=100, burst=1)
+    waits = []
+    lock = threading.Lock()
+
+    def worker():
+        wait = throttler.acquire()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    waits.sort()
+    assert waits[0] == 0.0
+    assert all(later - earlier > 0.005 for earlier, later in zip(waits, waits[1:]))
+
+
+def test_acquire_async_does_not_block_the_event_loop(device_notes):
+    throttler = TokenBucketThrottler("unit-5554", rate=5, burst=1)
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await throttler.acquire_async()
+        return await asyncio.gather(throttler.acquire_async(), ticker())
+
+    wait, _ = asyncio.run(main())
+
+    assert wait > 0.1 and len(ticks) == 10
+
+
+def test_device_note_every_nth_request_per_minute(device_notes):
+    throttler = TokenBucketThrottler("unit-5554", rate=1e6, burst=10 ** 6)
+
+    for _ in range(LOG_EVERY_N_REQUESTS):
+        throttler.acquire()
+    throttler.acquire(throttle_log=False)
+
+    assert device_notes == [("unit-5554", "AppiumThrottle", f"Request #{LOG_EVERY_N_REQUESTS} in current minute")]
+
+
+def test_one_throttler_per_device():
+    try:
+        first = get_throttler("unit-a")
+        assert get_throttler("unit-a") is first
+        assert get_throttler("unit-b") is not first
+    finally:
+        throttling._throttlers.pop("unit-a", None)
+        throttling._throttlers.pop("unit-b", None)
@@ -0,0 +1,289 @@
+import os
+import select
+import socket
+import subprocess
+import threading
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from utils.step_metrics import record_adb_call
+
+# adb host server (same variables as the adb client itself)
+ADB_SERVER_HOST = os.environ.get("ANDROID_ADB_SERVER_ADDRESS", "127.0.0.1")
+ADB_SERVER_PORT = int(os.environ.get("ANDROID_ADB_SERVER_PORT", "5037"))
+
+# Set ADB_TRANSPORT=subprocess to always spawn the adb binary (old behaviour)
+ADB_TRANSPORT = os.environ.get("ADB_TRANSPORT", "socket")
+MAX_SESSIONS_PER_DEVICE = int(os.environ.get("ADB_MAX_SESSIONS", "4"))
+
+
+class AdbError(Exception):
+    """Raised when the adb host server refuses a request or the connection breaks."""
+
+
+class AdbCommandInterrupted(AdbError):
+    """The connection broke after the command was sent - it may have run on the device."""
+
+
+# ---------------------------------------------------------------------------
+# adb host protocol (smart socket on port 5037)
+# ---------------------------------------------------------------------------
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise AdbError("Connection closed by adb server")
+        data += chunk
+    return data
+
+
+def _send_request(sock: socket.socket, payload: str) -> None:
+    """Sends one '<4-hex-length><payload>' request and checks for OKAY."""
+    data = payload.encode("utf-8")
+    sock.sendall(b"%04x" % len(data) + data)
+    status = _recv_exact(sock, 4)
+    if status == b"OKAY":
+        return
+    if status == b"FAIL":
+        length = int(_recv_exact(sock, 4), 16)
+        raise AdbError(_recv_exact(sock, length).decode("utf-8", "replace"))
+    raise AdbError(f"Unexpected adb response: {status!r}")
+
+
+def open_service(serial: Optional[str], service: str, timeout: float = 5.0,
+                 host: str = ADB_SERVER_HOST, port: int = ADB_SERVER_PORT) -> socket.socket:
+    """
+    Connects to the adb host server, switches to the device transport and
+    opens a device service (e.g. 'exec:sh'). Returns the connected socket.
+    """
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # small framed commands, no Nagle delay
+    try:
+        _send_request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+        _send_request(sock, service)
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+# ---------------------------------------------------------------------------
+# Persistent shell session
+# ---------------------------------------------------------------------------
+
+class AdbShellSession:
+    """
+    Long-lived 'sh' on the device (adb 'exec:sh' service, no pty). Each command
+    is framed with a unique marker that carries the exit code; stderr is captured
+    into a shell variable and sent after the marker, so one round trip returns
+    the same (rc, stdout, stderr) as a separate 'adb shell' process.
+    """
+
+    def __init__(self, serial: Optional[str], host: str = ADB_SERVER_HOST, port: int = ADB_SERVER_PORT):
+        self.serial = serial
+        self._sock = open_service(serial, "exec:sh", host=host, port=port)
+        self._buffer = b""
+        self.closed = False
+        self.commands = 0
+
+    def is_alive(self) -> bool:
+        """
+        An idle session has nothing to read: EOF (device gone, adb server
+        restarted) or stray output means it cannot be used any more.
+        """
+        if self.closed:
+            return False
+        try:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def run(self, command: str, timeout: float = 5.0) -> Tuple[int, str, str]:
+        """
+        Runs a shell command line on the device.
+
+        :param command: Command line, interpreted by the device shell (pipes allowed)
+        :param timeout: Seconds; on timeout the session is closed and rc=124 is returned
+        :raises AdbError: the session is dead, nothing was sent
+        :raises AdbCommandInterrupted: the connection broke after the command was sent
+        """
+        if not self.is_alive():
+            self.close()
+            raise AdbError("Shell session is closed")
+        self.commands += 1
+
+        token = f"__ADBT_{uuid.uuid4().hex}"
+        script = (
+            f"{{ __e=$( {{ ( {command} ) </dev/null; }} 2>&1 1>&3 ); __rc=$?; }} 3>&1; "
+            f"printf '\\n%s %d\\n' {token} $__rc; printf '%s' \"$__e\"; printf '\\n%s\\n' {token}_END\n"
+        )
+        end_marker = f"\n{token}_END\n".encode()
+
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.sendall(script.encode("utf-8"))
+            while end_marker not in self._buffer:
+                chunk = self._sock.recv(65536)
+                if not chunk:
+                    raise AdbError("Shell session closed")
+                self._buffer += chunk
+        except socket.timeout:
+            self.close()
+            return 124, "", "TimeoutExpired"
+        except (OSError, AdbError) as e:
+            self.close()
+            raise AdbCommandInterrupted(str(e))
+
+        frame, self._buffer = self._buffer.split(end_marker, 1)
+        stdout, _, rest = frame.partition(f"\n{token} ".encode())
+        rc_text, _, stderr = rest.partition(b"\n")
+        return (int(rc_text or 1),
+                stdout.decode("utf-8", "replace").strip(),
+                stderr.decode("utf-8", "replace").strip())
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class AdbTransportPool:
+    """
+    Pool of persistent shell sessions per device. Concurrent callers each get
+    their own session (up to max_sessions per device, then they wait).
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS_PER_DEVICE,
+                 host: str = ADB_SERVER_HOST, port: int = ADB_SERVER_PORT):
+        self.max_sessions = max_sessions
+        self.host = host
+        self.port = port
+        self._cond = threading.Condition()
+        self._idle: Dict[Optional[str], List[AdbShellSession]] = {}
+        self._count: Dict[Optional[str], int] = {}
+
+    def _acquire(self, serial: Optional[str]) -> AdbShellSession:
+        with self._cond:
+            while True:
+                idle = self._idle.get(serial)
+                if idle:
+                    return idle.pop()
+                if self._count.get(serial, 0) < self.max_sessions:
+                    self._count[serial] = self._count.get(serial, 0) + 1
+                    break
+                self._cond.wait()
+
+        try:
+            return AdbShellSession(serial, host=self.host, port=self.port)
+        except Exception:
+            self._forget(serial)
+            raise
+
+    def _release(self, session: AdbShellSession) -> None:
+        if session.closed:
+            self._forget(session.serial)
+            return
+        with self._cond:
+            self._idle.setdefault(session.serial, []).append(session)
+            self._cond.notify()
+
+    def _forget(self, serial: Optional[str]) -> None:
+        with self._cond:
+            self._count[serial] = max(0, self._count.get(serial, 0) - 1)
+            self._cond.notify()
+
+    def run(self, serial: Optional[str], command: str, timeout: float = 5.0) -> Tuple[int, str, str]:
+        """
+        Runs a command on the device through a pooled session. Idle sessions that
+        died in the meantime are dropped and replaced before the command is sent.
+
+        :raises AdbError: no session could be opened (nothing was sent)
+        :raises AdbCommandInterrupted: the connection broke after the command was sent
+        """
+        while True:
+            session = self._acquire(serial)
+            try:
+                return session.run(command, timeout=timeout)
+            except AdbCommandInterrupted:
+                raise
+            except AdbError:
+                if not session.commands:
+                    raise  # a new session that is dead already
+            finally:
+                self._release(session)  # closed sessions are forgotten
+
+    def close_all(self) -> None:
+        with self._cond:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+            self._count.clear()
+        for session in sessions:
+            session.close()
+
+
+adb_pool = AdbTransportPool()
+
+
+# ---------------------------------------------------------------------------
+# adb command runner
+# ---------------------------------------------------------------------------
+
+def _split_shell_command(cmd_args: list) -> Optional[Tuple[Optional[str], str]]:
+    """
+    Returns (serial, command line) for 'adb [-s SERIAL] shell ...' invocations,
+    or None for anything the persistent transport does not handle.
+    """
+    if not cmd_args or os.path.basename(cmd_args[0]) not in ("adb", "adb.exe"):
+        return None
+    args = list(cmd_args[1:])
+    serial = os.environ.get("ANDROID_SERIAL")
+    if len(args) >= 2 and args[0] == "-s":
+        serial, args = args[1], args[2:]
+    if len(args) < 2 or args[0] != "shell":
+        return None
+    # adb itself joins the arguments with spaces for the device shell
+    return serial, " ".join(str(a) for a in args[1:])
+
+
+def _run_subprocess(cmd_args: list, timeout: int) -> Tuple[int, str, str]:
+    try:
+        proc = subprocess.run(
+            cmd_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=timeout / 1000,
+            check=False,
+        )
+        return proc.returncode, proc.stdout.strip(), proc.stderr.strip()
+    except subprocess.TimeoutExpired:
+        return 124, "", "TimeoutExpired"
+    except OSError as e:
+        return 127, "", str(e)
+
+
+def run_adb(cmd_args: list, timeout: int = 5000) -> Tuple[int, str, str]:
+    """
+    Run adb and return (returncode, stdout, stderr). Timeout in ms.
+    'adb [-s SERIAL] shell ...' commands go through the persistent transport
+    pool; everything else (or an unreachable adb server) uses a subprocess.
+    A command whose connection broke after it was sent is not run again
+    (rc=1, the error in stderr).
+    """
+    record_adb_call()
+    if ADB_TRANSPORT != "subprocess":
+        shell = _split_shell_command(cmd_args)
+        if shell is not None:
+            serial, command = shell
+            try:
+                return adb_pool.run(serial, command, timeout=timeout / 1000)
+            except AdbCommandInterrupted as e:
+                return 1, "", f"adb connection lost while running the command: {e}"
+            except (AdbError, OSError):
+                pass  # adb server not reachable / device gone, nothing sent - fall back to the adb binary
+    return _run_subprocess(cmd_args, timeout)
@@ -0,0 +1,99 @@
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from utils.adb_transport import run_adb
+from utils.framework_log import get_logger
+
+# App states returned by AppStateService.get_state()
+APP_NOT_RUNNING = "not_running"
+APP_BACKGROUND = "background"
+APP_FOREGROUND = "foreground"
+
+DEFAULT_STATE_TTL = 10  # seconds
+
+_PID_LINE = re.compile(r"^\d+(\s+\d+)*$")
+
+log = get_logger("app_state")
+
+
+class AppStateService:
+    """
+    Per-device app state (not running / background / foreground) with TTL caching.
+
+    One adb shell round trip runs 'pidof <package>' (exact process-name match,
+    so 'com.pkg' does not match 'com.pkg.other' or 'com.pkg:service') and reads
+    the resumed activity from 'dumpsys activity activities'.
+    """
+
+    def __init__(self, device_name: str, ttl: float = DEFAULT_STATE_TTL):
+        """
+        :param device_name: adb serial of the device
+        :param ttl: How long (seconds) a probed state is reused
+        """
+        self.device_name = device_name
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[str, float]] = {}
+
+    def get_state(self, app_package: str, max_age: Optional[float] = None) -> str:
+        """
+        Returns APP_NOT_RUNNING, APP_BACKGROUND or APP_FOREGROUND.
+
+        :param max_age: Maximum age (seconds) of a cached state; defaults to the service TTL
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            cached = self._cache.get(app_package)
+        if cached and time.monotonic() - cached[1] <= max_age:
+            return cached[0]
+
+        state = self._probe(app_package)
+        self.set_state(app_package, state)
+        return state
+
+    def set_state(self, app_package: str, state: str) -> None:
+        """Records a known state (e.g. right after activate_app/terminate_app)."""
+        with self._lock:
+            self._cache[app_package] = (state, time.monotonic())
+
+    def invalidate(self, app_package: Optional[str] = None) -> None:
+        with self._lock:
+            if app_package is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(app_package, None)
+
+    def _probe(self, app_package: str) -> str:
+        rc, out, err = run_adb([
+            "adb", "-s", self.device_name, "shell",
+            "pidof", app_package, ";",
+            "dumpsys", "activity", "activities", "|", "grep", "-e", "mResumedActivity", "-e", "topResumedActivity",
+        ])
+        if not out:
+            if rc not in (0, 1):
+                log.warning("Failed to check the application (rc=%s): %s", rc, err)
+            return APP_NOT_RUNNING
+
+        lines = [line.strip() for line in out.splitlines() if line.strip()]
+        if not any(_PID_LINE.match(line) for line in lines):
+            return APP_NOT_RUNNING
+
+        # e.g. 'mResumedActivity: ActivityRecord{1a2b3c u0 com.pkg/.MainActivity t12}'
+        if any(f" {app_package}/" in line for line in lines if not _PID_LINE.match(line)):
+            return APP_FOREGROUND
+        return APP_BACKGROUND
+
+
+_services: Dict[str, AppStateService] = {}
+_services_lock = threading.Lock()
+
+
+def get_app_state_service(device_name: str) -> AppStateService:
+    """Returns the app state service of the given device (created on first use)."""
+    with _services_lock:
+        service = _services.get(device_name)
+        if service is None:
+            service = _services[device_name] = AppStateService(device_name)
+        return service
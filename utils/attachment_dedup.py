@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from utils.file_lock import FileLock
+
+# Set ALLURE_DEDUP=0 to keep one file per attachment
+DEDUP_ENABLED = os.environ.get("ALLURE_DEDUP", "1") != "0"
+
+LOCK_FILE = ".dedup.lock"  # parallel workers / runs take turns on the same reports folder
+
+
+def content_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def blob_name(digest: str, source: str) -> str:
+    """Content-addressed file name, keeping Allure's '-attachment<ext>' suffix."""
+    return f"{digest}-attachment{os.path.splitext(source)[1]}"
+
+
+def _rewrite_sources(item: dict, mapping: Dict[str, str]) -> bool:
+    """Points attachment sources of a result/container (nested steps, fixtures) to their blobs."""
+    changed = False
+    for attachment in item.get("attachments", []):
+        blob = mapping.get(attachment.get("source"))
+        if blob and blob != attachment["source"]:
+            attachment["source"] = blob
+            changed = True
+    for key in ("steps", "befores", "afters"):
+        for child in item.get(key, []):
+            changed = _rewrite_sources(child, mapping) or changed
+    return changed
+
+
+def _referenced_sources(item: dict) -> set:
+    sources = {a["source"] for a in item.get("attachments", []) if a.get("source")}
+    for key in ("steps", "befores", "afters"):
+        for child in item.get(key, []):
+            sources |= _referenced_sources(child)
+    return sources
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        pass
+    except OSError:  # no hard links on this file system
+        with open(source, "rb") as src, open(target + ".tmp", "wb") as dst:
+            for chunk in iter(lambda: src.read(1 << 16), b""):
+                dst.write(chunk)
+        os.replace(target + ".tmp", target)
+
+
+def dedupe_attachments(reports_dir: str, since_ms: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """
+    Stores the Allure attachments of reports_dir content-addressed: every
+    distinct content is kept once as '<sha256>-attachment<ext>', result and
+    container JSON files are rewritten to point to it and the per-attachment
+    files are removed. Identical "Success"/"Test report" texts and empty
+    attachments end up as a single file.
+
+    Only attachments referenced by complete result/container files are touched,
+    so it is safe to run while other workers still write to the same folder.
+
+    :param since_ms: Only touch result/container files written at/after this epoch time (ms),
+                     i.e. the current run; earlier runs in reports_dir are left as they are
+    :return: {'attachments', 'blobs', 'removed', 'bytes_saved'} or None if reports_dir is missing
+    """
+    if not os.path.isdir(reports_dir):
+        return None
+
+    stats = {"attachments": 0, "blobs": 0, "removed": 0, "bytes_saved": 0}
+    with FileLock(os.path.join(reports_dir, LOCK_FILE)):
+        documents = {}
+        for name in os.listdir(reports_dir):
+            if name.endswith("-result.json") or name.endswith("-container.json"):
+                path = os.path.join(reports_dir, name)
+                try:
+                    if since_ms is not None and os.path.getmtime(path) * 1000 < since_ms:
+                        continue
+                    with open(path, "r", encoding="utf-8") as f:
+                        documents[path] = json.load(f)
+                except (OSError, ValueError):
+                    continue  # still being written
+
+        # Hash every referenced attachment and make sure its blob exists
+        mapping: Dict[str, str] = {}
+        blob_bytes = 0  # size of the blobs created in this pass
+        for data in documents.values():
+            for source in _referenced_sources(data):
+                if source in mapping:
+                    continue
+                path = os.path.join(reports_dir, source)
+                if not os.path.isfile(path):
+                    continue
+                blob = blob_name(content_hash(path), source)
+                mapping[source] = blob
+                if blob != source:
+                    stats["attachments"] += 1
+                    blob_path = os.path.join(reports_dir, blob)
+                    if not os.path.exists(blob_path):
+                        _link_or_copy(path, blob_path)
+                        blob_bytes += os.path.getsize(blob_path)
+
+        # Rewrite the JSON files first, only then remove the replaced attachments
+        for path, data in documents.items():
+            if _rewrite_sources(data, mapping):
+                _write_json(path, data)
+
+        for source, blob in mapping.items():
+            if source == blob:
+                continue
+            path = os.path.join(reports_dir, source)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            stats["removed"] += 1
+            stats["bytes_saved"] += size
+        stats["blobs"] = len(set(mapping.values()))
+        stats["bytes_saved"] = max(0, stats["bytes_saved"] - blob_bytes)
+    return stats
@@ -0,0 +1,176 @@
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from utils.step_metrics import METRICS_DIR, current_test_name, step_metrics
+
+# Opt-in: APPIUM_PROFILE=1 or 'pytest --appium-profile'
+PROFILE_ENABLED = os.environ.get("APPIUM_PROFILE", "") == "1"
+
+
+class _CommandStats:
+    """Latency samples (ms, array-backed) and payload sizes of one command type."""
+
+    __slots__ = ("durations", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.durations = array("d")
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.durations)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(math.ceil(p / 100 * len(ordered))) - 1)]
+
+    def histogram(self) -> Dict[str, int]:
+        """Counts per power-of-two latency bucket, e.g. {'<=16ms': 3, '<=32ms': 10}."""
+        buckets: Dict[str, int] = {}
+        for duration in self.durations:
+            upper = 1 << max(0, math.ceil(math.log2(max(duration, 1.0))))
+            key = f"<={upper}ms"
+            buckets[key] = buckets.get(key, 0) + 1
+        return buckets
+
+    def summary(self) -> dict:
+        count = len(self.durations)
+        return {
+            "count": count,
+            "total_ms": round(sum(self.durations), 3),
+            "mean_ms": round(sum(self.durations) / count, 3) if count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "max_ms": round(max(self.durations), 3) if count else 0.0,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "histogram": self.histogram(),
+        }
+
+
+class CommandProfiler:
+    """
+    Records every Appium command sent by instrumented drivers: latency per
+    command type, request/response payload sizes and the test/step it belongs
+    to. Results are written as a Chrome trace (chrome://tracing, Perfetto,
+    speedscope) plus a JSON latency summary.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stats: Dict[str, _CommandStats] = {}
+        self.events: List[dict] = []
+
+    @staticmethod
+    def command_name(command: str, params: dict) -> str:
+        """Selenium command name; 'execute/<script>' for mobile: commands."""
+        if command in ("executeScript", "w3cExecuteScript") and isinstance(params, dict):
+            script = str(params.get("script", ""))
+            if script.startswith("mobile:"):
+                return f"execute/{script}"
+        return command
+
+    def record(self, command: str, params: dict, response, start: float, duration: float) -> None:
+        name = self.command_name(command, params)
+        request_bytes = len(json.dumps(params, default=str)) if params else 0
+        response_bytes = len(json.dumps(response, default=str)) if response is not None else 0
+        record = step_metrics.current
+        event = {
+            "name": name,
+            "cat": "appium",
+            "ph": "X",
+            "ts": int(start * 1e6),
+            "dur": max(1, int(duration * 1e6)),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {
+                "test": current_test_name(),
+                "step": record.step if record is not None else "",
+                "request_bytes": request_bytes,
+                "response_bytes": response_bytes,
+            },
+        }
+        with self._lock:
+            stats = self.stats.setdefault(name, _CommandStats())
+            stats.durations.append(duration * 1000)
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            self.events.append(event)
+
+    def instrument(self, driver):
+        """Wraps the driver's command executor (idempotent, no-op when disabled)."""
+        executor = driver.command_executor
+        if not self.enabled or getattr(executor, "_profiler_instrumented", False):
+            return driver
+
+        original_execute = executor.execute
+
+        def execute(command, params):
+            start = time.time()
+            started = time.perf_counter()
+            response = None
+            try:
+                response = original_execute(command, params)
+                return response
+            finally:
+                self.record(command, params, response, start, time.perf_counter() - started)
+
+        executor.execute = execute
+        executor._profiler_instrumented = True
+        return driver
+
+    def chrome_trace(self) -> dict:
+        """Trace events: one span per step (from step_metrics) and one per Appium command."""
+        pid = os.getpid()
+        step_events = [{
+            "name": r.step,
+            "cat": "step",
+            "ph": "X",
+            "ts": int(r.start * 1e6),
+            "dur": max(1, int(r.wall_time * 1e6)),
+            "pid": pid,
+            "tid": threading.main_thread().ident,
+            "args": {"test": r.test, "status": r.status},
+        } for r in step_metrics.records]
+        with self._lock:
+            return {"traceEvents": step_events + list(self.events), "displayTimeUnit": "ms"}
+
+    def latency_summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self.stats.items())}
+
+    def write_files(self, directory: str = METRICS_DIR, run_name: Optional[str] = None) -> Optional[str]:
+        """Writes <run_name>.trace.json and <run_name>.latency.json; returns the trace path."""
+        if not self.events:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        if run_name is None:
+            worker = os.environ.get("APPIUM_DEVICE", "local").replace(":", "_")
+            run_name = f"appium_profile_{time.strftime('%Y%m%d_%H%M%S')}_{worker}"
+
+        trace_path = os.path.join(directory, f"{run_name}.trace.json")
+        with open(trace_path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        with open(os.path.join(directory, f"{run_name}.latency.json"), "w", encoding="utf-8") as f:
+            json.dump(self.latency_summary(), f, indent=2)
+        return trace_path
+
+    def format_summary(self) -> str:
+        summary = self.latency_summary()
+        if not summary:
+            return "No Appium commands recorded."
+
+        lines = [f"{'Count':>6} {'Total[ms]':>10} {'p50[ms]':>8} {'p95[ms]':>8} {'Max[ms]':>8} {'Resp[KB]':>9}  Command"]
+        for name, s in sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            lines.append(f"{s['count']:>6} {s['total_ms']:>10.1f} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+                         f"{s['max_ms']:>8.1f} {s['response_bytes'] / 1024:>9.1f}  {name}")
+        return "\n".join(lines)
+
+
+command_profiler = CommandProfiler()
@@ -0,0 +1,207 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from utils.driver_setup import (
+    DEFAULT_APP_PACKAGE,
+    DEFAULT_DEVICE_NAME,
+    bring_up_executor,
+    count_request,
+    create_driver,
+    driver_device_name,
+    update_activity_time,
+)
+from utils.app_state import APP_FOREGROUND, get_app_state_service
+from utils.framework_log import get_logger
+
+log = get_logger("driver_pool")
+
+
+# ---------------------------------------------------------------------------
+# Driver pool (warm Appium sessions leased to tests)
+# ---------------------------------------------------------------------------
+
+class DriverPool:
+    """
+    Keeps warm Appium sessions per device and leases them to tests.
+
+    A new UiAutomator2 session is created only when no idle, healthy session
+    exists for the requested device. Between leases the app is restarted
+    (terminate_app + activate_app) so each test starts from a clean app state
+    without paying for a new session.
+    """
+
+    def __init__(self,
+                 factory: Callable = create_driver,
+                 app_package: str = DEFAULT_APP_PACKAGE,
+                 reset_between_leases: bool = True):
+        """
+        :param factory: Callable(device_name, app_package) returning a new driver
+        :param app_package: Package name of the application under test
+        :param reset_between_leases: Restart the app before re-leasing a warm session
+        """
+        self.factory = factory
+        self.app_package = app_package
+        self.reset_between_leases = reset_between_leases
+
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List] = {}
+        self._leased: Dict[int, str] = {}
+        self._all: List = []
+        self._pending: Dict[str, List[Future]] = {}  # sessions being created by prewarm()
+
+    def acquire(self, device_name: str = DEFAULT_DEVICE_NAME):
+        """
+        Returns a healthy driver for the given device, reusing an idle session
+        when possible.
+
+        :param device_name: adb serial of the target device/emulator
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(device_name, [])
+                driver = idle.pop() if idle else None
+
+            if driver is None:
+                break
+
+            if not self.is_healthy(driver):
+                log.warning("[DriverPool] Session %s on %s is unhealthy. Discarding...", driver.session_id, device_name)
+                self._discard(driver)
+                continue
+
+            if self.reset_between_leases:
+                try:
+                    self.reset_app(driver)
+                except Exception as e:
+                    log.warning("[DriverPool] App reset failed on %s: %s. Discarding session...", device_name, e)
+                    self._discard(driver)
+                    continue
+
+            log.debug("[DriverPool] Reusing warm session %s on %s", driver.session_id, device_name)
+            with self._lock:
+                self._leased[id(driver)] = device_name
+            return driver
+
+        with self._lock:
+            pending = self._pending.get(device_name)
+            future = pending.pop(0) if pending else None
+
+        if future is not None:
+            try:
+                driver = future.result()
+                log.info("[DriverPool] Using prewarmed session %s on %s", driver.session_id, device_name)
+            except Exception as e:
+                log.warning("[DriverPool] Prewarming a session on %s failed: %s", device_name, e)
+
+        if driver is None:
+            log.info("[DriverPool] No warm session for %s. Creating a new one...", device_name)
+            driver = self.factory(device_name=device_name, app_package=self.app_package)
+        with self._lock:
+            self._all.append(driver)
+            self._leased[id(driver)] = device_name
+        return driver
+
+    def prewarm(self, device_name: str = DEFAULT_DEVICE_NAME) -> Future:
+        """
+        Starts creating a session for the device in the background; the next
+        acquire() without an idle session waits for it instead of starting over.
+
+        :param device_name: adb serial of the target device/emulator
+        """
+        future = bring_up_executor.submit(self.factory, device_name=device_name, app_package=self.app_package)
+        with self._lock:
+            self._pending.setdefault(device_name, []).append(future)
+        return future
+
+    def release(self, driver, discard: bool = False) -> None:
+        """
+        Returns a leased driver to the pool.
+
+        :param driver: Driver obtained from acquire()
+        :param discard: Quit the session instead of keeping it warm
+        """
+        with self._lock:
+            device_name = self._leased.pop(id(driver), None)
+
+        if device_name is None:
+            return
+
+        if discard or not self.is_healthy(driver):
+            self._discard(driver)
+            return
+
+        with self._lock:
+            self._idle.setdefault(device_name, []).append(driver)
+
+    @contextmanager
+    def lease(self, device_name: str = DEFAULT_DEVICE_NAME):
+        """
+        Context manager leasing a driver for the duration of the block.
+
+        :param device_name: adb serial of the target device/emulator
+        """
+        driver = self.acquire(device_name)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def is_healthy(self, driver) -> bool:
+        """Checks that the session still answers a cheap command."""
+        if not getattr(driver, "session_id", None):
+            return False
+        try:
+            driver.current_package
+            return True
+        except Exception:
+            return False
+
+    def reset_app(self, driver) -> None:
+        """Restarts the app under test inside an existing session."""
+        device_name = driver_device_name(driver)
+        count_request(device_name=device_name)
+        driver.terminate_app(self.app_package)
+        count_request(device_name=device_name)
+        driver.activate_app(self.app_package)
+        get_app_state_service(device_name).set_state(self.app_package, APP_FOREGROUND)
+        update_activity_time()
+
+    def close_all(self) -> None:
+        """Quits every session created by the pool."""
+        with self._lock:
+            drivers = list(self._all)
+            pending = [future for futures in self._pending.values() for future in futures]
+            self._all.clear()
+            self._idle.clear()
+            self._leased.clear()
+            self._pending.clear()
+
+        for future in pending:
+            if not future.cancel():
+                future.add_done_callback(_quit_prewarmed)
+
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def _quit_prewarmed(future: Future) -> None:
+    """Quits a prewarmed session nobody leased."""
+    if future.exception() is None:
+        try:
+            future.result().quit()
+        except Exception:
+            pass
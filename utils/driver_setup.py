@@ -1,69 +1,73 @@
+import os
 import time
-import subprocess
 import re
-from typing import Optional, Tuple
-
-from appium import webdriver
-from appium.options.android import UiAutomator2Options
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.adb_transport import run_adb
+from utils.app_state import (
+    APP_BACKGROUND,
+    APP_FOREGROUND,
+    APP_NOT_RUNNING,
+    DEFAULT_STATE_TTL,
+    get_app_state_service,
+)
+from utils.command_profiler import command_profiler
+from utils.framework_log import get_logger
+from utils.launcher_cache import launcher_cache
+from utils.step_metrics import instrument_driver
+from utils.throttling import get_throttler
 
 # ---------------------------------------------------------------------------
-# Global throttling state
+# Activity tracking
 # ---------------------------------------------------------------------------
 last_activity_time = time.time()
-request_counter = 0
-request_window_start = time.time()
-last_request_time = 0
 
-# Throttling configuration
-MIN_INTERVAL_BETWEEN_REQUESTS = 0.35  # ~171 requests/minute
+# Application / device under test
+DEFAULT_APP_PACKAGE = "com.okinc.okex.gp"
 
+# Device and Appium server. The parallel runner (run_selected_R_tests.py) gives
+# every worker its own device, Appium port and UiAutomator2 systemPort via env.
+DEFAULT_DEVICE_NAME = os.environ.get("APPIUM_DEVICE", "emulator-5554")
+APPIUM_HOST = os.environ.get("APPIUM_HOST", "127.0.0.1")
+APPIUM_PORT = int(os.environ.get("APPIUM_PORT", "4723"))
+APPIUM_SYSTEM_PORT = int(os.environ["APPIUM_SYSTEM_PORT"]) if os.environ.get("APPIUM_SYSTEM_PORT") else None
 
-def update_activity_time():
-    """Track last user/action activity timestamp."""
-    global last_activity_time
-    last_activity_time = time.time()
+# Implicit wait (seconds) of every new session
+IMPLICIT_WAIT = 10
 
+# Set LAUNCHER_CACHE_REFRESH=1 to ignore cached launcher activities and resolve them again
+LAUNCHER_CACHE_REFRESH = os.environ.get("LAUNCHER_CACHE_REFRESH", "") == "1"
 
-def count_request(throttle_log: bool = True):
-    """
-    Simple throttling for calls that may hit ADB/Appium. Keeps per-minute counter
-    and enforces a minimum interval between subsequent calls.
-    """
-    global request_counter, request_window_start, last_request_time
+# Driver bring-up: max. wait for a booting device / for the new session to answer (seconds)
+DEVICE_READY_TIMEOUT = 120
+SESSION_READY_TIMEOUT = 10
 
-    now = time.time()
-    elapsed_since_last = now - last_request_time
+log = get_logger("driver")
 
-    # Enforce a minimum request interval
-    if elapsed_since_last < MIN_INTERVAL_BETWEEN_REQUESTS:
-        sleep_time = MIN_INTERVAL_BETWEEN_REQUESTS - elapsed_since_last
-        print(f"[Throttle] ⏳ Wait {sleep_time:.3f}s, not to exceed the limit.")
-        time.sleep(sleep_time)
+# Sessions created in the background (create_driver_async, DriverPool.prewarm)
+bring_up_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="DriverBringUp")
+# adb probes of one bring-up that run alongside each other
+_probe_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="DriverProbe")
 
-    last_request_time = time.time()
 
-    # Reset counter each minute
-    if now - request_window_start > 60:
-        request_counter = 0
-        request_window_start = now
+def update_activity_time():
+    """Track last user/action activity timestamp."""
+    global last_activity_time
+    last_activity_time = time.time()
 
-    request_counter += 1
-    print(f"[Request] #{request_counter} in the current 1-minute window")
 
-    # Log to device every 50th request (and after 200)
-    if throttle_log and (request_counter % 50 == 0 or request_counter > 200):
-        subprocess.run(
-            ["adb", "shell", "log", "-t", "AppiumThrottle", f"Request #{request_counter} in current minute"],
-            check=False,
-        )
+def count_request(throttle_log: bool = True, device_name: str = DEFAULT_DEVICE_NAME) -> float:
+    """
+    Throttling for calls that may hit ADB/Appium. Delegates to the per-device
+    token bucket (utils/throttling.py), which allows short bursts and sends
+    AppiumThrottle device-log notes from a background thread.
 
-    if request_counter > 200:
-        print(f"[Throttle] ⚠️ EXCEEDED 200 requests/min — current: {request_counter}")
-        subprocess.run(
-            ["adb", "shell", "log", "-t", "AppiumThrottle",
-             f"⚠️ THROTTLE: exceeded 200 requests/min — current: {request_counter}"],
-            check=False,
-        )
+    :return: Seconds spent waiting for the throttler
+    """
+    return get_throttler(device_name).acquire(throttle_log=throttle_log)
 
 
 # ---------------------------------------------------------------------------
@@ -73,19 +77,10 @@ def count_request(throttle_log: bool = True):
 def _run_adb(cmd_args: list, timeout: int = 5000) -> Tuple[int, str, str]:
     """
     Run adb and return (returncode, stdout, stderr). Timeout in ms.
+    Shell commands reuse persistent per-device sessions (utils/adb_transport.py)
+    instead of spawning a new adb process every time.
     """
-    try:
-        proc = subprocess.run(
-            cmd_args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout / 1000,
-            check=False,
-        )
-        return proc.returncode, proc.stdout.strip(), proc.stderr.strip()
-    except subprocess.TimeoutExpired:
-        return 124, "", "TimeoutExpired"
+    return run_adb(cmd_args, timeout=timeout)
 
 
 def _extract_activity_from_component_line(line: str, app_package: str) -> Optional[str]:
@@ -130,7 +125,55 @@ def _extract_activity_from_component_line(line: str, app_package: str) -> Option
     return None
 
 
-def resolve_launcher_activity(app_package: str, device_name: str = "emulator-5554") -> Optional[str]:
+def probe_installed_version(app_package: str, device_name: str = DEFAULT_DEVICE_NAME) -> Optional[Dict[str, str]]:
+    """
+    Single cheap adb call returning {'versionCode': ..., 'lastUpdateTime': ...}
+    of the installed package (filtered on the device), or None if unavailable.
+    """
+    rc, out, err = _run_adb([
+        "adb", "-s", device_name, "shell", "dumpsys", "package", app_package,
+        "|", "grep", "-e", "versionCode=", "-e", "lastUpdateTime="
+    ])
+    if rc != 0 or not out:
+        return None
+
+    version_code = re.search(r"versionCode=(\d+)", out)
+    last_update = re.search(r"lastUpdateTime=([^\r\n]+)", out)
+    if not version_code or not last_update:
+        return None
+    return {"versionCode": version_code.group(1), "lastUpdateTime": last_update.group(1).strip()}
+
+
+def resolve_launcher_activity(app_package: str,
+                              device_name: str = DEFAULT_DEVICE_NAME,
+                              force_refresh: bool = LAUNCHER_CACHE_REFRESH) -> Optional[str]:
+    """
+    Resolve an exported LAUNCHER activity for the given app package, using the
+    on-disk cache (utils/launcher_cache.py) while the installed versionCode and
+    lastUpdateTime are unchanged.
+
+    :param force_refresh: Skip the cache lookup and resolve again via adb
+    """
+    version = probe_installed_version(app_package, device_name)
+    if version is None:
+        launcher_cache.stats["probe_failures"] += 1
+        return _resolve_launcher_activity_uncached(app_package, device_name)
+
+    if force_refresh:
+        launcher_cache.stats["forced"] += 1
+    else:
+        cached = launcher_cache.get(device_name, app_package, version)
+        if cached:
+            log.debug("[Resolve] cache hit (%s) -> %s", version["versionCode"], cached)
+            return cached
+
+    activity = _resolve_launcher_activity_uncached(app_package, device_name)
+    if activity:
+        launcher_cache.put(device_name, app_package, version, activity)
+    return activity
+
+
+def _resolve_launcher_activity_uncached(app_package: str, device_name: str = DEFAULT_DEVICE_NAME) -> Optional[str]:
     """
     Resolve an exported LAUNCHER activity for the given app package.
     Strategy:
@@ -149,11 +192,11 @@ def resolve_launcher_activity(app_package: str, device_name: str = "emulator-555
         for line in out.splitlines():
             act = _extract_activity_from_component_line(line, app_package)
             if act:
-                print(f"[Resolve] cmd package MAIN/LAUNCHER -> {line} -> {act}")
+                log.info("[Resolve] cmd package MAIN/LAUNCHER -> %s -> %s", line, act)
                 return act
-        print(f"[Resolve] cmd package MAIN/LAUNCHER returned but unparsable: {out!r}")
+        log.debug("[Resolve] cmd package MAIN/LAUNCHER returned but unparsable: %r", out)
     else:
-        print(f"[Resolve] cmd package MAIN/LAUNCHER failed (rc={rc}): {err or out}")
+        log.debug("[Resolve] cmd package MAIN/LAUNCHER failed (rc=%s): %s", rc, err or out)
 
     # --- B) Fallback: mCurrentFocus ---
     rc, out, err = _run_adb(["adb", "-s", device_name, "shell", "dumpsys", "window"])
@@ -168,11 +211,11 @@ def resolve_launcher_activity(app_package: str, device_name: str = "emulator-555
                     comp_part = line.split("=", 1)[-1]
                 act = _extract_activity_from_component_line(comp_part, app_package)
                 if act:
-                    print(f"[Resolve] mCurrentFocus -> {comp_part.strip()} -> {act}")
+                    log.info("[Resolve] mCurrentFocus -> %s -> %s", comp_part.strip(), act)
                     return act
-        print(f"[Resolve] mCurrentFocus fallback returned but no match for {app_package}")
+        log.debug("[Resolve] mCurrentFocus fallback returned but no match for %s", app_package)
     else:
-        print(f"[Resolve] mCurrentFocus failed (rc={rc}): {err or out}")
+        log.debug("[Resolve] mCurrentFocus failed (rc=%s): %s", rc, err or out)
 
     # --- C) Fallback: dumpsys package (parse MAIN/LAUNCHER) ---
     rc, out, err = _run_adb(["adb", "-s", device_name, "shell", "dumpsys", "package", app_package])
@@ -189,18 +232,18 @@ def resolve_launcher_activity(app_package: str, device_name: str = "emulator-555
                             comp_token = w.split()[-1]
                             act = _extract_activity_from_component_line(comp_token, app_package)
                             if act:
-                                print(f"[Resolve] dumpsys package (component) -> {w.strip()} -> {act}")
+                                log.info("[Resolve] dumpsys package (component) -> %s -> %s", w.strip(), act)
                                 return act
                         # Or name=fully.qualified.Activity
                         m = re.search(r"name=([A-Za-z_][\w\.]+)", w)
                         if m:
                             act = m.group(1)
                             act = f"{app_package}{act}" if act.startswith(".") else act
-                            print(f"[Resolve] dumpsys package (name=) -> {w.strip()} -> {act}")
+                            log.info("[Resolve] dumpsys package (name=) -> %s -> %s", w.strip(), act)
                             return act
-        print(f"[Resolve] dumpsys package found no MAIN/LAUNCHER mapping for {app_package}")
+        log.warning("[Resolve] dumpsys package found no MAIN/LAUNCHER mapping for %s", app_package)
     else:
-        print(f"[Resolve] dumpsys package failed (rc={rc}): {err or out}")
+        log.warning("[Resolve] dumpsys package failed (rc=%s): %s", rc, err or out)
 
     # Nothing found
     return None
@@ -210,28 +253,89 @@ def resolve_launcher_activity(app_package: str, device_name: str = "emulator-555
 # Driver creation (Appium 2 / W3C)
 # ---------------------------------------------------------------------------
 
-def create_driver():
+def wait_for_device_ready(device_name: str = DEFAULT_DEVICE_NAME, timeout: float = DEVICE_READY_TIMEOUT) -> bool:
+    """
+    Polls 'getprop sys.boot_completed' while the device is booting (offline,
+    authorizing or boot not completed). Returns False on timeout or when the
+    device cannot be probed at all.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.25
+    while True:
+        rc, out, err = _run_adb(["adb", "-s", device_name, "shell", "getprop", "sys.boot_completed"])
+        if rc == 0 and out.strip() == "1":
+            return True
+        booting = rc == 0 or any(state in (err or out).lower() for state in ("offline", "authorizing", "connecting"))
+        if not booting or time.monotonic() + delay > deadline:
+            log.warning("[BringUp] %s not ready (rc=%s): %s", device_name, rc, err or out)
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+def wait_for_session_ready(driver, timeout: float = SESSION_READY_TIMEOUT) -> Optional[str]:
+    """
+    Readiness signal of a new session (instead of a fixed sleep): polls the
+    foreground package until UiAutomator2 answers. Returns it, or None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        try:
+            return driver.current_package
+        except WebDriverException as e:
+            if time.monotonic() + delay > deadline:
+                log.warning("[BringUp] Session %s not ready after %ss: %s", driver.session_id, timeout, e)
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+
+def create_driver(device_name: str = DEFAULT_DEVICE_NAME,
+                  app_package: str = DEFAULT_APP_PACKAGE,
+                  appium_port: int = APPIUM_PORT,
+                  system_port: Optional[int] = APPIUM_SYSTEM_PORT):
     """
     Creates and returns an Appium driver for Android (UiAutomator2) with
     robust timeouts suitable for emulators and apps with splash/redirects.
     Dynamically resolves the exported LAUNCHER activity to avoid
     SecurityException for non-exported internal activities.
+
+    The session is requested as soon as the device is ready, without launching
+    the app (autoLaunch off), while the launcher activity is resolved alongside
+    it. After the session request the first answered command (the foreground
+    package) marks the session as ready and tells whether the app still has to
+    be started; only then is the resolved activity needed.
+
+    :param device_name: adb serial of the target device/emulator
+    :param app_package: Package name of the application under test
+    :param appium_port: Port of the Appium server handling this device
+    :param system_port: UiAutomator2 systemPort (must be unique per parallel device)
+    :raises WebDriverException: if the device is not ready (offline, unauthorized, still booting)
     """
-    app_package = "com.okinc.okex.gp"
-    device_name = "emulator-5554"
 
-    # Resolve LAUNCHER (exported) activity; if not found, let Appium auto-resolve
-    launcher_activity = resolve_launcher_activity(app_package, device_name=device_name)
+    # Resolve LAUNCHER (exported) activity while the session is being created
+    device_ready = _probe_executor.submit(wait_for_device_ready, device_name)
+    resolved = _probe_executor.submit(resolve_launcher_activity, app_package, device_name)
+    try:
+        ready = device_ready.result()
+    except Exception as e:
+        raise WebDriverException(f"Device {device_name} could not be probed: {e}") from e
+    if not ready:
+        raise WebDriverException(f"Device {device_name} is not ready (offline, unauthorized or still booting "
+                                 f"after {DEVICE_READY_TIMEOUT}s); no session was requested")
 
     cap = {
         # W3C capabilities (Appium 2 -> use appium: prefix for Appium-specific keys)
         "platformName": "Android",
         "appium:automationName": "UiAutomator2",
         "appium:deviceName": device_name,
+        "appium:udid": device_name,
+        **({"appium:systemPort": system_port} if system_port else {}),
 
         "appium:appPackage": app_package,
-        # Set only if resolved. If None, Appium will try to find a valid launcher.
-        **({"appium:appActivity": launcher_activity} if launcher_activity else {}),
+        # The app is started after the session, with the resolved launcher activity, only if it is not in front
+        "appium:autoLaunch": False,
 
         # Session behaviour
         "appium:noReset": True,
@@ -252,68 +356,118 @@ def create_driver():
         "appium:adbShellEnabled": True,
     }
 
+    # The Appium client (and with it selenium.webdriver) is loaded on the first session only
+    from appium import webdriver
+    from appium.options.android import UiAutomator2Options
+
     options = UiAutomator2Options().load_capabilities(cap)
 
     # Prefer 127.0.0.1 over 'localhost' (IPv6/proxy surprises)
-    url = "http://127.0.0.1:4723"
+    url = f"http://{APPIUM_HOST}:{appium_port}"
     driver = webdriver.Remote(command_executor=url, options=options)
-    driver.implicitly_wait(10)
-    time.sleep(1.0)  # short breath for UIA2 stabilization
+    instrument_driver(driver)  # per-step Appium command accounting (utils/step_metrics.py)
+    command_profiler.instrument(driver)  # opt-in latency profiling (APPIUM_PROFILE=1 / --appium-profile)
+    driver.implicitly_wait(IMPLICIT_WAIT)
 
-    switch_to_app_if_running(driver, app_package)
+    # UIA2 answers -> session is usable; the app is usually already in front (noReset)
+    if wait_for_session_ready(driver) == app_package:
+        get_app_state_service(device_name).set_state(app_package, APP_FOREGROUND)
+    else:
+        _start_app(driver, app_package, resolved)
     update_activity_time()
 
     return driver
 
 
+def _start_app(driver, app_package: str, resolved: Future) -> None:
+    """
+    Brings the app to the front after the session was created: a running app is
+    activated, a stopped one is started with the resolved LAUNCHER activity
+    (avoids SecurityException for non-exported internal activities). Without a
+    resolved activity Appium picks the launcher itself (activate_app).
+    """
+    if app_state(driver, app_package) == APP_NOT_RUNNING:
+        try:
+            launcher_activity = resolved.result()
+        except Exception as e:
+            log.warning("[BringUp] Launcher resolution failed: %s", e)
+            launcher_activity = None
+        if launcher_activity:
+            device_name = driver_device_name(driver)
+            log.info("Application %s is not running. Starting %s...", app_package, launcher_activity)
+            count_request(device_name=device_name)
+            driver.execute_script("mobile: startActivity",
+                                  {"component": f"{app_package}/{launcher_activity}", "wait": True})
+            get_app_state_service(device_name).set_state(app_package, APP_FOREGROUND)
+            return
+    switch_to_app_if_running(driver, app_package)
+
+
+def create_driver_async(device_name: str = DEFAULT_DEVICE_NAME,
+                        app_package: str = DEFAULT_APP_PACKAGE,
+                        appium_port: int = APPIUM_PORT,
+                        system_port: Optional[int] = APPIUM_SYSTEM_PORT) -> Future:
+    """
+    Starts create_driver() in the background and returns a Future of the driver,
+    so test collection and fixture setup can overlap with session creation:
+
+        future = create_driver_async("emulator-5554")
+        ...
+        driver = future.result()
+    """
+    return bring_up_executor.submit(create_driver, device_name=device_name, app_package=app_package,
+                                    appium_port=appium_port, system_port=system_port)
+
+
 # ---------------------------------------------------------------------------
 # App process helpers
 # ---------------------------------------------------------------------------
 
-_cached_ps_result = None
-_last_ps_check_time = 0
+def driver_device_name(driver) -> str:
+    """Returns the adb serial the driver's session runs on."""
+    caps = getattr(driver, "capabilities", None) or {}
+    return caps.get("udid") or caps.get("deviceUDID") or caps.get("deviceName") or DEFAULT_DEVICE_NAME
 
 
-def app_is_running(driver, app_package: str, cache_duration: int = 10) -> bool:
+def app_state(driver, app_package: str, cache_duration: int = DEFAULT_STATE_TTL) -> str:
     """
-    Checks if a given app package has a running process on the device.
-    Uses 'mobile: shell' (requires Appium server started with --relaxed-security).
-    Caches 'ps -A' output for cache_duration (seconds).
+    Returns the state of the app on the driver's device: APP_NOT_RUNNING,
+    APP_BACKGROUND or APP_FOREGROUND (see utils/app_state.py). States are cached
+    per device for cache_duration seconds.
     """
-    global _cached_ps_result, _last_ps_check_time
+    device_name = driver_device_name(driver)
+    service = get_app_state_service(device_name)
     try:
-        now = time.time()
-        if _cached_ps_result is None or now - _last_ps_check_time > cache_duration:
-            count_request()
-            output = driver.execute_script(
-                "mobile: shell",
-                {
-                    "command": "ps",
-                    "args": ["-A"],   # full process list (Android 8+)
-                    "timeout": 5000,  # ms
-                },
-            )
-            # mobile:shell returns STDOUT as string; ensure it's a string
-            _cached_ps_result = output if isinstance(output, str) else str(output)
-            _last_ps_check_time = now
-
-        for line in _cached_ps_result.splitlines():
-            if app_package in line:
-                return True
+        return service.get_state(app_package, max_age=cache_duration)
     except Exception as e:
-        print(f"Failed to check the application: {e}")
-    return False
+        log.warning("Failed to check the application: %s", e)
+        return APP_NOT_RUNNING
+
+
+def app_is_running(driver, app_package: str, cache_duration: int = DEFAULT_STATE_TTL) -> bool:
+    """
+    Checks if a given app package has a running process on the device
+    (exact 'pidof' match, cached per device for cache_duration seconds).
+    """
+    return app_state(driver, app_package, cache_duration) != APP_NOT_RUNNING
 
 
 def switch_to_app_if_running(driver, app_package: str):
     """
-    If the app process exists, activate it; otherwise start it.
+    If the app is already in the foreground, do nothing; if its process exists,
+    activate it; otherwise start it.
     """
-    if app_is_running(driver, app_package):
-        print(f"Application {app_package} is running in the background. Switching...")
-        count_request()
-        driver.activate_app(app_package)
+    device_name = driver_device_name(driver)
+    state = app_state(driver, app_package)
+
+    if state == APP_FOREGROUND:
+        log.debug("Application %s is already in the foreground.", app_package)
+        return
+
+    if state == APP_BACKGROUND:
+        log.info("Application %s is running in the background. Switching...", app_package)
     else:
-        print(f"Application {app_package} is not running. Starting it...")
-        count_request()
-        driver.activate_app(app_package)
+        log.info("Application %s is not running. Starting it...", app_package)
+    count_request(device_name=device_name)
+    driver.activate_app(app_package)
+    get_app_state_service(device_name).set_state(app_package, APP_FOREGROUND)
@@ -0,0 +1,189 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Local history of per-test-file durations and outcomes across runs (sqlite)
+HISTORY_DB = os.path.join("configs", "test_history.db")
+
+# Average duration over the last N runs of a file
+DURATION_WINDOW = 5
+
+FAILED_STATUSES = ("failed", "broken")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    app_version TEXT,
+    devices TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test_file TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    tests INTEGER NOT NULL DEFAULT 1,
+    file_hash TEXT,
+    app_version TEXT,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_file ON results (test_file, finished);
+"""
+
+
+def file_key(path: str) -> str:
+    """Normalises a test file path to the key used in the history (lower-case basename)."""
+    return os.path.basename(path).strip().lower()
+
+
+def file_hash(path: str) -> Optional[str]:
+    """sha256 of a test file's content (None if it cannot be read)."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _worst_status(statuses: Iterable[str]) -> str:
+    statuses = set(statuses)
+    for status in ("broken", "failed", "passed", "skipped"):
+        if status in statuses:
+            return status
+    return "unknown"
+
+
+class TestHistory:
+    """
+    Per-test-file durations and outcomes of all runs, stored in
+    configs/test_history.db. Used by run_selected_R_tests.py for sharding
+    and for the failed-first / fastest-first / time-budget / skip-unchanged modes.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def record_run(self, results: List[dict], app_version: Optional[str] = None,
+                   devices: Iterable[str] = (), file_hashes: Optional[Dict[str, str]] = None) -> int:
+        """
+        Stores the per-file results of one run.
+
+        :param results: [{'test_file', 'status', 'duration', 'tests'}] (see collect_allure_results)
+        :param app_version: versionCode of the app under test
+        :param file_hashes: file_key -> file_hash() of the files that were run
+        :return: Run id
+        """
+        now = time.time()
+        file_hashes = file_hashes or {}
+        with self._lock, self._conn:
+            run_id = self._conn.execute(
+                "INSERT INTO runs (started, app_version, devices) VALUES (?, ?, ?)",
+                (now, app_version, ",".join(devices))
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (run_id, test_file, status, duration, tests, file_hash, app_version, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, r["test_file"], r["status"], r["duration"], r.get("tests", 1),
+                  file_hashes.get(r["test_file"]), app_version, now) for r in results]
+            )
+        return run_id
+
+    def durations(self, window: int = DURATION_WINDOW) -> Dict[str, float]:
+        """Average duration (seconds) of the last `window` runs per test file."""
+        rows = self._conn.execute(
+            "SELECT test_file, AVG(duration) AS duration FROM ("
+            "  SELECT test_file, duration, ROW_NUMBER() OVER (PARTITION BY test_file ORDER BY finished DESC) AS n"
+            "  FROM results WHERE duration > 0"
+            ") WHERE n <= ? GROUP BY test_file", (window,)
+        ).fetchall()
+        return {row["test_file"]: row["duration"] for row in rows}
+
+    def last_results(self) -> Dict[str, sqlite3.Row]:
+        """Most recent result row per test file (status, duration, file_hash, app_version, finished)."""
+        rows = self._conn.execute(
+            "SELECT * FROM ("
+            "  SELECT *, ROW_NUMBER() OVER (PARTITION BY test_file ORDER BY finished DESC) AS n"
+            "  FROM results WHERE status != 'unknown'"
+            ") WHERE n = 1"
+        ).fetchall()
+        return {row["test_file"]: row for row in rows}
+
+    def failure_rates(self, window: int = 10) -> Dict[str, float]:
+        """Share of failed/broken outcomes among the last `window` runs per test file."""
+        rows = self._conn.execute(
+            "SELECT test_file, AVG(status IN ('failed', 'broken')) AS rate FROM ("
+            "  SELECT test_file, status, ROW_NUMBER() OVER (PARTITION BY test_file ORDER BY finished DESC) AS n"
+            "  FROM results WHERE status != 'unknown'"
+            ") WHERE n <= ? GROUP BY test_file", (window,)
+        ).fetchall()
+        return {row["test_file"]: row["rate"] for row in rows}
+
+
+def collect_allure_results(reports_dir: str = "reports", since_ms: Optional[int] = None) -> List[dict]:
+    """
+    Aggregates Allure '*-result.json' files per test file. A test that ran on
+    several workers (the tests of data-driven files that are not split by row)
+    counts once per test id (Allure historyId), with its longest duration, so
+    the file's duration is not multiplied by the worker count.
+
+    :param reports_dir: Allure results directory
+    :param since_ms: Only take results that started at/after this epoch time (ms)
+    :return: [{'test_file', 'status' (worst of its tests), 'duration' (s, sum), 'tests'}]
+    """
+    per_file: Dict[str, dict] = {}
+
+    for result_path in glob.glob(os.path.join(reports_dir, "*-result.json")):
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        start, stop = result.get("start"), result.get("stop")
+        if start is None or stop is None:
+            continue
+        if since_ms is not None and start < since_ms:
+            continue
+
+        # fullName looks like 'tests.regression.test_TC_02_change_view#test_TC_02_change_view'
+        module = result.get("fullName", "").split("#", 1)[0]
+        if not module:
+            continue
+        key = file_key(module.rsplit(".", 1)[-1] + ".py")
+        entry = per_file.setdefault(key, {"test_file": key, "statuses": [], "durations": {}})
+        entry["statuses"].append(result.get("status", "unknown"))
+        test_id = result.get("historyId") or result.get("uuid") or result_path
+        entry["durations"][test_id] = max(entry["durations"].get(test_id, 0.0), (stop - start) / 1000.0)
+
+    return [{"test_file": e["test_file"], "status": _worst_status(e["statuses"]),
+             "duration": sum(e["durations"].values()), "tests": len(e["durations"])} for e in per_file.values()]
+
+
+def record_results(reports_dir: str = "reports", since_ms: Optional[int] = None,
+                   app_version: Optional[str] = None, devices: Iterable[str] = (),
+                   file_hashes: Optional[Dict[str, str]] = None, path: str = HISTORY_DB) -> List[dict]:
+    """Stores the Allure results of the run that started at since_ms in the history."""
+    results = collect_allure_results(reports_dir, since_ms)
+    if results:
+        history = TestHistory(path)
+        try:
+            history.record_run(results, app_version=app_version, devices=devices, file_hashes=file_hashes)
+        finally:
+            history.close()
+    return results
@@ -0,0 +1,42 @@
+import os
+import time
+
+LOCK_TIMEOUT = 30.0
+STALE_LOCK_AGE = 300.0  # seconds; lock left behind by a killed process
+
+
+class FileLock:
+    """
+    Cross-platform exclusive lock between processes (O_EXCL lock file), e.g. for
+    parallel workers updating the same file or directory.
+
+        with FileLock("configs/launcher_cache.json.lock"):
+            ...
+    """
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > STALE_LOCK_AGE:
+                        os.remove(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Could not lock {self.path}")
+                time.sleep(0.1)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
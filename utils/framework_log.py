@@ -0,0 +1,176 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Optional
+
+from utils.step_metrics import current_test_name, step_metrics
+
+# Level of the framework loggers: DEBUG, INFO, WARNING (default), ... or 'quiet' (= ERROR).
+# Calls below the level return before any message formatting happens.
+FRAMEWORK_LOG = os.environ.get("FRAMEWORK_LOG", "WARNING")
+# Level echoed to the console; everything at/above FRAMEWORK_LOG goes to the JSON lines file
+FRAMEWORK_LOG_CONSOLE = os.environ.get("FRAMEWORK_LOG_CONSOLE", "WARNING")
+LOG_DIR = "logs"
+
+ROOT_LOGGER = "framework"
+
+
+def _level(name: str) -> int:
+    if name.lower() == "quiet":
+        return logging.ERROR
+    level = logging.getLevelName(name.upper())
+    return level if isinstance(level, int) else logging.WARNING
+
+
+class _ContextFilter(logging.Filter):
+    """Adds the running test and step (in the calling thread) to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test = current_test_name()
+        step = step_metrics.current
+        record.step = step.step if step is not None else ""
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the record as is; formatting happens in the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, test, step, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "test": getattr(record, "test", ""),
+            "step": getattr(record, "step", ""),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ConfigureOnFirstRecord(logging.Handler):
+    """
+    Handler of the unconfigured 'framework' logger: the first record that passes
+    the level sets up the framework log and is handed to its handlers. Until
+    then no log file or directory is created and no thread is started.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        framework_log.configure_once()
+        for handler in logging.getLogger(ROOT_LOGGER).handlers:
+            if handler is not self:
+                handler.handle(record)
+
+
+class FrameworkLog:
+    """
+    Structured logging of the framework (logger 'framework.*'): records are put
+    on a queue by the caller and written by a background listener thread as
+    JSON lines to logs/framework_<date>_<pid>.jsonl; warnings and errors are
+    also echoed to the console. Set up on the first record that passes the
+    level, or explicitly with configure() (pytest --framework-log).
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def configure(self, level: Optional[str] = None, console_level: Optional[str] = None,
+                  directory: str = LOG_DIR) -> None:
+        """
+        Sets up the queue handler and the file/console listener (again, when called twice).
+
+        :param level: Framework log level name or 'quiet' (default: FRAMEWORK_LOG)
+        :param console_level: Level echoed to the console (default: FRAMEWORK_LOG_CONSOLE)
+        """
+        with self._lock:
+            self._configure(level, console_level, directory)
+
+    def configure_once(self) -> None:
+        """configure() with the defaults, unless it has been configured already."""
+        with self._lock:
+            if self._listener is None:
+                self._configure(None, None, LOG_DIR)
+
+    def _configure(self, level: Optional[str], console_level: Optional[str], directory: str) -> None:
+        self._stop()
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(_level(level or FRAMEWORK_LOG))
+        logger.propagate = False
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"framework_{time.strftime('%Y-%m-%d')}_{os.getpid()}.jsonl")
+        file_handler = logging.FileHandler(self.path, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonLinesFormatter())
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(_level(console_level or FRAMEWORK_LOG_CONSOLE))
+        console_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+        log_queue: "queue.Queue" = queue.Queue(-1)
+        queue_handler = _DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+        logger.addHandler(queue_handler)
+
+        self._listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                        respect_handler_level=True)
+        self._listener.start()
+
+    @property
+    def configured(self) -> bool:
+        return self._listener is not None
+
+    def flush(self) -> None:
+        """Writes all queued records (stops and restarts the listener)."""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener.start()
+
+    def _stop(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+framework_log = FrameworkLog()
+atexit.register(framework_log.shutdown)
+
+_root_logger = logging.getLogger(ROOT_LOGGER)
+_root_logger.setLevel(_level(FRAMEWORK_LOG))
+_root_logger.propagate = False
+_root_logger.addHandler(_ConfigureOnFirstRecord())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger 'framework.<name>'. Use %-style arguments, so disabled levels cost no
+    formatting:  log.debug("%s - Attempt %d", description, attempt)
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from utils.file_lock import FileLock
+
+# On-disk cache of resolved LAUNCHER activities
+LAUNCHER_CACHE_FILE = os.path.join("configs", "launcher_cache.json")
+
+
+class LauncherCache:
+    """
+    Persistent cache of resolved launcher activities.
+
+    Entries are keyed by device serial and package name and are valid only
+    while the installed versionCode/lastUpdateTime match the values recorded
+    at resolution time, so reinstalling or updating the app invalidates them.
+
+    The file is read once per process for lookups; every change re-reads and
+    rewrites it under a lock file, so parallel workers keep each other's entries.
+    """
+
+    def __init__(self, path: str = LAUNCHER_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self.stats = {"hits": 0, "misses": 0, "forced": 0, "probe_failures": 0}
+
+    @staticmethod
+    def _key(device_name: str, app_package: str) -> str:
+        return f"{device_name}|{app_package}"
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _update(self, change: Callable[[Dict[str, dict]], None]) -> None:
+        """Applies change() to the current file content and writes it back (under the lock file)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with FileLock(f"{self.path}.lock"):
+            self._entries = self._read()  # entries written by other workers since our last read
+            change(self._entries)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)  # readers never see a partial file
+
+    def get(self, device_name: str, app_package: str, version: Dict[str, str]) -> Optional[str]:
+        """
+        Returns the cached activity if the installed version still matches, else None.
+
+        :param version: {'versionCode': ..., 'lastUpdateTime': ...} from the version probe
+        """
+        with self._lock:
+            entry = self._load().get(self._key(device_name, app_package))
+            if (entry
+                    and entry.get("versionCode") == version.get("versionCode")
+                    and entry.get("lastUpdateTime") == version.get("lastUpdateTime")):
+                self.stats["hits"] += 1
+                return entry.get("activity")
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, device_name: str, app_package: str, version: Dict[str, str], activity: str) -> None:
+        """Stores a resolved activity for the given installed version."""
+        entry = {
+            "activity": activity,
+            "versionCode": version.get("versionCode"),
+            "lastUpdateTime": version.get("lastUpdateTime"),
+            "resolvedAt": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._lock:
+            self._update(lambda entries: entries.__setitem__(self._key(device_name, app_package), entry))
+
+    def invalidate(self, device_name: Optional[str] = None, app_package: Optional[str] = None) -> None:
+        """Drops matching entries (all entries when called without arguments)."""
+        def drop(entries):
+            for key in list(entries):
+                dev, pkg = key.split("|", 1)
+                if (device_name is None or dev == device_name) and (app_package is None or pkg == app_package):
+                    del entries[key]
+
+        with self._lock:
+            self._update(drop)
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+
+launcher_cache = LauncherCache()
+
+
+def launcher_cache_stats() -> Dict[str, float]:
+    """Returns hit/miss counters of the shared launcher cache (plus hit_rate)."""
+    return {**launcher_cache.stats, "hit_rate": round(launcher_cache.hit_rate(), 3)}
@@ -0,0 +1,246 @@
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from itertools import count
+from typing import Dict, Iterator, List, Optional
+
+import allure
+
+from utils.adb_transport import ADB_TRANSPORT, AdbError, adb_pool, open_service, run_adb
+
+# Set LOGCAT_CAPTURE=0 to disable the background collector
+LOGCAT_CAPTURE = os.environ.get("LOGCAT_CAPTURE", "1") != "0"
+# Ring buffer size per device (lines); lines are cut to LOGCAT_MAX_LINE_LENGTH characters
+LOGCAT_BUFFER_LINES = int(os.environ.get("LOGCAT_BUFFER_LINES", "10000"))
+LOGCAT_MAX_LINE_LENGTH = 1024
+# Tags kept regardless of the PID (our own notes, crashes)
+LOGCAT_TAGS = tuple(t for t in os.environ.get("LOGCAT_TAGS", "AppiumThrottle,AndroidRuntime").split(",") if t)
+
+# Failure window: from the failing step's start minus PRE_ROLL, at most MAX_WINDOW_LINES lines
+PRE_ROLL_SECONDS = 5.0
+POST_ROLL_SECONDS = 0.5  # lets the last lines of the failure arrive before attaching
+MAX_WINDOW_LINES = 2000
+PID_REFRESH_SECONDS = 5.0
+
+# 'threadtime' format: "10-18 12:34:56.789  1234  1250 I Tag     : message"
+_THREADTIME = re.compile(r"^\d\d-\d\d \d\d:\d\d:\d\d\.\d+\s+(\d+)\s+\d+\s+[VDIWEFS]\s+(.*?)\s*: ")
+# ActivityManager: "Start proc 1234:com.example/u0a123 for ..."
+_START_PROC = re.compile(r"Start proc (\d+):([\w.]+)")
+
+
+class LogcatCollector:
+    """
+    Streams 'adb logcat' of one device in a background thread into a bounded
+    ring buffer. Only lines of the app's processes (PIDs from pidof and
+    'Start proc' notes) and of LOGCAT_TAGS are kept. Test and step boundaries
+    are stored as markers in the same buffer, so the lines around a failure
+    can be cut out without pulling the device log afterwards.
+    """
+
+    def __init__(self, serial: str, app_package: str, tags=LOGCAT_TAGS,
+                 max_lines: int = LOGCAT_BUFFER_LINES):
+        self.serial = serial
+        self.app_package = app_package
+        self.tags = set(tags)
+        # (seq, time.time(), kind, text); kind is 'line', 'test' or 'step'
+        self._buffer: deque = deque(maxlen=max_lines)
+        self._seq = count()
+        self._lock = threading.Lock()
+        self._pids: set = set()
+        self._pids_refreshed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self.lines_seen = 0
+        self.lines_kept = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"Logcat-{self.serial}", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._proc is not None:
+            self._proc.terminate()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                for line in self._stream():
+                    self._handle_line(line)
+            except (AdbError, OSError):
+                pass
+            self._stop.wait(1.0)  # device gone / adb restarted - reconnect
+
+    def _stream(self) -> Iterator[Optional[str]]:
+        """Yields logcat lines (None on idle ticks); '-T 1' skips the backlog."""
+        command = "logcat -v threadtime -T 1"
+        if ADB_TRANSPORT != "subprocess":
+            try:
+                sock = open_service(self.serial, f"shell:{command}", host=adb_pool.host, port=adb_pool.port)
+            except (AdbError, OSError):
+                sock = None
+            if sock is not None:
+                yield from self._socket_lines(sock)
+                return
+
+        self._proc = subprocess.Popen(["adb", "-s", self.serial] + command.split(),
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            for raw in self._proc.stdout:
+                if self._stop.is_set():
+                    return
+                yield raw.decode("utf-8", "replace").rstrip("\r\n")
+        finally:
+            self._proc.terminate()
+            self._proc = None
+
+    def _socket_lines(self, sock: socket.socket) -> Iterator[Optional[str]]:
+        sock.settimeout(1.0)
+        pending = b""
+        try:
+            while not self._stop.is_set():
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    yield None
+                    continue
+                if not chunk:
+                    return
+                *lines, pending = (pending + chunk).split(b"\n")
+                for raw in lines:
+                    yield raw.decode("utf-8", "replace").rstrip("\r")
+        finally:
+            sock.close()
+
+    # -- filtering ---------------------------------------------------------
+
+    def _refresh_pids(self) -> None:
+        self._pids_refreshed = time.monotonic()
+        rc, out, _ = run_adb(["adb", "-s", self.serial, "shell", "pidof", self.app_package])
+        if rc == 0 and out:
+            self._pids = set(out.split())
+
+    def _handle_line(self, line: Optional[str]) -> None:
+        if time.monotonic() - self._pids_refreshed > PID_REFRESH_SECONDS:
+            self._refresh_pids()
+        if not line:
+            return
+
+        self.lines_seen += 1
+        match = _THREADTIME.match(line)
+        if match is None:
+            return  # '--------- beginning of main' etc.
+        pid, tag = match.groups()
+
+        started = _START_PROC.search(line) if tag == "ActivityManager" else None
+        if started and started.group(2) == self.app_package:
+            self._pids.add(started.group(1))
+        elif pid not in self._pids and tag not in self.tags:
+            return
+
+        self.lines_kept += 1
+        self._append("line", line[:LOGCAT_MAX_LINE_LENGTH])
+
+    # -- markers and windows -----------------------------------------------
+
+    def _append(self, kind: str, text: str) -> int:
+        seq = next(self._seq)
+        with self._lock:
+            self._buffer.append((seq, time.time(), kind, text))
+        return seq
+
+    def mark(self, kind: str, text: str) -> int:
+        """Adds a 'test' or 'step' boundary marker; returns its sequence number."""
+        if kind == "test":
+            self._pids_refreshed = 0.0  # the app is usually restarted between tests
+        return self._append(kind, text)
+
+    def window(self, since_seq: int = 0, since_time: float = 0.0, max_lines: int = MAX_WINDOW_LINES) -> List[tuple]:
+        """Buffered entries at/after the given marker and time (newest max_lines)."""
+        with self._lock:
+            entries = [e for e in self._buffer if e[0] >= since_seq and e[1] >= since_time]
+        return entries[-max_lines:]
+
+
+class LogcatCapture:
+    """
+    Logcat collectors of all devices used in the run, plus the boundaries of
+    the running test/step. On passing tests nothing is attached or waited for.
+    """
+
+    def __init__(self, enabled: bool = LOGCAT_CAPTURE):
+        self.enabled = enabled
+        self.collectors: Dict[str, LogcatCollector] = {}
+        self._lock = threading.Lock()
+        self._test_marks: Dict[str, int] = {}
+        self._step_time = 0.0
+
+    def collector(self, serial: str, app_package: str) -> LogcatCollector:
+        """Returns the (started) collector of the device."""
+        with self._lock:
+            collector = self.collectors.get(serial)
+            if collector is None:
+                collector = self.collectors[serial] = LogcatCollector(serial, app_package)
+                collector.start()
+        return collector
+
+    def begin_test(self, test: str, serial: str, app_package: str) -> None:
+        if not self.enabled:
+            return
+        self._step_time = 0.0
+        self._test_marks[serial] = self.collector(serial, app_package).mark("test", test)
+
+    def mark_step(self, step: str) -> None:
+        """Step boundary (called by execute_step); a no-op while no collector runs."""
+        if not self.collectors:
+            return
+        self._step_time = time.time()
+        for collector in list(self.collectors.values()):
+            collector.mark("step", step)
+
+    def failure_window(self) -> Dict[str, List[tuple]]:
+        """Entries of the running test from PRE_ROLL_SECONDS before the last step on, per device."""
+        since_time = self._step_time - PRE_ROLL_SECONDS if self._step_time else 0.0
+        return {serial: collector.window(self._test_marks.get(serial, 0), since_time)
+                for serial, collector in list(self.collectors.items())}
+
+    @staticmethod
+    def render(entries: List[tuple]) -> str:
+        lines = []
+        for _, _, kind, text in entries:
+            lines.append(text if kind == "line" else f"===== {kind.upper()}: {text} =====")
+        return "\n".join(lines)
+
+    def attach_failure_window(self) -> int:
+        """Attaches the failure window of every device as 'Logcat <serial>'; returns the line count."""
+        if not self.collectors:
+            return 0
+        time.sleep(POST_ROLL_SECONDS)
+        total = 0
+        for serial, entries in self.failure_window().items():
+            if not entries:
+                continue
+            total += len(entries)
+            allure.attach(body=self.render(entries), name=f"Logcat {serial}",
+                          attachment_type=allure.attachment_type.TEXT)
+        return total
+
+    def stop_all(self) -> None:
+        with self._lock:
+            collectors = list(self.collectors.values())
+            self.collectors.clear()
+        for collector in collectors:
+            collector.stop()
+
+
+logcat_capture = LogcatCapture()
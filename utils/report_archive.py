@@ -0,0 +1,375 @@
+import io
+import json
+import os
+import re
+import shutil
+import tarfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+try:
+    # Optional: smaller and faster bundles (pip install zstandard)
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:  # fallback to tar.gz
+    zstandard = None
+    HAS_ZSTD = False
+
+ARCHIVE_DIR = "arch_reports"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# Allure output files; anything else in arch_reports/ (e.g. the placeholder) is left alone
+ALLURE_FILE = re.compile(
+    r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}-(result\.json|container\.json|attachment\.\w+)"
+    r"|[0-9a-f]{64}-attachment\.\w+"  # content-addressed attachments (utils/attachment_dedup.py)
+    r"|environment\.properties|categories\.json|executor\.json)$"
+)
+# Files describing the whole run; restored together with any test of the run
+RUN_LEVEL_FILES = ("environment.properties", "categories.json", "executor.json")
+
+
+def _attachment_sources(item: dict) -> List[str]:
+    """Attachment file names referenced by an Allure result/fixture, including nested steps."""
+    sources = [a["source"] for a in item.get("attachments", []) if a.get("source")]
+    for step in item.get("steps", []):
+        sources.extend(_attachment_sources(step))
+    return sources
+
+
+def _load_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def describe_run(paths: Iterable[str]) -> dict:
+    """
+    Reads the Allure result/container files among `paths` and returns
+    {'date': 'YYYY-MM-DD', 'tests': [{'name', 'fullName', 'status', 'files': [...]}]},
+    where 'files' are the result file, its containers and all referenced attachments.
+    """
+    paths = list(paths)
+    names = {os.path.basename(p) for p in paths}
+    results, containers = {}, []
+    for path in paths:
+        name = os.path.basename(path)
+        if name.endswith("-result.json"):
+            data = _load_json(path)
+            if data is not None:
+                results[name] = data
+        elif name.endswith("-container.json"):
+            data = _load_json(path)
+            if data is not None:
+                containers.append((name, data))
+
+    starts = [r["start"] for r in results.values() if isinstance(r.get("start"), (int, float))]
+    if starts:
+        date = datetime.fromtimestamp(min(starts) / 1000).strftime("%Y-%m-%d")
+    else:
+        newest = max((os.path.getmtime(p) for p in paths), default=time.time())
+        date = datetime.fromtimestamp(newest).strftime("%Y-%m-%d")
+
+    tests = []
+    for name, result in results.items():
+        files = [name] + _attachment_sources(result)
+        for container_name, container in containers:
+            if result.get("uuid") in container.get("children", []):
+                files.append(container_name)
+                for fixture in container.get("befores", []) + container.get("afters", []):
+                    files.extend(_attachment_sources(fixture))
+        tests.append({
+            "name": result.get("name", ""),
+            "fullName": result.get("fullName", ""),
+            "status": result.get("status", ""),
+            "files": sorted({f for f in files if f in names}),
+        })
+    return {"date": date, "tests": tests}
+
+
+class ReportArchive:
+    """
+    Compressed, indexed archive of Allure results.
+
+    Every archived run becomes one bundle, arch_reports/<date>/<run_id>.tar.zst
+    (tar.gz without the zstandard package). arch_reports/index.json maps run id,
+    date and test names to the bundle and to the members' offsets in the tar
+    stream, so a restore is an index lookup plus a streaming extraction that
+    stops once the last wanted member has been read.
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+
+    # -- index --------------------------------------------------------------
+
+    def load_index(self) -> dict:
+        index = _load_json(self.index_path)
+        if not index or index.get("version") != INDEX_VERSION:
+            return {"version": INDEX_VERSION, "runs": []}
+        return index
+
+    def _save_index(self, index: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, self.index_path)  # atomic, the index never points at half a run
+
+    # -- bundles ------------------------------------------------------------
+
+    @staticmethod
+    def _bundle_extension() -> str:
+        return ".tar.zst" if HAS_ZSTD else ".tar.gz"
+
+    @staticmethod
+    def _open_write(path: str):
+        """Returns (tarfile, underlying stream to close afterwards or None)."""
+        if HAS_ZSTD:
+            raw = open(path, "wb")
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(raw)
+            return tarfile.open(fileobj=stream, mode="w|"), stream
+        return tarfile.open(path, mode="w|gz"), None
+
+    @staticmethod
+    def _open_read(path: str):
+        if path.endswith(".tar.zst"):
+            if not HAS_ZSTD:
+                raise RuntimeError(f"{path} needs the zstandard package")
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+            return tarfile.open(fileobj=stream, mode="r|"), stream
+        return tarfile.open(path, mode="r|gz"), None
+
+    def _write_bundle(self, bundle_path: str, paths: List[str]) -> Dict[str, list]:
+        """Writes the files into one bundle; returns {member name: [tar offset, size]}."""
+        members = {}
+        tmp_path = bundle_path + ".tmp"
+        tar, stream = self._open_write(tmp_path)
+        try:
+            for path in paths:
+                name = os.path.basename(path)
+                members[name] = [tar.offset, os.path.getsize(path)]
+                tar.add(path, arcname=name, recursive=False)
+        finally:
+            tar.close()
+            if stream is not None:
+                stream.close()
+        os.replace(tmp_path, bundle_path)
+        return members
+
+    # -- archiving ----------------------------------------------------------
+
+    def archive_files(self, paths: List[str], run_id: Optional[str] = None, remove: bool = True) -> Optional[dict]:
+        """
+        Bundles the given report files as one run and records it in the index.
+
+        :param paths: Files of one run (Allure results, containers, attachments, ...)
+        :param run_id: Unique run id (default: archive timestamp)
+        :param remove: Delete the source files once the bundle and the index are written
+        :return: Index entry of the run, or None if there was nothing to archive
+        """
+        paths = sorted(p for p in paths if os.path.isfile(p))
+        if not paths:
+            return None
+
+        described = describe_run(paths)
+        run_id = run_id or time.strftime("%Y%m%d_%H%M%S") + f"_{os.getpid()}"
+        bundle = os.path.join(described["date"], run_id + self._bundle_extension())
+        bundle_path = os.path.join(self.root, bundle)
+        os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+
+        members = self._write_bundle(bundle_path, paths)
+        entry = {
+            "run_id": run_id,
+            "date": described["date"],
+            "bundle": bundle.replace(os.sep, "/"),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": len(members),
+            "bytes": os.path.getsize(bundle_path),
+            "tests": described["tests"],
+            "members": members,
+        }
+        with self._lock:
+            index = self.load_index()
+            index["runs"] = [r for r in index["runs"] if r["run_id"] != run_id] + [entry]
+            self._save_index(index)
+
+        if remove:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Failed to remove {path}: {e}")
+        return entry
+
+    def archive_directory(self, reports_dir: str, run_id: Optional[str] = None, remove: bool = True) -> Optional[dict]:
+        """Archives all files of reports_dir (one run); sub-directories are left alone."""
+        if not os.path.isdir(reports_dir):
+            return None
+        paths = [os.path.join(reports_dir, name) for name in os.listdir(reports_dir)]
+        return self.archive_files(paths, run_id=run_id, remove=remove)
+
+    def loose_files(self) -> List[str]:
+        """
+        Allure files stored directly in the archive folder by the old file-by-file archiving.
+        The folder is scanned only until migrate_loose_files() has recorded the loose files
+        left over in the index ('loose'); after that only the listed files are checked.
+        """
+        names = self.load_index().get("loose")
+        if names is None:
+            if not os.path.isdir(self.root):
+                return []
+            names = [name for name in os.listdir(self.root) if ALLURE_FILE.match(name)]
+        return [os.path.join(self.root, name) for name in names if os.path.isfile(os.path.join(self.root, name))]
+
+    def migrate_loose_files(self) -> int:
+        """Bundles old loose files into one 'legacy_<date>' run per modification date; returns the file count."""
+        by_date: Dict[str, List[str]] = {}
+        for path in self.loose_files():
+            date = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+            by_date.setdefault(date, []).append(path)
+
+        migrated = 0
+        for date, paths in sorted(by_date.items()):
+            entry = self.archive_files(paths, run_id=f"legacy_{date.replace('-', '')}_{int(time.time())}")
+            if entry:
+                migrated += entry["files"]
+
+        # Files that could not be removed stay listed; the next archive does not scan the folder again
+        left = sorted(os.path.basename(p) for paths in by_date.values() for p in paths if os.path.isfile(p))
+        with self._lock:
+            index = self.load_index()
+            if index.get("loose") != left:
+                index["loose"] = left
+                self._save_index(index)
+        return migrated
+
+    # -- lookup / restore ---------------------------------------------------
+
+    def find_runs(self, date: Optional[str] = None, since: Optional[str] = None,
+                  test: Optional[str] = None) -> List[dict]:
+        """
+        Index lookup.
+
+        :param date: Runs of exactly this date (YYYY-MM-DD)
+        :param since: Runs of this date or later (YYYY-MM-DD)
+        :param test: Only runs containing a test whose name or fullName contains this text
+        """
+        runs = []
+        for run in self.load_index()["runs"]:
+            if date and run["date"] != date:
+                continue
+            if since and run["date"] < since:
+                continue
+            if test and not self._matching_tests(run, test):
+                continue
+            runs.append(run)
+        return runs
+
+    @staticmethod
+    def _matching_tests(run: dict, test: str) -> List[dict]:
+        return [t for t in run["tests"] if test in t["name"] or test in t["fullName"]]
+
+    def _wanted_members(self, run: dict, test: Optional[str]) -> List[str]:
+        if not test:
+            return list(run["members"])
+        wanted = {name for name in RUN_LEVEL_FILES if name in run["members"]}
+        for matched in self._matching_tests(run, test):
+            wanted.update(matched["files"])
+        return sorted(wanted)
+
+    def extract_run(self, run: dict, reports_dir: str, members: Optional[Iterable[str]] = None) -> int:
+        """
+        Streams the run's bundle and writes the wanted members to reports_dir.
+        Reading stops after the member with the highest indexed offset.
+
+        :return: Number of files written
+        """
+        wanted = set(run["members"] if members is None else members)
+        if not wanted:
+            return 0
+        last_offset = max(run["members"][name][0] for name in wanted)
+
+        os.makedirs(reports_dir, exist_ok=True)
+        written = 0
+        tar, stream = self._open_read(os.path.join(self.root, run["bundle"]))
+        try:
+            for member in tar:
+                if member.offset > last_offset:
+                    break
+                name = member.name
+                if name not in wanted or not member.isfile() or os.path.basename(name) != name:
+                    continue
+                source = tar.extractfile(member)
+                with open(os.path.join(reports_dir, name), "wb") as f:
+                    while True:
+                        chunk = source.read(io.DEFAULT_BUFFER_SIZE * 16)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                written += 1
+                wanted.discard(name)
+                if not wanted:
+                    break
+        finally:
+            tar.close()
+            if stream is not None:
+                stream.close()
+        return written
+
+    def restore_loose_files(self, reports_dir: str, date: Optional[str] = None, since: Optional[str] = None,
+                            test: Optional[str] = None) -> int:
+        """
+        Copies loose files of the old file-by-file archiving into reports_dir, selected
+        by modification date like the old backup_reports.py. They stay in the archive
+        folder until arch_reports.py bundles them.
+
+        :return: Number of files copied
+        """
+        paths = []
+        for path in self.loose_files():
+            modified = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+            if (date and modified != date) or (since and modified < since):
+                continue
+            paths.append(path)
+        if test:
+            matched = self._matching_tests(describe_run(paths), test)
+            wanted = {name for t in matched for name in t["files"]}
+            if matched:
+                wanted.update(RUN_LEVEL_FILES)
+            paths = [p for p in paths if os.path.basename(p) in wanted]
+
+        if paths:
+            os.makedirs(reports_dir, exist_ok=True)
+        for path in paths:
+            shutil.copy2(path, os.path.join(reports_dir, os.path.basename(path)))
+        return len(paths)
+
+    def restore(self, reports_dir: str, date: Optional[str] = None, since: Optional[str] = None,
+                test: Optional[str] = None) -> int:
+        """
+        Restores archived runs (or only the files of matching tests) into reports_dir.
+        Read-only: files are copied out, the bundles, the index and any loose files
+        stay in the archive, so a run can be restored again.
+
+        :return: Number of files restored
+        """
+        restored = 0
+        for run in self.find_runs(date=date, since=since, test=test):
+            try:
+                count = self.extract_run(run, reports_dir, self._wanted_members(run, test))
+            except (OSError, tarfile.TarError) as e:
+                print(f"Run {run['run_id']} ({run['date']}) is unavailable, {run['bundle']} could not be read: {e}")
+                continue
+            print(f"Restored {count} files of run {run['run_id']} ({run['date']}) from {run['bundle']}")
+            restored += count
+        loose = self.restore_loose_files(reports_dir, date=date, since=since, test=test)
+        if loose:
+            print(f"Restored {loose} loose files from {self.root}")
+        return restored + loose
@@ -0,0 +1,220 @@
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import allure
+
+from utils.adb_transport import run_adb
+
+# Opt-in: RESOURCE_SAMPLING=1 or 'pytest --resource-sampling'
+SAMPLING_ENABLED = os.environ.get("RESOURCE_SAMPLING", "") == "1"
+SAMPLE_INTERVAL = float(os.environ.get("RESOURCE_SAMPLE_INTERVAL", "1.0"))  # seconds
+
+# Series recorded per sample (NaN when a source was unavailable)
+SERIES = ("cpu", "memory", "fps", "jank")
+UNITS = {"cpu": "%", "memory": "MB", "fps": "fps", "jank": "%"}
+
+_TOTAL_FRAMES = re.compile(r"Total frames rendered:\s*(\d+)")
+_JANKY_FRAMES = re.compile(r"Janky frames:\s*(\d+)")
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _performance_row(data) -> Dict[str, float]:
+    """get_performance_data() returns [[names...], [values...]]; -> {name: value}."""
+    if not data or len(data) < 2:
+        return {}
+    return {str(name): _number(value) for name, value in zip(data[0], data[1])}
+
+
+class ResourceSampler:
+    """
+    Samples CPU, memory and frame statistics of the app under test in a
+    background thread while a test runs:
+
+      cpu    - user + kernel CPU % (get_performance_data 'cpuinfo')
+      memory - total PSS in MB (get_performance_data 'memoryinfo')
+      fps    - frames rendered per second since the previous sample (dumpsys gfxinfo)
+      jank   - share of janky frames since the previous sample, % (dumpsys gfxinfo)
+
+    Samples are stored in arrays; execute_step() asks for the min/avg/max
+    of its time range, and the whole test is attached as an SVG chart.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, enabled: bool = SAMPLING_ENABLED):
+        self.interval = interval
+        self.enabled = enabled
+        self.times = array("d")
+        self.series: Dict[str, array] = {name: array("d") for name in SERIES}
+        self.steps: List[Tuple[str, float, float]] = []  # (step, start, end) of the running test
+        self._driver = None
+        self._app_package = None
+        self._device_name = None
+        self._last_frames: Optional[Tuple[float, int, int]] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- test lifecycle ----------------------------------------------------
+
+    def begin_test(self, driver, app_package: str, device_name: str) -> None:
+        """Starts sampling the app for the running test (clears the previous test's samples)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._reset()
+            self._driver, self._app_package, self._device_name = driver, app_package, device_name
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ResourceSampler", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def end_test(self) -> int:
+        """Stops sampling and attaches the chart and raw samples; returns the sample count."""
+        with self._lock:
+            if self._driver is None:
+                return 0
+            self._driver = None
+            count = len(self.times)
+            if count:
+                allure.attach(body=self.render_svg(), name="App resources",
+                              attachment_type=allure.attachment_type.SVG)
+                allure.attach(body=self.render_csv(), name="App resources (samples)",
+                              attachment_type=allure.attachment_type.CSV)
+            self._reset()
+        return count
+
+    def _reset(self) -> None:
+        self.times = array("d")
+        self.series = {name: array("d") for name in SERIES}
+        self.steps = []
+        self._last_frames = None
+
+    # -- sampling ----------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                driver, app_package, device_name = self._driver, self._app_package, self._device_name
+            if driver is None:
+                continue
+            try:
+                sample = self.sample(driver, app_package, device_name)
+            except Exception:
+                continue  # session restarting / app not running - skip this sample
+            with self._lock:
+                if self._driver is driver:
+                    self.times.append(time.time())
+                    for name in SERIES:
+                        self.series[name].append(sample.get(name, math.nan))
+
+    def sample(self, driver, app_package: str, device_name: str) -> Dict[str, float]:
+        cpu = _performance_row(driver.get_performance_data(app_package, "cpuinfo", 5))
+        memory = _performance_row(driver.get_performance_data(app_package, "memoryinfo", 5))
+        sample = {
+            "cpu": cpu.get("user", math.nan) + cpu.get("kernel", math.nan),
+            "memory": memory.get("totalPss", math.nan) / 1024,
+        }
+        sample.update(self._frame_stats(app_package, device_name))
+        return sample
+
+    def _frame_stats(self, app_package: str, device_name: str) -> Dict[str, float]:
+        """fps and jank % since the previous sample, from the cumulative gfxinfo counters."""
+        rc, out, _ = run_adb(["adb", "-s", device_name, "shell", "dumpsys", "gfxinfo", app_package,
+                              "|", "grep", "-e", "'Total frames'", "-e", "'Janky frames'"])
+        total, janky = _TOTAL_FRAMES.search(out or ""), _JANKY_FRAMES.search(out or "")
+        if rc != 0 or not total or not janky:
+            return {}
+
+        now, frames, janky_frames = time.monotonic(), int(total.group(1)), int(janky.group(1))
+        previous, self._last_frames = self._last_frames, (now, frames, janky_frames)
+        if previous is None or frames < previous[1]:
+            return {}  # first sample, or the app was restarted
+        rendered = frames - previous[1]
+        return {
+            "fps": rendered / max(now - previous[0], 1e-6),
+            "jank": 100.0 * (janky_frames - previous[2]) / rendered if rendered else 0.0,
+        }
+
+    # -- per-step statistics -------------------------------------------------
+
+    def step_stats(self, step: str, start: float, end: float) -> Optional[Dict[str, dict]]:
+        """
+        min/avg/max of every series over the samples taken during the step
+        (None for steps without a sample, e.g. shorter than the interval).
+
+        :param start: Step start (time.time())
+        :param end: Step end (time.time())
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._driver is None:
+                return None
+            self.steps.append((step, start, end))
+            lo, hi = bisect_left(self.times, start), bisect_right(self.times, end)
+            if lo == hi:
+                return None
+            window = {name: [v for v in values[lo:hi] if not math.isnan(v)]
+                      for name, values in self.series.items()}
+
+        return {name: {"min": round(min(v), 2), "avg": round(sum(v) / len(v), 2), "max": round(max(v), 2)}
+                for name, v in window.items() if v}
+
+    # -- rendering -------------------------------------------------------------
+
+    def render_csv(self) -> str:
+        lines = ["time," + ",".join(SERIES)]
+        for i, t in enumerate(self.times):
+            values = ("" if math.isnan(self.series[name][i]) else f"{self.series[name][i]:.2f}" for name in SERIES)
+            lines.append(f"{t:.3f}," + ",".join(values))
+        return "\n".join(lines)
+
+    def render_svg(self, width: int = 900, row_height: int = 110) -> str:
+        """One line chart per series, step boundaries as vertical lines."""
+        start, end = self.times[0], max(self.times[-1], self.times[0] + 1)
+        left, right = 70, width - 10
+        scale_x = (right - left) / (end - start)
+        height = row_height * len(SERIES) + 20
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                 f'font-family="sans-serif" font-size="11">',
+                 f'<rect width="{width}" height="{height}" fill="white"/>']
+
+        for step, step_start, _ in self.steps:
+            x = left + (max(step_start, start) - start) * scale_x
+            parts.append(f'<line x1="{x:.1f}" y1="10" x2="{x:.1f}" y2="{height - 10}" stroke="#ddd">'
+                         f'<title>{_escape(step)}</title></line>')
+
+        for row, name in enumerate(SERIES):
+            top, bottom = 10 + row * row_height, 10 + (row + 1) * row_height - 20
+            values = [(t, v) for t, v in zip(self.times, self.series[name]) if not math.isnan(v)]
+            peak = max((v for _, v in values), default=0.0) or 1.0
+            parts.append(f'<text x="4" y="{top + 12}">{name} ({UNITS[name]})</text>')
+            parts.append(f'<text x="4" y="{top + 26}" fill="#888">max {peak:.1f}</text>')
+            parts.append(f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}" stroke="#999"/>')
+            if values:
+                points = " ".join(f"{left + (t - start) * scale_x:.1f},{bottom - v / peak * (bottom - top):.1f}"
+                                  for t, v in values)
+                parts.append(f'<polyline points="{points}" fill="none" stroke="#1f77b4" stroke-width="1.5"/>')
+
+        parts.append("</svg>")
+        return "\n".join(parts)
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+resource_sampler = ResourceSampler()
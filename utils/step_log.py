@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import allure
+
+from utils.step_metrics import current_test_name
+
+# 'buffered': successful attempts are collected in memory and attached once per test
+# 'attempts': one Allure attachment per attempt (previous behaviour)
+STEP_LOG_MODE = os.environ.get("STEP_LOG_MODE", "buffered")
+
+# Upper bound of buffered entries per test (outside of pytest nothing flushes the buffer)
+MAX_ENTRIES_PER_TEST = 5000
+
+
+class StepLog:
+    """
+    Per-test log of execute_step() attempts.
+
+    In buffered mode successful attempts and the per-step metrics are kept in
+    memory and written by flush() at teardown as one JSON and one text
+    attachment. Failed attempts are always attached immediately (with the full
+    error), so a failing step is visible even if the test process dies.
+    """
+
+    def __init__(self, mode: str = STEP_LOG_MODE):
+        self.mode = mode
+        self._entries: Dict[str, List[dict]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode == "buffered"
+
+    def _append(self, entry: dict) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(current_test_name(), [])
+            if len(entries) < MAX_ENTRIES_PER_TEST:
+                entries.append(entry)
+
+    def attempt(self, step: str, attempt: int, status: str, message: str) -> None:
+        """Records one attempt of a step (attached right away unless buffered and passed)."""
+        if self.buffered:
+            self._append({"step": step, "attempt": attempt, "status": status,
+                          "time": time.strftime("%H:%M:%S"), "message": message})
+        if not self.buffered or status != "passed":
+            allure.attach(
+                body=message,
+                name="Success" if status == "passed" else "Error",
+                attachment_type=allure.attachment_type.TEXT
+            )
+
+    def step_finished(self, step: str, metrics: dict) -> None:
+        """Records the step metrics (utils/step_metrics.py) of a finished step."""
+        if self.buffered:
+            self._append({"step": step, "status": metrics.get("status"), "metrics": metrics})
+        else:
+            allure.attach(
+                body=json.dumps(metrics, indent=2),
+                name="Step metrics",
+                attachment_type=allure.attachment_type.JSON
+            )
+
+    @staticmethod
+    def render_text(entries: List[dict]) -> str:
+        lines = []
+        for entry in entries:
+            if "metrics" in entry:
+                m = entry["metrics"]
+                lines.append(f"    {entry['step']}: {m.get('status')} in {m.get('wall_time', 0):.2f}s "
+                             f"({m.get('attempts')} attempts, {m.get('appium_commands')} Appium commands, "
+                             f"wait {m.get('wait_time', 0):.2f}s)")
+                for name, stats in m.get("resources", {}).items():
+                    lines.append(f"        {name}: min {stats['min']} / avg {stats['avg']} / max {stats['max']}")
+            else:
+                lines.append(f"[{entry['time']}] {entry['status'].upper():<6} {entry['message']}")
+        return "\n".join(lines)
+
+    def take(self, test: Optional[str] = None) -> List[dict]:
+        """Removes and returns the buffered entries of a test (default: the running one)."""
+        with self._lock:
+            return self._entries.pop(test if test is not None else current_test_name(), [])
+
+    def flush(self, test: Optional[str] = None) -> int:
+        """Attaches the buffered entries of the test as 'Step log' (JSON + text); returns the entry count."""
+        entries = self.take(test)
+        if not entries:
+            return 0
+        allure.attach(body=json.dumps(entries, indent=1), name="Step log",
+                      attachment_type=allure.attachment_type.JSON)
+        allure.attach(body=self.render_text(entries), name="Step log (text)",
+                      attachment_type=allure.attachment_type.TEXT)
+        return len(entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+step_log = StepLog()
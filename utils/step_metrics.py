@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+# Per-run step metrics files (JSON + CSV) are written here at the end of the session
+METRICS_DIR = "metrics"
+
+_FIELDS = ["test", "step", "status", "attempts", "start", "wall_time",
+           "appium_commands", "adb_calls", "wait_time", "throttle_time"]
+
+
+class StepRecord:
+    """Timing and accounting of one execute_step() call."""
+
+    __slots__ = _FIELDS + ["_started", "_finished"]
+
+    def __init__(self, test: str, step: str):
+        self.test = test
+        self.step = step
+        self.status = "running"
+        self.attempts = 0
+        self.start = time.time()
+        self.wall_time = 0.0
+        self.appium_commands = 0
+        self.adb_calls = 0
+        self.wait_time = 0.0  # post-condition polling / retry delays
+        self.throttle_time = 0.0  # sleeps in the request throttler
+        self._started = time.perf_counter()
+        self._finished = False
+
+    def finish(self) -> "StepRecord":
+        """Stops the step's clock (sets wall_time); later calls keep the first value."""
+        if not self._finished:
+            self.wall_time = time.perf_counter() - self._started
+            self._finished = True
+        return self
+
+    def as_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in _FIELDS}
+        for name in ("wall_time", "wait_time", "throttle_time"):
+            data[name] = round(data[name], 4)
+        return data
+
+
+class StepMetricsCollector:
+    """Collects StepRecords of the run; the current step is tracked per thread."""
+
+    def __init__(self):
+        self.records: List[StepRecord] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[StepRecord]:
+        return getattr(self._local, "record", None)
+
+    @contextmanager
+    def step(self, step: str, test: Optional[str] = None):
+        """Measures the block as one step of the current test."""
+        record = StepRecord(test or current_test_name(), step)
+        parent = self.current
+        self._local.record = record
+        try:
+            yield record
+        finally:
+            record.finish()
+            self._local.record = parent
+            with self._lock:
+                self.records.append(record)
+
+    def slowest(self, count: int = 10) -> List[StepRecord]:
+        with self._lock:
+            return sorted(self.records, key=lambda r: r.wall_time, reverse=True)[:count]
+
+    def write_files(self, directory: str = METRICS_DIR, run_name: Optional[str] = None) -> Optional[str]:
+        """Writes <run_name>.json and <run_name>.csv; returns the JSON path (None if nothing recorded)."""
+        with self._lock:
+            rows = [r.as_dict() for r in self.records]
+        if not rows:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        if run_name is None:
+            worker = os.environ.get("APPIUM_DEVICE", "local").replace(":", "_")
+            run_name = f"step_metrics_{time.strftime('%Y%m%d_%H%M%S')}_{worker}"
+
+        json_path = os.path.join(directory, f"{run_name}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        with open(os.path.join(directory, f"{run_name}.csv"), "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return json_path
+
+    def format_summary(self, count: int = 10) -> str:
+        """Table of the slowest steps across all tests."""
+        slowest = self.slowest(count)
+        if not slowest:
+            return "No steps recorded."
+
+        lines = [f"{'Wall[s]':>8} {'Wait[s]':>8} {'Thrtl[s]':>8} {'Appium':>6} {'adb':>5}  Test / Step"]
+        for r in slowest:
+            lines.append(f"{r.wall_time:>8.2f} {r.wait_time:>8.2f} {r.throttle_time:>8.2f} "
+                         f"{r.appium_commands:>6} {r.adb_calls:>5}  {r.test} / {r.step}")
+        return "\n".join(lines)
+
+
+step_metrics = StepMetricsCollector()
+
+
+def current_test_name() -> str:
+    """Node id of the running pytest test ('' outside of tests)."""
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
+
+
+# ---------------------------------------------------------------------------
+# Counters fed by the framework (no-ops outside of a step)
+# ---------------------------------------------------------------------------
+
+def record_appium_command() -> None:
+    record = step_metrics.current
+    if record is not None:
+        record.appium_commands += 1
+
+
+def record_adb_call() -> None:
+    record = step_metrics.current
+    if record is not None:
+        record.adb_calls += 1
+
+
+def record_wait(seconds: float) -> None:
+    record = step_metrics.current
+    if record is not None:
+        record.wait_time += seconds
+
+
+def record_throttle(seconds: float) -> None:
+    record = step_metrics.current
+    if record is not None:
+        record.throttle_time += seconds
+
+
+def instrument_driver(driver):
+    """Counts every Appium HTTP command of the driver (idempotent)."""
+    executor = driver.command_executor
+    if getattr(executor, "_step_metrics_instrumented", False):
+        return driver
+
+    original_execute = executor.execute
+
+    def execute(command, params):
+        record_appium_command()
+        return original_execute(command, params)
+
+    executor.execute = execute
+    executor._step_metrics_instrumented = True
+    return driver
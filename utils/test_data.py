@@ -0,0 +1,173 @@
+import csv
+import datetime
+import glob
+import hashlib
+import json
+import os
+import struct
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Data files of data-driven tests (XLSX, CSV, JSONL) and the cache of their parsed rows
+DATA_DIR = "test_data_input"
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Shard of the rows run by this process: "<index>/<count>", e.g. "0/2" (set per worker by the runner)
+DATA_SHARD = os.environ.get("DATA_SHARD", "")
+
+SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm", ".csv", ".jsonl")
+
+_OFFSET = struct.Struct("<Q")  # one little-endian uint64 byte offset per cached row
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def iter_rows(path: str, sheet: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the rows of a data file as dicts (header row / JSON keys as names).
+    XLSX files are read with openpyxl in read-only mode, so memory use does not
+    grow with the number of rows. Empty rows are skipped.
+
+    :param sheet: Worksheet name for XLSX files (default: the active sheet)
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".xlsx", ".xlsm"):
+        import openpyxl  # only needed when a spreadsheet is parsed
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = [str(name) if name is not None else f"column_{i + 1}"
+                      for i, name in enumerate(next(rows, ()))]
+            for values in rows:
+                if any(value is not None for value in values):
+                    yield {name: _json_value(value) for name, value in zip(header, values)}
+        finally:
+            workbook.close()
+
+    elif extension == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                if any(row.values()):
+                    yield row
+
+    elif extension == ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    else:
+        raise ValueError(f"Unsupported data file {path}, expected one of {SUPPORTED_EXTENSIONS}")
+
+
+class DataSet:
+    """
+    Rows of one data file, parsed once per file content: the rows are cached as
+    JSON lines plus an index of their byte offsets in CACHE_DIR, keyed by the
+    file's sha256. row(i) reads a single row with two seeks, so collection and
+    tests never hold the whole file in memory.
+
+        dataset = DataSet("logins.xlsx", sheet="Accounts")
+        dataset.count, dataset.row(0)
+    """
+
+    def __init__(self, name: str, sheet: Optional[str] = None, data_dir: str = DATA_DIR,
+                 cache_dir: str = CACHE_DIR):
+        self.path = name if os.path.isabs(name) or os.path.exists(name) else os.path.join(data_dir, name)
+        self.sheet = sheet
+        self.cache_dir = cache_dir
+        self.rows_path, self.index_path = self._ensure_cache()
+        self.count = os.path.getsize(self.index_path) // _OFFSET.size
+
+    def _cache_prefix(self) -> str:
+        base = os.path.basename(self.path)
+        return f"{base}-{self.sheet}" if self.sheet else base
+
+    def _ensure_cache(self) -> Tuple[str, str]:
+        """Returns the cached rows/index files, parsing the data file if its content changed."""
+        prefix = os.path.join(self.cache_dir, self._cache_prefix())
+        rows_path = f"{prefix}-{_hash_file(self.path)[:16]}.jsonl"
+        index_path = rows_path[:-len(".jsonl")] + ".idx"
+        if os.path.exists(rows_path) and os.path.exists(index_path):
+            return rows_path, index_path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_rows, tmp_index = f"{rows_path}.{os.getpid()}.tmp", f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_rows, "wb") as rows_file, open(tmp_index, "wb") as index_file:
+            for row in iter_rows(self.path, self.sheet):
+                index_file.write(_OFFSET.pack(rows_file.tell()))
+                rows_file.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+        os.replace(tmp_rows, rows_path)
+        os.replace(tmp_index, index_path)
+
+        # Caches of older versions of the same file (not the .tmp files other workers are still writing)
+        for extension in (".jsonl", ".idx"):
+            for stale in glob.glob(f"{glob.escape(prefix)}-" + "?" * 16 + extension):
+                if stale not in (rows_path, index_path):
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass  # removed by another worker
+        return rows_path, index_path
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if not 0 <= index < self.count:
+            raise IndexError(f"{self.path} has {self.count} rows, no row {index}")
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(index * _OFFSET.size)
+            (offset,) = _OFFSET.unpack(index_file.read(_OFFSET.size))
+        with open(self.rows_path, "rb") as rows_file:
+            rows_file.seek(offset)
+            return json.loads(rows_file.readline())
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        with open(self.rows_path, "r", encoding="utf-8") as rows_file:
+            for line in rows_file:
+                yield json.loads(line)
+
+    def indices(self, shard: str = DATA_SHARD) -> range:
+        """Row indices of this process's shard ("<index>/<count>"; all rows when empty)."""
+        index, count = parse_shard(shard)
+        return range(index, self.count, count)
+
+    def __len__(self):
+        return self.count
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """'1/4' -> (1, 4); '' -> (0, 1)."""
+    if not shard:
+        return 0, 1
+    index, _, count = shard.partition("/")
+    index, count = int(index), int(count)
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid data shard {shard!r}, expected '<index>/<count>' with 0 <= index < count")
+    return index, count
+
+
+_datasets: Dict[Tuple[str, Optional[str]], DataSet] = {}
+
+
+def get_dataset(name: str, sheet: Optional[str] = None) -> DataSet:
+    """DataSet of a file in test_data_input/ (one instance per process)."""
+    key = (name, sheet)
+    dataset = _datasets.get(key)
+    if dataset is None:
+        dataset = _datasets[key] = DataSet(name, sheet)
+    return dataset
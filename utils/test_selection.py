@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional, Tuple
+
+from utils.duration_history import FAILED_STATUSES, TestHistory, file_hash, file_key
+
+# Seconds assumed for test files without history
+DEFAULT_DURATION = 60.0
+
+MODES = ("failed-first", "fastest-first")
+
+
+def _duration(test_file: str, durations: Dict[str, float]) -> float:
+    return durations.get(file_key(test_file), DEFAULT_DURATION)
+
+
+def order_failed_first(test_files: List[str], history: TestHistory) -> List[str]:
+    """
+    Files that failed in their last run first (most recent first), then files
+    without history, then the rest by failure rate (desc) and duration (asc).
+    A bad build therefore fails as early as possible.
+    """
+    last = history.last_results()
+    rates = history.failure_rates()
+    durations = history.durations()
+
+    def sort_key(test_file):
+        key = file_key(test_file)
+        row = last.get(key)
+        if row is not None and row["status"] in FAILED_STATUSES:
+            return 0, -row["finished"], 0.0
+        if row is None:
+            return 1, 0.0, _duration(test_file, durations)
+        return 2, -rates.get(key, 0.0), _duration(test_file, durations)
+
+    return sorted(test_files, key=sort_key)
+
+
+def order_fastest_first(test_files: List[str], history: TestHistory) -> List[str]:
+    """Shortest average duration first (quick smoke feedback)."""
+    durations = history.durations()
+    return sorted(test_files, key=lambda f: _duration(f, durations))
+
+
+def order_tests(test_files: List[str], mode: Optional[str], history: TestHistory) -> List[str]:
+    if mode is None:
+        return list(test_files)
+    if mode == "failed-first":
+        return order_failed_first(test_files, history)
+    if mode == "fastest-first":
+        return order_fastest_first(test_files, history)
+    raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+
+
+def budget_subset(test_files: List[str], budget_seconds: float, history: TestHistory,
+                  workers: int = 1) -> Tuple[List[str], List[str]]:
+    """
+    Best coverage within a time budget: recently failed files first (they are
+    the most likely to find a problem), then as many other files as fit,
+    shortest first.
+
+    :param budget_seconds: Wall-clock budget of the run
+    :param workers: Number of parallel workers sharing the budget
+    :return: (selected files in failed-first order, skipped files)
+    """
+    durations = history.durations()
+    capacity = budget_seconds * max(1, workers)
+    last = history.last_results()
+
+    failed = [f for f in test_files
+              if file_key(f) in last and last[file_key(f)]["status"] in FAILED_STATUSES]
+    others = sorted((f for f in test_files if f not in failed), key=lambda f: _duration(f, durations))
+
+    selected, used = [], 0.0
+    for test_file in order_failed_first(failed, history) + others:
+        cost = _duration(test_file, durations)
+        if used + cost <= capacity:
+            selected.append(test_file)
+            used += cost
+
+    skipped = [f for f in test_files if f not in selected]
+    return order_failed_first(selected, history), skipped
+
+
+def skip_unchanged(test_files: List[str], history: TestHistory,
+                   app_version: Optional[str]) -> Tuple[List[str], List[str], Dict[str, str]]:
+    """
+    Drops files whose last run passed with the same file content and the same
+    app version. Without a known app version nothing is skipped.
+
+    :return: (files to run, skipped files, file_key -> current file hash of all files)
+    """
+    hashes = {file_key(f): file_hash(f) for f in test_files}
+    if not app_version:
+        return list(test_files), [], hashes
+
+    last = history.last_results()
+    to_run, skipped = [], []
+    for test_file in test_files:
+        key = file_key(test_file)
+        row = last.get(key)
+        unchanged = (row is not None and row["status"] == "passed" and hashes[key] is not None
+                     and row["file_hash"] == hashes[key] and row["app_version"] == app_version)
+        (skipped if unchanged else to_run).append(test_file)
+    return to_run, skipped, hashes
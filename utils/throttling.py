@@ -0,0 +1,175 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.adb_transport import run_adb
+from utils.framework_log import get_logger
+from utils.step_metrics import record_throttle
+
+# Throttling configuration (rate in requests/second, burst = bucket capacity)
+DEFAULT_RATE = float(os.environ.get("THROTTLE_RATE", 1 / 0.35))  # ~171 requests/minute
+DEFAULT_BURST = int(os.environ.get("THROTTLE_BURST", "5"))
+LOG_EVERY_N_REQUESTS = 50
+WARN_REQUESTS_PER_MINUTE = 200
+
+log = get_logger("throttle")
+
+
+# ---------------------------------------------------------------------------
+# Background device logging (AppiumThrottle logcat notes)
+# ---------------------------------------------------------------------------
+
+class DeviceLogWorker:
+    """
+    Sends 'log -t <tag>' notes to devices from a background thread so the
+    caller never waits on adb. Notes are dropped if the queue is full.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, device_name: str, tag: str, message: str) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((device_name, tag, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Waits (up to timeout) until all queued notes were sent."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DeviceLogWorker", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            device_name, tag, message = self._queue.get()
+            try:
+                run_adb(["adb", "-s", device_name, "shell", "log", "-t", tag, f"'{message}'"])
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+
+device_log_worker = DeviceLogWorker()
+
+
+# ---------------------------------------------------------------------------
+# Token bucket throttler
+# ---------------------------------------------------------------------------
+
+class TokenBucketThrottler:
+    """
+    Token-bucket throttling for calls that may hit ADB/Appium on one device.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens/second.
+    Each request takes one token; when the bucket is empty the request reserves
+    the next token and sleeps until it is available. Reservations are made
+    under a lock, so the throttler is safe to share between threads, and
+    acquire_async() waits with asyncio.sleep() instead of blocking the loop.
+    """
+
+    def __init__(self, device_name: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        """
+        :param device_name: adb serial of the device the requests go to
+        :param rate: Sustained requests per second
+        :param burst: Maximum number of requests allowed back-to-back
+        """
+        self.device_name = device_name
+        self.rate = rate
+        self.burst = max(1, burst)
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._window_start = time.monotonic()
+
+        self.request_counter = 0  # requests in the current 1-minute window
+        self.total_requests = 0
+        self.total_wait = 0.0  # seconds spent sleeping in the throttler
+
+    def _reserve(self) -> tuple:
+        """Takes a token and returns (seconds to wait, request number in the current minute)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            # Reset counter each minute
+            if now - self._window_start > 60:
+                self.request_counter = 0
+                self._window_start = now
+            self.request_counter += 1
+            self.total_requests += 1
+            self.total_wait += wait
+            return wait, self.request_counter
+
+    def acquire(self, throttle_log: bool = True) -> float:
+        """
+        Blocks until the request may proceed.
+
+        :param throttle_log: Send AppiumThrottle notes to the device log
+        :return: Seconds spent waiting
+        """
+        wait, count = self._reserve()
+        if wait > 0:
+            log.debug("[Throttle] Wait %.3fs, not to exceed the limit.", wait)
+            time.sleep(wait)
+            record_throttle(wait)
+        self._after_acquire(count, throttle_log)
+        return wait
+
+    async def acquire_async(self, throttle_log: bool = True) -> float:
+        """asyncio variant of acquire() — waits without blocking the event loop."""
+        import asyncio  # only loaded by asyncio callers
+
+        wait, count = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            record_throttle(wait)
+        self._after_acquire(count, throttle_log)
+        return wait
+
+    def _after_acquire(self, count: int, throttle_log: bool) -> None:
+        log.debug("[Request] #%d in the current 1-minute window", count)
+
+        # Log to device every 50th request (and after 200)
+        if throttle_log and (count % LOG_EVERY_N_REQUESTS == 0 or count > WARN_REQUESTS_PER_MINUTE):
+            device_log_worker.submit(self.device_name, "AppiumThrottle", f"Request #{count} in current minute")
+
+        if count > WARN_REQUESTS_PER_MINUTE:
+            log.warning("[Throttle] EXCEEDED %d requests/min — current: %d", WARN_REQUESTS_PER_MINUTE, count)
+            if throttle_log:
+                device_log_worker.submit(
+                    self.device_name, "AppiumThrottle",
+                    f"THROTTLE: exceeded {WARN_REQUESTS_PER_MINUTE} requests/min — current: {count}")
+
+
+_throttlers: Dict[str, TokenBucketThrottler] = {}
+_throttlers_lock = threading.Lock()
+
+
+def get_throttler(device_name: str, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> TokenBucketThrottler:
+    """Returns the throttler of the given device (created on first use)."""
+    with _throttlers_lock:
+        throttler = _throttlers.get(device_name)
+        if throttler is None:
+            throttler = _throttlers[device_name] = TokenBucketThrottler(device_name, rate=rate, burst=burst)
+        return throttler